@@ -0,0 +1,372 @@
+"""
+Offline benchmarks of the analysis toolkit on synthetic tracking logs (see synthetic_logs): ingestion (eager,
+streaming, lazy, cache store/warm, mehta normalization), transition_statistics, get_process_moves, the smoothing
+filters and plotting. Every case reports its first and best time, throughput and the peak RSS above the level it
+started from; RSS is sampled in a background thread, so the report also holds the memory timeline of the run.
+
+Nothing is downloaded: logs are generated into --data-dir on first use and reused, the parse cache lives in a
+temporary directory, and plots render with the Agg backend.
+
+Usage (from analysis/):
+    python -m benchmarks.run_benchmarks --rows 10000 100000 --out report.json
+    python -m benchmarks.run_benchmarks --rows 1000000 --instance a1_2 --only ingest stats --history history.jsonl
+    python -m benchmarks.run_benchmarks --rows 1000000 --compare baseline.json --threshold 0.2
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import threading
+import subprocess
+import statistics
+import contextlib
+import numpy as np
+import scipy.ndimage, scipy.signal, scipy.stats # Loaded lazily by scipy, imported here to keep them out of the first timings
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from tools import cache_utils, pltw
+from tools import time_domain_utils as tdu
+from tools.dataset_manager import ReassignmentsDataset
+from benchmarks.synthetic_logs import synthetic_log
+
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "mrp-benchmark-logs")
+
+# >>>>> Memory sampling >>>>>
+
+try: _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError): _PAGE_SIZE = 4096
+
+def current_rss() -> int:
+    """
+    Resident set size of this process in bytes (Linux /proc, else the peak RSS from resource, else 0).
+    """
+    try:
+        with open('/proc/self/statm') as f: return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError: pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    except ImportError: return 0
+
+class MemorySampler:
+    """
+    Background thread sampling the RSS every `interval` seconds: a (seconds, bytes) timeline and a resettable peak.
+    """
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples, self.peak = [], 0
+        self.__stop = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.start = time.perf_counter()
+
+    def __run(self):
+        while not self.__stop.is_set():
+            self.sample()
+            self.__stop.wait(self.interval)
+
+    def sample(self) -> int:
+        rss = current_rss()
+        self.samples.append((time.perf_counter() - self.start, rss))
+        self.peak = max(self.peak, rss)
+        return rss
+
+    def reset_peak(self) -> int:
+        self.peak = 0
+        return self.sample()
+
+    def __enter__(self):
+        self.__thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.__stop.set()
+        self.__thread.join()
+        self.sample()
+        return False
+
+    def timeline(self, max_points: int = 2000) -> list:
+        """
+        Sampled timeline, decimated to at most max_points samples keeping the largest RSS of every bucket.
+        """
+        if len(self.samples) <= max_points: return [[round(t, 4), rss] for t, rss in self.samples]
+        buckets = np.array_split(np.asarray(self.samples), max_points)
+        return [[round(float(b[np.argmax(b[:, 1]), 0]), 4), int(b[:, 1].max())] for b in buckets]
+
+# >>>>> Cases >>>>>
+# A case takes the run context and returns (function to time, items it processes per call).
+# Setup done in the case itself (loading the dataset under test, building inputs) is not timed.
+
+CASES = {} # name -> case
+
+def benchmark(name: str):
+    def register(case):
+        CASES[name] = case
+        return case
+    return register
+
+class BenchmarkContext:
+    """
+    Logs and loaded datasets shared by the cases of one size.
+    """
+    def __init__(self, n_rows: int, data_dir: str, cache_dir: str, instance: str = None, n_processes: int = 1000,
+                 n_machines: int = 100, n_resources: int = 2, seed: int = 0):
+        self.n_rows, self.data_dir, self.cache_dir = n_rows, data_dir, cache_dir
+        self.log_kwargs = {'instance': instance, 'n_processes': n_processes, 'n_machines': n_machines, 'n_resources': n_resources, 'seed': seed}
+        self.__paths, self.__dataset, self.generation_s = {}, None, {}
+
+    def path(self, fmt: str = 'tracking') -> str:
+        if fmt not in self.__paths:
+            start = time.perf_counter()
+            self.__paths[fmt] = synthetic_log(self.data_dir, self.n_rows, fmt, **self.log_kwargs)
+            self.generation_s[fmt] = time.perf_counter() - start # ~0 when the log already existed
+        return self.__paths[fmt]
+
+    def dataset(self) -> ReassignmentsDataset:
+        if self.__dataset is None:
+            with contextlib.redirect_stdout(io.StringIO()): self.__dataset = ReassignmentsDataset(path=self.path(), use_cache=False)
+        return self.__dataset
+
+    def signal(self) -> np.ndarray:
+        return self.dataset().solution_cost.astype(float)
+
+@benchmark('ingest.eager')
+def _ingest_eager(ctx):
+    path = ctx.path()
+    return lambda: ReassignmentsDataset(path=path, use_cache=False), ctx.n_rows
+
+@benchmark('ingest.streaming')
+def _ingest_streaming(ctx):
+    path = ctx.path()
+    return lambda: ReassignmentsDataset(path=path, use_cache=False, chunksize=100_000), ctx.n_rows
+
+@benchmark('ingest.lazy')
+def _ingest_lazy(ctx):
+    path = ctx.path()
+    return lambda: ReassignmentsDataset(path=path, use_cache=False, lazy=True).solution_cost, ctx.n_rows
+
+@benchmark('ingest.cache_store')
+def _ingest_cache_store(ctx):
+    path = ctx.path()
+    def store():
+        cache_utils.clear_cache(path, ctx.cache_dir)
+        return ReassignmentsDataset(path=path)
+    return store, ctx.n_rows
+
+@benchmark('ingest.cache_warm')
+def _ingest_cache_warm(ctx):
+    path = ctx.path()
+    with contextlib.redirect_stdout(io.StringIO()): ReassignmentsDataset(path=path) # Fills the cache
+    return lambda: ReassignmentsDataset(path=path), ctx.n_rows
+
+@benchmark('ingest.mehta')
+def _ingest_mehta(ctx):
+    path = ctx.path('mehta')
+    return lambda: ReassignmentsDataset(path=path, use_cache=False), ctx.n_rows
+
+@benchmark('stats.transition_statistics')
+def _transition_statistics(ctx):
+    ds = ctx.dataset() # The first call also finds the solution change points
+    return lambda: ds.transition_statistics('load_cost'), ctx.n_rows
+
+@benchmark('query.process_moves')
+def _process_moves(ctx):
+    ds = ctx.dataset() # The first call also builds the process index
+    processes = np.random.default_rng(0).choice(np.unique(ds.ps_id), 1000)
+    def lookup():
+        for process in processes: ds.get_process_moves(process)
+    return lookup, len(processes)
+
+@benchmark('filter.moving_average')
+def _moving_average(ctx):
+    signal = ctx.signal()
+    return lambda: tdu.moving_average(signal, window=101), len(signal)
+
+@benchmark('filter.weighted_moving_average')
+def _weighted_moving_average(ctx):
+    signal = ctx.signal()
+    return lambda: tdu.weighted_moving_average('gaussian', signal, window=101, sigma=20), len(signal)
+
+@benchmark('filter.moving_window_mean')
+def _moving_window_mean(ctx):
+    signal = ctx.signal()
+    return lambda: tdu.moving_window_mean(signal, window=101), len(signal)
+
+@benchmark('filter.moving_variance')
+def _moving_variance(ctx):
+    signal = ctx.signal()
+    return lambda: tdu.moving_variance(signal, window=100), len(signal)
+
+@benchmark('filter.streaming_moving_average')
+def _streaming_moving_average(ctx):
+    signal = ctx.signal()
+    def stream():
+        f = tdu.StreamingMovingAverage(window=101)
+        out = [f.update(signal[i:i + 10_000]) for i in range(0, len(signal), 10_000)]
+        return out + [f.flush()]
+    return stream, len(signal)
+
+@benchmark('filter.density_distribution')
+def _density_distribution(ctx):
+    signal = ctx.signal()
+    return lambda: tdu.density_distribution(signal, n_bins=1000), len(signal)
+
+@benchmark('plot.line')
+def _plot_line(ctx):
+    signal = ctx.signal()
+    def render():
+        pltw.fig(plots=[pltw.plot(y=signal, ttl="Solution cost", kwargs={})])
+        plt.gcf().savefig(io.BytesIO(), format='png')
+        plt.close('all')
+    return render, len(signal)
+
+# >>>>> Runner >>>>>
+
+def run_case(name: str, ctx: BenchmarkContext, sampler: MemorySampler, repeat: int = 3) -> dict:
+    """
+    Time `repeat` calls of a case. Peak memory is the largest RSS during the calls above the RSS before them.
+    """
+    result = {'case': name, 'rows': ctx.n_rows}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): func, items = CASES[name](ctx)
+        base = sampler.reset_peak()
+        times = []
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                func()
+                times.append(time.perf_counter() - start)
+        sampler.sample()
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        return result
+
+    best = min(times)
+    result.update(items=items, first_s=times[0], min_s=best, median_s=statistics.median(times),
+                  items_per_s=items / best if best > 0 else None, peak_rss_delta_bytes=max(sampler.peak - base, 0))
+    return result
+
+def select_cases(only: list = None) -> list:
+    """
+    All case names, or those starting with one of the `only` prefixes (e.g. 'ingest', 'filter.moving_average').
+    """
+    if not only: return list(CASES)
+    names = [name for name in CASES if any(name == prefix or name.startswith(prefix + '.') for prefix in only)]
+    if not names: raise ValueError(f"No benchmark matches {only}. Cases: {list(CASES)}")
+    return names
+
+def environment() -> dict:
+    import pandas
+    try: commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError): commit = None
+    return {
+        'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+        'numpy': np.__version__, 'scipy': scipy.__version__, 'pandas': pandas.__version__, 'matplotlib': matplotlib.__version__,
+        'commit': commit,
+    }
+
+def run_benchmarks(rows: list, cases: list = None, repeat: int = 3, data_dir: str = DEFAULT_DATA_DIR, instance: str = None,
+                   n_processes: int = 1000, n_machines: int = 100, n_resources: int = 2, seed: int = 0, verbose: bool = True) -> dict:
+    """
+    Run the cases for every log size. Returns the report: environment, parameters, results and the RSS timeline.
+    """
+    cases = cases or list(CASES)
+    cache_dir = tempfile.mkdtemp(prefix="mrp-benchmark-cache-")
+    default_cache_dir, cache_utils.CACHE_DIR = cache_utils.CACHE_DIR, cache_dir # The user's cache is left alone
+    results, generation = [], {}
+    started = time.strftime('%Y-%m-%dT%H:%M:%S')
+    try:
+        with MemorySampler() as sampler:
+            for n_rows in rows:
+                ctx = BenchmarkContext(n_rows, data_dir, cache_dir, instance, n_processes, n_machines, n_resources, seed)
+                for name in cases:
+                    result = run_case(name, ctx, sampler, repeat)
+                    results.append(result)
+                    if verbose: print_result(result)
+                generation[n_rows] = ctx.generation_s
+    finally:
+        cache_utils.CACHE_DIR = default_cache_dir
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    return {
+        'started': started, 'environment': environment(),
+        'parameters': {'rows': rows, 'repeat': repeat, 'instance': instance, 'processes': n_processes, 'machines': n_machines,
+                       'resources': n_resources, 'seed': seed},
+        'generation_s': generation, 'results': results, 'peak_rss_bytes': sampler.peak, 'rss_timeline': sampler.timeline(),
+    }
+
+def print_result(result: dict):
+    label = f"{result['case']:<34} {result['rows']:>11,} rows"
+    if 'error' in result:
+        print(f"{label}  ERROR {result['error']}")
+        return
+    rate = f"{result['items_per_s']:>14,.0f}/s" if result['items_per_s'] else f"{'-':>16}"
+    print(f"{label}  first {result['first_s']:9.4f}s  min {result['min_s']:9.4f}s  {rate}  peak +{result['peak_rss_delta_bytes'] / 2**20:8.1f} MiB")
+
+# >>>>> History and regressions >>>>>
+
+def append_history(report: dict, path: str):
+    """
+    Append one summary line per run (no timeline) to a JSONL file, to follow throughput and memory across commits.
+    """
+    summary = {key: report[key] for key in ('started', 'environment', 'parameters', 'peak_rss_bytes')}
+    summary['results'] = [{key: r.get(key) for key in ('case', 'rows', 'min_s', 'items_per_s', 'peak_rss_delta_bytes', 'error')} for r in report['results']]
+    with open(path, 'a') as f: f.write(json.dumps(summary) + '\n')
+
+def compare(report: dict, baseline: dict, threshold: float = 0.2) -> list[dict]:
+    """
+    Cases (matched by name and rows) whose best time or peak memory grew by more than `threshold` over the baseline.
+    """
+    reference = {(r['case'], r['rows']): r for r in baseline['results'] if 'error' not in r}
+    regressions = []
+    for r in report['results']:
+        base = reference.get((r['case'], r['rows']))
+        if base is None or 'error' in r: continue
+        for key in ('min_s', 'peak_rss_delta_bytes'):
+            if base.get(key) and r[key] > base[key] * (1 + threshold):
+                regressions.append({'case': r['case'], 'rows': r['rows'], 'metric': key, 'baseline': base[key], 'current': r[key], 'ratio': r[key] / base[key]})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analysis toolkit on synthetic tracking logs.")
+    parser.add_argument("--rows", type=int, nargs='+', default=[100_000], help="Log sizes, e.g. 10000 1000000 50000000")
+    parser.add_argument("--only", nargs='+', help=f"Case names or prefixes, e.g. ingest filter.moving_average. Cases: {', '.join(CASES)}")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--instance", help="Draw the synthetic logs from a ROADEF instance, e.g. a1_2 (mehta logs are then fully derived)")
+    parser.add_argument("--processes", type=int, default=1000)
+    parser.add_argument("--machines", type=int, default=100)
+    parser.add_argument("--resources", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Where generated logs are kept between runs")
+    parser.add_argument("--out", help="Write the full report to this JSON file")
+    parser.add_argument("--history", help="Append a summary of this run to this JSONL file")
+    parser.add_argument("--compare", help="Baseline report (JSON) to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown or memory growth counted as a regression")
+    args = parser.parse_args(argv)
+
+    try: cases = select_cases(args.only)
+    except ValueError as e: parser.error(str(e))
+    report = run_benchmarks(args.rows, cases, args.repeat, args.data_dir, args.instance,
+                            args.processes, args.machines, args.resources, args.seed)
+    print(f"Peak RSS {report['peak_rss_bytes'] / 2**20:.1f} MiB")
+    if args.out:
+        with open(args.out, 'w') as f: json.dump(report, f, indent=2)
+        print(f"Saved report to {args.out}")
+    if args.history: append_history(report, args.history)
+
+    if args.compare:
+        with open(args.compare) as f: regressions = compare(report, json.load(f), args.threshold)
+        for r in regressions: print(f"Regression: {r['case']} ({r['rows']:,} rows) {r['metric']} {r['baseline']:.4g} -> {r['current']:.4g} ({r['ratio']:.2f}x)")
+        if regressions: sys.exit(1)
+        print("No regressions.")
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Synthetic tracking logs for offline benchmarks: the 22-column reassignment CSV written by jask/gavra and mehta's
+9-column simple_tracking.c format, at any size.
+
+Move streams are consistent with a machine state: every move leaves the machine its process is on (starting from
+the initial assignment) and never targets it, so replays and mehta's derived columns work on the generated files.
+Sizes come either from a ROADEF instance in the repository (model arrays, initial assignment) or from synthetic
+dimensions (P processes, M machines, R resources). Rows are generated and written in chunks, so memory stays
+bounded at 50M rows.
+
+Usage (from analysis/):
+    python -m benchmarks.synthetic_logs out.csv --rows 1000000 --machines 100 --resources 2
+    python -m benchmarks.synthetic_logs out_mehta.csv --rows 100000 --format mehta --instance a1_2
+"""
+import os
+import argparse
+import numpy as np
+from dataclasses import dataclass
+
+from tools.model_utils import RoadefModel, instance_model, instance_assignment
+
+TRACKING_HEADER = (
+    "MoveNum,ProcessID,SourceMachine,DestMachine,OriginalMachine,Service,MoveCost,ProcessResourceRequirements,Improvement,"
+    "Timestamp,SolutionId,SourceMachineResourceUsage,DestMachineResourceUsage,SourceMachineCapacities,DestMachineCapacities,"
+    "SourceMachineTransientUsage,DestMachineTransientUsage,SourceMachineProcessCount,DestMachineProcessCount,LoadCost,BalanceCost,SolutionCost"
+)
+MEHTA_HEADER = "moveNumber,processId,sourceMachine,destMachine,moveCost,improvement,timestamp,solutionId,solutionCost"
+
+EPOCH_START_MS = 1_753_739_591_597 # jask-style epoch milliseconds
+
+@dataclass
+class SyntheticInstance:
+    """
+    Arrays the generator draws from: the ROADEF model of an instance or random ones of the given size.
+    """
+    n_processes       : int
+    n_machines        : int
+    n_resources       : int
+    requirements      : np.ndarray  # (P, R)
+    capacity          : np.ndarray  # (M, R)
+    transient         : np.ndarray  # (R,) bool
+    process_service   : np.ndarray  # (P,)
+    process_move_cost : np.ndarray  # (P,)
+    initial_assignment: np.ndarray  # (P,)
+
+    @classmethod
+    def from_model(cls, model: RoadefModel, initial_assignment: np.ndarray):
+        return cls(model.n_processes, model.n_machines, model.n_resources, model.requirements, model.capacity, model.transient,
+                   model.process_service, model.process_move_cost, np.asarray(initial_assignment))
+
+    @classmethod
+    def from_instance(cls, instance: str):
+        return cls.from_model(instance_model(instance), instance_assignment(instance))
+
+    @classmethod
+    def random(cls, n_processes: int = 1000, n_machines: int = 100, n_resources: int = 2, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        requirements = rng.integers(1, 100, (n_processes, n_resources))
+        capacity = np.full((n_machines, n_resources), int(requirements.sum(axis=0).max() * 2 // n_machines) + 100)
+        transient = np.zeros(n_resources, dtype=bool)
+        transient[n_resources // 2:] = n_resources > 1
+        return cls(n_processes, n_machines, n_resources, requirements, capacity, transient,
+                   np.arange(n_processes) // 2, rng.integers(1, 10, n_processes), rng.integers(0, n_machines, n_processes))
+
+class MoveStreamGenerator:
+    """
+    Chunks of consistent moves: random processes and destinations, sources from the evolving assignment,
+    a slowly decreasing solution cost and new solution IDs every `moves_per_solution` moves on average.
+    """
+    def __init__(self, instance: SyntheticInstance, n_moves: int = 1_000_000, moves_per_solution: float = 20, moves_per_second: float = 2000,
+                 initial_cost: int = 1_000_000_000, improvement: float = 0.3, seed: int = 0):
+        if instance.n_machines < 2: raise ValueError("Moves need at least two machines.")
+        self.instance = instance
+        self.rng = np.random.default_rng(seed)
+        self.assignment = np.array(instance.initial_assignment, dtype=np.int64)
+        self.moves_per_solution, self.moves_per_second = moves_per_solution, moves_per_second
+        self.initial_cost = self.cost = initial_cost
+        self.step = improvement / max(n_moves, 1) # Mean relative cost decrease per move, `improvement` over the whole log
+        self.move_num, self.solution_id, self.elapsed_ms = 0, 1, 0.0
+
+    def __sources(self, ps: np.ndarray, dest: np.ndarray) -> np.ndarray:
+        """
+        Machine of every moved process before its move: the previous destination of the same process in the chunk,
+        else its current assignment. Also advances the assignment to the end of the chunk.
+        """
+        order = np.argsort(ps, kind='stable')
+        ps_sorted, dest_sorted = ps[order], dest[order]
+        first = np.r_[True, ps_sorted[1:] != ps_sorted[:-1]]
+        src_sorted = np.where(first, self.assignment[ps_sorted], np.r_[0, dest_sorted[:-1]])
+        last = np.r_[ps_sorted[1:] != ps_sorted[:-1], True]
+        src = np.empty_like(src_sorted)
+        src[order] = src_sorted
+        return src, ps_sorted[last], dest_sorted[last]
+
+    def chunk(self, n: int) -> dict:
+        inst, rng = self.instance, self.rng
+        M = inst.n_machines
+        ps = rng.integers(0, inst.n_processes, n)
+        dest = rng.integers(0, M, n)
+        for _ in range(64): # Re-draw destinations equal to the source; every fix can move a later source, so iterate
+            src, last_ps, last_dest = self.__sources(ps, dest)
+            same = dest == src
+            if not same.any(): break
+            dest[same] = (dest[same] + rng.integers(1, M, np.count_nonzero(same))) % M
+        self.assignment[last_ps] = last_dest
+
+        moves = np.arange(self.move_num, self.move_num + n)
+        self.move_num += n
+        solution_ids = self.solution_id + np.cumsum(rng.random(n) < 1 / self.moves_per_solution)
+        self.solution_id = int(solution_ids[-1])
+        elapsed = self.elapsed_ms + np.cumsum(rng.exponential(1000 / self.moves_per_second, n))
+        self.elapsed_ms = float(elapsed[-1])
+        cost = np.maximum(np.rint(self.cost * np.cumprod(1 - rng.uniform(0, 2 * self.step, n))).astype(np.int64), 1)
+        self.cost = int(cost[-1])
+
+        ps_count = max(inst.n_processes // M, 1)
+        capacity = inst.capacity
+        usage = lambda machines: (capacity[machines] * rng.uniform(0.2, 0.95, (n, inst.n_resources))).astype(np.int64)
+        return {
+            'move': moves, 'ps': ps, 'src': src, 'dest': dest,
+            'original': inst.initial_assignment[ps], 'service': inst.process_service[ps], 'move_cost': inst.process_move_cost[ps],
+            'requirements': inst.requirements[ps], 'improvement': (self.initial_cost - cost) / self.initial_cost * 100,
+            'elapsed_ms': elapsed, 'solution_id': solution_ids,
+            'src_usage': usage(src), 'dest_usage': usage(dest), 'src_capacity': capacity[src], 'dest_capacity': capacity[dest],
+            'src_transient': usage(src) * inst.transient, 'dest_transient': usage(dest) * inst.transient,
+            'src_count': rng.integers(0, 2 * ps_count + 1, n), 'dest_count': rng.integers(0, 2 * ps_count + 1, n),
+            'load_cost': (cost * 7) // 10, 'balance_cost': cost - (cost * 7) // 10, 'cost': cost,
+        }
+
+# >>>>> Writers: one '%' over a whole chunk instead of a format call per row >>>>>
+
+def _list_fmt(R: int) -> str:
+    return '"[' + ','.join(['%d'] * R) + ']"'
+
+def _format_chunk(row_fmt: str, columns: list) -> str:
+    """
+    Interleave integer columns ((n,) or (n, k)) row by row and format the whole chunk with one % operation.
+    """
+    flat = np.column_stack([np.asarray(col, dtype=np.int64).reshape(len(col), -1) for col in columns]).ravel().tolist()
+    return ((row_fmt + '\n') * (len(flat) // row_fmt.count('%'))) % tuple(flat)
+
+def write_tracking(path: str, n_rows: int, instance: SyntheticInstance, chunksize: int = 200_000, seed: int = 0, **generator_kwargs) -> str:
+    """
+    Write an n_rows 22-column tracking CSV (jask layout: Improvement in %, epoch ms timestamps).
+    """
+    gen = MoveStreamGenerator(instance, n_rows, seed=seed, **generator_kwargs)
+    lst = _list_fmt(instance.n_resources)
+    row_fmt = ','.join(['%d'] * 7 + [lst, '%d.%04d', '%d', '%d'] + [lst] * 6 + ['%d'] * 5)
+    with open(path, 'w') as f:
+        f.write(TRACKING_HEADER + '\n')
+        for start in range(0, n_rows, chunksize):
+            c = gen.chunk(min(chunksize, n_rows - start))
+            improvement = np.rint(np.maximum(c['improvement'], 0) * 10_000).astype(np.int64) # Fixed point, 4 decimals
+            f.write(_format_chunk(row_fmt, [
+                c['move'], c['ps'], c['src'], c['dest'], c['original'], c['service'], c['move_cost'], c['requirements'],
+                improvement // 10_000, improvement % 10_000, EPOCH_START_MS + c['elapsed_ms'].astype(np.int64), c['solution_id'],
+                c['src_usage'], c['dest_usage'], c['src_capacity'], c['dest_capacity'], c['src_transient'], c['dest_transient'],
+                c['src_count'], c['dest_count'], c['load_cost'], c['balance_cost'], c['cost'],
+            ]))
+    return path
+
+def write_mehta(path: str, n_rows: int, instance: SyntheticInstance, chunksize: int = 200_000, seed: int = 0, **generator_kwargs) -> str:
+    """
+    Write an n_rows mehta simple_tracking.c CSV (moves numbered from 1, whole seconds printed with %.2f).
+    """
+    gen = MoveStreamGenerator(instance, n_rows, seed=seed, **generator_kwargs)
+    row_fmt = '%d,%d,%d,%d,%d,%d,%d.00,%d,%d'
+    with open(path, 'w') as f:
+        f.write(MEHTA_HEADER + '\n')
+        for start in range(0, n_rows, chunksize):
+            c = gen.chunk(min(chunksize, n_rows - start))
+            f.write(_format_chunk(row_fmt, [
+                c['move'] + 1, c['ps'], c['src'], c['dest'], c['move_cost'], -c['move_cost'],
+                (c['elapsed_ms'] // 1000).astype(np.int64), c['solution_id'], c['cost'],
+            ]))
+    return path
+
+WRITERS = {'tracking': write_tracking, 'mehta': write_mehta}
+
+def synthetic_log(directory: str, n_rows: int, fmt: str = 'tracking', instance: str = None, n_processes: int = 1000,
+                  n_machines: int = 100, n_resources: int = 2, seed: int = 0) -> str:
+    """
+    Path of a synthetic log with these parameters in `directory`, generated on first use and reused afterwards.
+    """
+    source = instance or f"p{n_processes}_m{n_machines}_r{n_resources}"
+    path = os.path.join(directory, f"{fmt}_{source}_{n_rows}_s{seed}.csv")
+    if os.path.exists(path): return path
+
+    os.makedirs(directory, exist_ok=True)
+    inst = SyntheticInstance.from_instance(instance) if instance else SyntheticInstance.random(n_processes, n_machines, n_resources, seed)
+    tmp = path + ".tmp"
+    WRITERS[fmt](tmp, n_rows, inst, seed=seed)
+    os.replace(tmp, path) # Interrupted runs never leave a truncated log behind
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic tracking log.")
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--format", choices=sorted(WRITERS), default="tracking")
+    parser.add_argument("--instance", help="Draw sizes and arrays from a ROADEF instance, e.g. a1_2 (required for realistic mehta logs)")
+    parser.add_argument("--processes", type=int, default=1000)
+    parser.add_argument("--machines", type=int, default=100)
+    parser.add_argument("--resources", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    inst = SyntheticInstance.from_instance(args.instance) if args.instance else SyntheticInstance.random(args.processes, args.machines, args.resources, args.seed)
+    WRITERS[args.format](args.path, args.rows, inst, seed=args.seed)
+    print(f"Wrote {args.rows:,} rows to {args.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+ANALYSIS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ANALYSIS_DIR not in sys.path: sys.path.insert(0, ANALYSIS_DIR) # tools and benchmarks are imported from analysis/
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """
+    Empty parse cache for one test (cache_utils reads CACHE_DIR at call time).
+    """
+    from tools import cache_utils
+    directory = str(tmp_path / "cache")
+    monkeypatch.setattr(cache_utils, 'CACHE_DIR', directory)
+    return directory
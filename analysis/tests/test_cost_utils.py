@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pytest
+
+from tools.cost_utils import CostEvaluator, IncrementalEvaluator
+from tools.model_utils import load_assignment, load_model
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'jask', 'data', 'A')
+INSTANCES = ['a1_1', 'a1_2', 'a1_4', 'a2_1']
+
+def instance(name):
+    files = {kind: os.path.join(DATA_DIR, f"{kind}_{name}.txt") for kind in ('model', 'assignment', 'original_cost')}
+    if not all(os.path.exists(path) for path in files.values()): pytest.skip(f"Instance {name} is not shipped.")
+    with open(files['original_cost']) as f: original_cost = int(f.read().split()[0])
+    return load_model(files['model']), load_assignment(files['assignment']), original_cost
+
+def random_moves(model, n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, model.n_processes, n), rng.integers(0, model.n_machines, n)
+
+@pytest.mark.parametrize("name", INSTANCES)
+def test_original_cost(name):
+    model, assignment, original_cost = instance(name)
+    scores = CostEvaluator(model, assignment).evaluate(assignment)
+    assert scores['total_cost'][0] == original_cost
+    assert scores['feasible'][0]
+    assert IncrementalEvaluator(model, assignment).cost == original_cost
+
+@pytest.mark.parametrize("name", INSTANCES)
+def test_batches_match_single_evaluations(name):
+    model, assignment, _ = instance(name)
+    ps, ms = random_moves(model, 20)
+    assignments = np.tile(assignment, (20, 1))
+    assignments[np.arange(20), ps] = ms
+    batched = CostEvaluator(model, assignment, batch_size=7).evaluate(assignments)
+    single = CostEvaluator(model, assignment)
+    for k in range(20):
+        for key, values in single.evaluate(assignments[k]).items(): assert batched[key][k] == values[0], key
+
+@pytest.mark.parametrize("name", INSTANCES)
+def test_incremental_matches_full_evaluation(name):
+    model, assignment, original_cost = instance(name)
+    full = CostEvaluator(model, assignment)
+    inc = IncrementalEvaluator(model, assignment)
+    ps, ms = random_moves(model, 30, seed=1)
+
+    assert np.array_equal(inc.move_deltas(ps, ms), [inc.delta(p, m) for p, m in zip(ps, ms)])
+    current, cost = assignment.copy(), original_cost
+    for p, m in zip(ps, ms):
+        cost += inc.apply(p, m)
+        current[p] = m
+        assert inc.cost == cost == full.total_cost(current)[0]
@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic_logs import synthetic_log
+from tools import profiling_utils as prof
+from tools.dataset_manager import COLUMN_ATTRIBUTES, ReassignmentsDataset
+
+N_ROWS = 3000
+
+@pytest.fixture(scope='module')
+def logs(tmp_path_factory):
+    """
+    Synthetic a1_2 logs: a tracking log named after the instance and a mehta log whose name does not give it away.
+    """
+    directory = str(tmp_path_factory.mktemp('logs'))
+    tracking = synthetic_log(directory, N_ROWS, 'tracking', instance='a1_2')
+    mehta = os.path.join(directory, 'mehta_run.csv')
+    os.replace(synthetic_log(directory, N_ROWS, 'mehta', instance='a1_2'), mehta)
+    return {'tracking': tracking, 'mehta': mehta}
+
+def assert_same_dataset(ds, expected):
+    for attr in COLUMN_ATTRIBUTES.values():
+        assert np.array_equal(getattr(ds, attr), getattr(expected, attr)), attr
+    assert ds.malformed_rows.keys() == expected.malformed_rows.keys()
+    for col, rows in expected.malformed_rows.items(): assert np.array_equal(ds.malformed_rows[col], rows), col
+
+SELECTIONS = [{}, {'row_range': (100, 2500)}, {'dataset_fraction': 0.5}]
+
+@pytest.mark.parametrize("fmt", ['tracking', 'mehta'])
+@pytest.mark.parametrize("selection", SELECTIONS, ids=str)
+def test_loads_match_eager_load(logs, cache_dir, fmt, selection):
+    kwargs = dict(path=logs[fmt], instance='a1_2' if fmt == 'mehta' else None, **selection)
+    expected = ReassignmentsDataset(use_cache=False, **kwargs)
+
+    assert_same_dataset(ReassignmentsDataset(lazy=True, **kwargs), expected)      # Cold cache: lazy (mehta loads eagerly)
+    assert_same_dataset(ReassignmentsDataset(chunksize=700, **kwargs), expected)  # Cold cache: streamed
+    assert_same_dataset(ReassignmentsDataset(**kwargs), expected)                 # Parsed into the cache
+    assert_same_dataset(ReassignmentsDataset(**kwargs), expected)                 # Memory-mapped from the cache
+    assert_same_dataset(ReassignmentsDataset(lazy=True, **kwargs), expected)      # Warm cache: lazy loads it too
+    assert_same_dataset(ReassignmentsDataset(chunksize=700, **kwargs), expected)  # Warm cache: streaming loads it too
+
+def test_cache_hits_and_misses(logs, cache_dir):
+    with prof.profile_session():
+        ReassignmentsDataset(path=logs['tracking'])
+        ReassignmentsDataset(path=logs['tracking'])
+        counters = prof.report()['counters']
+    assert counters['cache.misses'] == 1 and counters['cache.hits'] == 1
+
+def test_cache_depends_on_instance(logs, cache_dir):
+    """
+    mehta's derived columns come from the instance model: a load without a model must not be served to one with it.
+    """
+    with_model = ReassignmentsDataset(path=logs['mehta'], instance='a1_2', use_cache=False)
+    without_model = ReassignmentsDataset(path=logs['mehta'], use_cache=False)
+    assert with_model.ps_size.any() and not without_model.ps_size.any()
+
+    assert_same_dataset(ReassignmentsDataset(path=logs['mehta']), without_model)
+    assert_same_dataset(ReassignmentsDataset(path=logs['mehta'], instance='a1_2'), with_model)
+    assert_same_dataset(ReassignmentsDataset(path=logs['mehta']), without_model)
+    assert_same_dataset(ReassignmentsDataset(path=logs['mehta'], instance='a1_2'), with_model)
@@ -0,0 +1,58 @@
+import ast
+import re
+
+import numpy as np
+import pytest
+
+from tools.parsing_utils import parse_list_column
+
+def reference_parse(cells, width):
+    """
+    Row-by-row ast.literal_eval parse: what parse_list_column must agree with.
+    Leading zeros are dropped first, the bulk tokenizer reads "007" as 7 where Python literals reject it.
+    """
+    mtx, valid = np.zeros((len(cells), width), dtype=np.int64), np.zeros(len(cells), dtype=bool)
+    for i, cell in enumerate(cells):
+        try: values = ast.literal_eval(re.sub(r'(?<![\d_])0+(?=\d)', '', cell.strip())) if isinstance(cell, str) else None
+        except (ValueError, SyntaxError): continue
+        if not isinstance(values, list) or len(values) != width or not all(type(v) is int for v in values): continue
+        try: mtx[i] = values
+        except OverflowError: continue
+        valid[i] = True
+    return mtx, valid
+
+EDGE_CASES = [
+    "[1,2,3]", " [4, 5, 6] ", "[-1,+2,0]", "[007,8,9]", "[1,2]", "[1,2,3,4]", "[]", "", "nan", float('nan'), None,
+    "[1.5,2,3]", "[1e3,2,3]", "[1,,3]", "[,1,2]", "[1,2,]", "[1 2,3,4]", "[--1,2,3]", "[1-,2,3]", "[a,b,c]",
+    "1,2,3", "[1,2,3", "[[1],2,3]", "[9223372036854775807,0,0]", "[9223372036854775808,0,0]",
+    "[-9223372036854775808,0,0]", "[123456789012345678901234,0,0]", "[0x1,2,3]", "[1_000,2,3]",
+]
+
+@pytest.mark.parametrize("cell", EDGE_CASES, ids=repr)
+def test_single_cell_matches_ast(cell):
+    cells = ["[10,20,30]", cell, "[40,50,60]"] # Width 3 is the most common one
+    mtx, valid = parse_list_column(cells)
+    ref_mtx, ref_valid = reference_parse(cells, 3)
+    assert valid.tolist() == ref_valid.tolist()
+    assert np.array_equal(mtx[valid], ref_mtx[ref_valid])
+    assert not mtx[~valid].any() # Invalid rows are zero-filled
+
+def test_whole_column_matches_ast():
+    rng = np.random.default_rng(0)
+    cells = [EDGE_CASES[i] for i in rng.integers(0, len(EDGE_CASES), 2000)]
+    mtx, valid = parse_list_column(cells, width=3)
+    ref_mtx, ref_valid = reference_parse(cells, 3)
+    assert np.array_equal(valid, ref_valid)
+    assert np.array_equal(mtx, ref_mtx)
+
+def test_all_valid_column():
+    cells = [f"[{i},{-i},{i * i}]" for i in range(1000)]
+    mtx, valid = parse_list_column(cells)
+    assert valid.all()
+    assert np.array_equal(mtx, reference_parse(cells, 3)[0])
+
+def test_empty_and_valueless_columns():
+    mtx, valid = parse_list_column([])
+    assert mtx.shape == (0, 0) and valid.shape == (0,)
+    mtx, valid = parse_list_column(["[]", "[]"])
+    assert mtx.shape == (2, 0) and not valid.any()
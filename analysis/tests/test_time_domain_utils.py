@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from tools.time_domain_utils import (RunningStats, StreamingMovingAverage, StreamingVariance, StreamingWeightedMovingAverage,
+                                     StreamingWindowMean, moving_average, moving_variance, moving_window_mean, weighted_moving_average)
+
+def stream(filt, data, chunk_sizes):
+    """
+    Feed data to a streaming filter in chunks of the given sizes (cycled) and concatenate its outputs.
+    """
+    outputs, pos, i = [], 0, 0
+    while pos < len(data):
+        n = chunk_sizes[i % len(chunk_sizes)]
+        outputs.append(filt.update(data[pos:pos + n]))
+        pos, i = pos + n, i + 1
+    outputs.append(filt.flush())
+    return np.concatenate(outputs)
+
+SIGNAL = 1e9 + np.cumsum(np.random.default_rng(0).normal(0, 1e3, 500)) # Cost-like: large offset, small steps
+CHUNKINGS = [[500], [1], [7, 1, 30], [64]]
+
+# (streaming filter, batch function, rtol): pandas' rolling variance drifts by ~1e-7 on a 1e9 offset, the streaming one does not
+FILTERS = [
+    (lambda: StreamingWindowMean(5, center=True), lambda x: moving_window_mean(x, 5, center=True), 1e-12),
+    (lambda: StreamingWindowMean(6, center=False), lambda x: moving_window_mean(x, 6, center=False), 1e-12),
+    (lambda: StreamingVariance(10, center=True), lambda x: moving_variance(x, 10, center=True), 1e-6),
+    (lambda: StreamingVariance(9, center=False), lambda x: moving_variance(x, 9, center=False), 1e-6),
+    *[(lambda mode=mode: StreamingMovingAverage(4, mode), lambda x, mode=mode: moving_average(x, 4, mode), 1e-12) for mode in ('reflect', 'mirror', 'nearest', 'constant')],
+    *[(lambda kind=kind: StreamingWeightedMovingAverage(kind, 7, 2), lambda x, kind=kind: weighted_moving_average(kind, x, 7, 2), 1e-12) for kind in ('uniform', 'gaussian', 'hann')],
+]
+
+@pytest.mark.parametrize("chunks", CHUNKINGS, ids=str)
+@pytest.mark.parametrize("make_filter, batch, rtol", FILTERS)
+def test_streaming_matches_batch(make_filter, batch, rtol, chunks):
+    expected = batch(SIGNAL)
+    streamed = stream(make_filter(), SIGNAL, chunks)
+    assert streamed.shape == expected.shape
+    np.testing.assert_allclose(streamed, expected, rtol=rtol, equal_nan=True)
+
+@pytest.mark.parametrize("make_filter, batch, rtol", FILTERS)
+def test_short_stream(make_filter, batch, rtol):
+    data = SIGNAL[:12]
+    np.testing.assert_allclose(stream(make_filter(), data, [5]), batch(data), rtol=rtol, equal_nan=True)
+
+def test_streaming_variance_is_exact():
+    windows = np.lib.stride_tricks.sliding_window_view(SIGNAL, 10).var(axis=1, ddof=1)
+    np.testing.assert_allclose(stream(StreamingVariance(10, center=False), SIGNAL, [7, 1, 30])[9:], windows, rtol=1e-10)
+
+def test_running_stats():
+    stats = RunningStats()
+    for chunk in np.array_split(SIGNAL, 13): stats.update(chunk)
+    assert stats.count == len(SIGNAL)
+    assert stats.mean == pytest.approx(SIGNAL.mean(), rel=1e-12)
+    assert stats.variance == pytest.approx(SIGNAL.var(ddof=1), rel=1e-9)
+    assert (stats.min, stats.max) == (SIGNAL.min(), SIGNAL.max())
@@ -0,0 +1,133 @@
+"""
+Time-indexed (anytime) view of solver runs: cost against wall-clock time instead of move number, so solvers with
+very different move rates can be compared on one axis.
+
+A run is any of:
+    - ReassignmentsDataset (timestamp, solution_cost), jask/gavra epoch ms or mehta ms since start
+    - SolutionStatesDataset (timestamp, cost)
+    - (elapsed_seconds, cost) tuple of arrays
+
+Example:
+    > runs = {'jask': jask_ds, 'gavra': gavra_ds, 'mehta': mehta_ds}
+    > curves = anytime_curves(runs, n_points=500, log_grid=True)   # DataFrame: elapsed_s x run (best so far)
+    > anytime_metrics(runs, targets=[0.8, 0.75], reference=lb)    # time to target, area under curve, mean gap
+"""
+import numpy as np
+import pandas as pd
+
+EPOCH_MS_MIN = 10 ** 11 # Timestamps from here on are epoch ms (1973+), smaller ones are already relative to the start
+
+def elapsed_seconds(timestamp: np.ndarray) -> np.ndarray:
+    """
+    Seconds since the start of the run. Epoch timestamps are taken relative to the earliest one.
+    """
+    timestamp = np.asarray(timestamp, dtype=np.int64) # Compact dtypes would overflow in the subtraction
+    if not len(timestamp): return np.zeros(0)
+    start = timestamp.min() if timestamp.min() >= EPOCH_MS_MIN else 0
+    return (timestamp - start) / 1000
+
+def running_best(cost: np.ndarray) -> np.ndarray:
+    """
+    Running minimum of the cost, NaN entries are skipped.
+    """
+    return np.fmin.accumulate(np.asarray(cost, dtype=float))
+
+def trajectory(run, best_so_far: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (elapsed seconds, cost) of a run in time order (stable, so same-millisecond moves keep their log order).
+    Costs that are not valid objective values (<= 0, e.g. mehta's initial record, or malformed) are NaN.
+    """
+    if isinstance(run, tuple): elapsed, cost = np.asarray(run[0], dtype=float), np.asarray(run[1], dtype=float)
+    else:
+        cost = getattr(run, 'solution_cost', None)
+        if cost is None: cost = run.cost
+        elapsed, cost = elapsed_seconds(run.timestamp), np.asarray(cost, dtype=float)
+        malformed = getattr(run, 'malformed_rows', None) or {}
+        if 'SolutionCost' in malformed: cost[malformed['SolutionCost']] = np.nan
+    cost = np.where(cost > 0, cost, np.nan)
+
+    if len(elapsed) > 1 and np.any(elapsed[1:] < elapsed[:-1]):
+        order = np.argsort(elapsed, kind='stable')
+        elapsed, cost = elapsed[order], cost[order]
+    if best_so_far: cost = running_best(cost)
+    return elapsed, cost
+
+def time_grid(horizon: float, n_points: int = 1000, log_grid: bool = False, start: float = 1e-3) -> np.ndarray:
+    """
+    Common time axis in seconds: linear in [0, horizon] or logarithmic in [start, horizon].
+    """
+    if log_grid: return np.geomspace(start, max(horizon, start), n_points)
+    return np.linspace(0, horizon, n_points)
+
+def resample(elapsed: np.ndarray, values: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """
+    Value of the last event at or before every grid time (step interpolation), NaN before the first event.
+    """
+    idx = np.searchsorted(elapsed, grid, side='right') - 1
+    out = np.full(len(grid), np.nan)
+    out[idx >= 0] = np.asarray(values, dtype=float)[idx[idx >= 0]]
+    return out
+
+def time_to_targets(elapsed: np.ndarray, cost: np.ndarray, targets) -> np.ndarray:
+    """
+    First elapsed time at which the best cost so far is at or below each target cost (NaN if never).
+    """
+    best = running_best(cost)
+    targets = np.atleast_1d(np.asarray(targets, dtype=float))
+    idx = np.searchsorted(-np.nan_to_num(best, nan=np.inf), -targets, side='left') # -best is sorted
+    out = np.full(targets.shape, np.nan)
+    reached = idx < len(best)
+    out[reached] = elapsed[idx[reached]]
+    return out
+
+def area_under_curve(elapsed: np.ndarray, values: np.ndarray, horizon: float = None) -> float:
+    """
+    Exact integral of a step curve (each value holds until the next event) from the first event to `horizon`.
+    """
+    if not len(elapsed): return np.nan
+    horizon = elapsed[-1] if horizon is None else horizon
+    ends = np.minimum(np.r_[elapsed[1:], horizon], horizon)
+    durations = np.maximum(ends - np.minimum(elapsed, horizon), 0)
+    return float(np.nansum(np.asarray(values, dtype=float) * durations))
+
+def anytime_curves(runs: dict, grid: np.ndarray = None, n_points: int = 1000, horizon: float = None, log_grid: bool = False) -> pd.DataFrame:
+    """
+    Best-so-far cost of every run resampled onto one time grid (default: up to the longest run).
+    Returns a DataFrame indexed by elapsed seconds with one column per run.
+    """
+    trajectories = {label: trajectory(run, best_so_far=True) for label, run in runs.items()}
+    if grid is None:
+        if horizon is None: horizon = max((elapsed[-1] for elapsed, _ in trajectories.values() if len(elapsed)), default=0.0)
+        grid = time_grid(horizon, n_points, log_grid)
+    curves = {label: resample(elapsed, best, grid) for label, (elapsed, best) in trajectories.items()}
+    return pd.DataFrame(curves, index=pd.Index(grid, name='elapsed_s'))
+
+def anytime_metrics(runs: dict, targets=None, reference: float = None, relative_targets: bool = True, horizon: float = None) -> pd.DataFrame:
+    """
+    One row per run: moves, duration, initial/best cost, time to each target and the area under the best-so-far curve.
+
+    targets: costs, or fractions of the run's initial cost with relative_targets (e.g. [0.8] is 20% improvement).
+    reference: e.g. the lower bound. Adds the mean relative gap over time (primal integral / horizon) in %.
+    horizon: common time budget for the areas (default: the longest run), runs hold their final cost until then.
+    """
+    trajectories = {label: trajectory(run) for label, run in runs.items()}
+    if horizon is None: horizon = max((elapsed[-1] for elapsed, _ in trajectories.values() if len(elapsed)), default=0.0)
+    targets = [] if targets is None else list(np.atleast_1d(targets))
+
+    rows = []
+    for label, (elapsed, cost) in trajectories.items():
+        row = {'run': label, 'moves': len(cost)}
+        valid = np.flatnonzero(~np.isnan(cost))
+        rows.append(row)
+        if not valid.size: continue
+
+        best, start = running_best(cost), elapsed[valid[0]]
+        row.update(duration_s=elapsed[-1], initial_cost=cost[valid[0]], best_cost=best[-1])
+        target_costs = np.asarray(targets, dtype=float) * (row['initial_cost'] if relative_targets else 1)
+        for target, ttt in zip(targets, time_to_targets(elapsed, cost, target_costs)):
+            row[f"time_to_{target:g}" + ("x" if relative_targets else "")] = ttt
+        row['auc'] = area_under_curve(elapsed, best, horizon)
+        if reference:
+            gap = area_under_curve(elapsed, (best - reference) / reference, horizon)
+            row['mean_gap_%'] = gap / (horizon - start) * 100 if horizon > start else np.nan
+    return pd.DataFrame(rows).set_index('run')
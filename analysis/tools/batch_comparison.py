@@ -0,0 +1,134 @@
+"""
+Cross-solver comparison of every run in the repository: final cost, gap to the lower bound,
+improvement over the original solution and time to reach X% improvement.
+
+Runs are summarized in a process pool (one task per tracking file or final solution file) and
+merged into a single table.
+
+Usage (from analysis/):
+    python -m tools.batch_comparison [--solver gavra] [--instance "a1_*"] [--targets 10 25 50] [--workers 8] [--csv runs.csv]
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from tools.anytime_utils import time_to_targets
+from tools.dataset_registry import DatasetRegistry, default_registry
+from tools.model_utils import instance_references
+from tools.parsing_utils import scan_columns
+from tools.schema_utils import MEHTA_WIDE_FORMAT, detect_format
+from tools.solution_scoring import score_instance
+
+DEFAULT_TARGETS = (10, 25, 50) # % improvement over the original cost
+
+# >>>>> Tracking file kind -> (cost column, timestamp column, seconds per timestamp unit) >>>>>
+_TRACKING_COLUMNS = {
+    'exploration'    : ('SolutionCost', 'Timestamp', 1e-3), # Epoch milliseconds
+    'accepted'       : ('SolutionCost', 'Timestamp', 1e-3),
+    'solution_states': ('Cost',         'Timestamp', 1e-3),
+    'mehta'          : ('solutionCost', 'timestamp', 1.0),  # Seconds since start
+}
+
+def summarize_tracking(task: dict) -> dict:
+    """
+    Summary of one tracking file. `task` holds the catalog fields plus 'lb', 'original_cost' and 'targets'.
+    """
+    cost_col, time_col, scale = _TRACKING_COLUMNS[task['kind']]
+    if task['kind'] == 'mehta' and detect_format(task['path']) == MEHTA_WIDE_FORMAT: cost_col, time_col = 'SolutionCost', 'Timestamp'
+    cols = scan_columns(task['path'], [cost_col, time_col])
+    cost, timestamp = cols[cost_col], cols[time_col]
+    valid = ~np.isnan(cost) if cost.dtype.kind == 'f' else np.ones(len(cost), dtype=bool)
+    cost, timestamp = cost[valid], timestamp[valid]
+
+    summary = {'moves': len(cost)}
+    if not len(cost): return summary
+
+    elapsed = (timestamp - timestamp[0]) * scale
+    summary.update(initial_cost=cost[0], final_cost=cost[-1], best_cost=cost.min(), duration_s=elapsed[-1])
+    if task['original_cost'] is not None: # Targets are % improvement over the original cost
+        target_costs = task['original_cost'] * (1 - np.asarray(task['targets'], dtype=float) / 100)
+        summary.update({f'time_to_{target:g}%': ttt for target, ttt in zip(task['targets'], time_to_targets(elapsed, cost, target_costs))})
+    return summary
+
+def summarize_solution(task: dict) -> dict:
+    """
+    Cost of a final solution file as scored by solution_scoring (solution files carry no timing information).
+    """
+    scored = score_instance({'instance': task['instance'], 'entries': [{key: task[key] for key in ('solver', 'run', 'path')}]})[0]
+    if 'error' in scored: return {'error': scored['error']}
+    return {'final_cost': scored['total_cost'], 'best_cost': scored['total_cost'], 'feasible': scored['feasible']}
+
+def _summarize(task: dict) -> dict:
+    row = {key: task[key] for key in ('solver', 'instance', 'run', 'kind', 'variant', 'path')}
+    try: row.update(summarize_solution(task) if task['kind'] == 'solution' else summarize_tracking(task))
+    except (OSError, ValueError, LookupError) as e: row['error'] = f"{type(e).__name__}: {e}"
+
+    best, lb, original = row.get('best_cost'), task['lb'], task['original_cost']
+    row['lb'], row['original_cost'] = lb, original
+    if best is not None and lb: row['gap_to_lb_%'] = (best - lb) / lb * 100
+    if best is not None and original: row['improvement_%'] = (original - best) / original * 100
+    return row
+
+def collect_tasks(registry: DatasetRegistry = None, solver: str = None, instance: str = None, targets=DEFAULT_TARGETS,
+                  solutions: bool = True) -> list[dict]:
+    """
+    One task per tracking file (with a known instance) and, optionally, per final solution file.
+    """
+    registry = registry or default_registry()
+    tasks = []
+    for entry in registry.find(solver=solver, instance=instance):
+        if entry.instance is None or entry.kind not in _TRACKING_COLUMNS: continue
+        tasks.append(dict(solver=entry.solver, instance=entry.instance, run=entry.run, kind=entry.kind, variant=entry.variant,
+                          path=entry.path, targets=tuple(targets), **instance_references(entry.instance)))
+
+    if solutions:
+        for entry in registry.solutions(solver=solver, instance=instance):
+            tasks.append(dict(solver=entry.solver, instance=entry.instance, run=entry.run, kind='solution', variant='',
+                              path=entry.path, targets=tuple(targets), **instance_references(entry.instance)))
+    return tasks
+
+def compare_runs(registry: DatasetRegistry = None, solver: str = None, instance: str = None, targets=DEFAULT_TARGETS,
+                 solutions: bool = True, workers: int = None) -> pd.DataFrame:
+    """
+    Summarize all matching runs in parallel and return one row per tracking/solution file.
+
+    Example:
+        > table = compare_runs(instance="a1_*")
+        > table.pivot_table(index="instance", columns="solver", values="gap_to_lb_%", aggfunc="min")
+    """
+    tasks = collect_tasks(registry, solver, instance, targets, solutions)
+    if not tasks: return pd.DataFrame()
+
+    if workers == 1: rows = [_summarize(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool: rows = list(pool.map(_summarize, tasks))
+
+    table = pd.DataFrame(rows)
+    return table.sort_values(['instance', 'solver', 'run', 'kind', 'variant'], ignore_index=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare all solver runs against the ROADEF reference costs.")
+    parser.add_argument("--solver", help="Solver filter (glob), e.g. gavra")
+    parser.add_argument("--instance", help="Instance filter (glob), e.g. 'a1_*'")
+    parser.add_argument("--targets", type=float, nargs="+", default=list(DEFAULT_TARGETS), help="Improvement targets in %% for time-to-target")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: number of cores)")
+    parser.add_argument("--no-solutions", action="store_true", help="Skip final solution files, summarize tracking files only")
+    parser.add_argument("--csv", help="Write the table to this CSV file")
+    args = parser.parse_args(argv)
+
+    table = compare_runs(solver=args.solver, instance=args.instance, targets=args.targets,
+                         solutions=not args.no_solutions, workers=args.workers)
+    if table.empty:
+        print("No runs found.")
+        return table
+
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(table.drop(columns=['path']).to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+        print(f"Saved {len(table)} runs to {args.csv}")
+    return table
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+
+from tools import profiling_utils as prof
+
+CACHE_VERSION = 5 # Bumped when the cached column layout, dtypes or malformed rows change
+CACHE_DIR = os.environ.get("MRP_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mrp-analysis"))
+
+def source_signature(path: str, variant: dict = None) -> dict:
+    """
+    Identity of a source file used to invalidate the cache: absolute path, size and modification time, plus the
+    `variant` of parse parameters the columns depend on (e.g. the instance whose model derives and bounds them).
+    """
+    stat = os.stat(path)
+    return {"source": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "version": CACHE_VERSION,
+            "variant": json.loads(json.dumps(variant))} # As read back from meta.json (tuples become lists)
+
+def cache_path(path: str, cache_dir: str = None) -> str:
+    """
+    Directory holding the cached columns of a source file, one .npy file per column.
+    """
+    key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16]
+    name = f"{os.path.splitext(os.path.basename(path))[0]}-{key}"
+    return os.path.join(cache_dir or CACHE_DIR, name)
+
+def load_columns(path: str, cache_dir: str = None, mmap_mode: str = 'r', variant: dict = None):
+    """
+    Load cached columns of a source file as memory-mapped arrays.
+    Returns (columns, malformed_rows), or None if there is no cache entry, the source file changed since it was written
+    or the entry was parsed with another variant.
+    """
+    entry = cache_path(path, cache_dir)
+    try:
+        with open(os.path.join(entry, "meta.json")) as f: meta = json.load(f)
+    except (OSError, ValueError): return None
+
+    if meta.get("signature") != source_signature(path, variant): return None
+
+    try:
+        columns = {col: np.load(os.path.join(entry, f"{col}.npy"), mmap_mode=mmap_mode) for col in meta["columns"]}
+        malformed_rows = {col: np.load(os.path.join(entry, f"malformed.{col}.npy")) for col in meta["malformed"]}
+    except (OSError, ValueError): return None
+
+    return columns, malformed_rows
+
+def store_columns(path: str, columns: dict, malformed_rows: dict = None, cache_dir: str = None, variant: dict = None) -> str:
+    """
+    Write parsed columns of a source file to the cache. The entry is written to a temporary
+    directory first and moved into place, so readers never observe a partial entry.
+    """
+    malformed_rows = malformed_rows or {}
+    entry = cache_path(path, cache_dir)
+    tmp_entry = f"{entry}.tmp-{os.getpid()}"
+    os.makedirs(tmp_entry, exist_ok=True)
+
+    for col, arr in columns.items(): np.save(os.path.join(tmp_entry, f"{col}.npy"), np.ascontiguousarray(arr))
+    for col, rows in malformed_rows.items(): np.save(os.path.join(tmp_entry, f"malformed.{col}.npy"), rows)
+
+    meta = {"signature": source_signature(path, variant), "columns": list(columns), "malformed": list(malformed_rows)}
+    with open(os.path.join(tmp_entry, "meta.json"), "w") as f: json.dump(meta, f, indent=2)
+
+    shutil.rmtree(entry, ignore_errors=True)
+    os.replace(tmp_entry, entry)
+    return entry
+
+def cached_columns(path: str, parse, cache_dir: str = None, use_cache: bool = True, variant: dict = None):
+    """
+    Return (columns, malformed_rows) for a source file, parsing it with `parse(path)` only on a cache miss.
+    With parse=None the cache is only probed: None on a miss.
+
+    Example:
+        > columns, malformed = cached_columns(csv_path, lambda p: parse_reassignments_frame(pd.read_csv(p)))
+    """
+    if use_cache:
+        with prof.section('cache.load'): cached = load_columns(path, cache_dir, variant=variant)
+        prof.count('cache.hits' if cached is not None else 'cache.misses')
+        if cached is not None: return cached
+    if parse is None: return None
+
+    with prof.section('cache.parse'): columns, malformed_rows = parse(path)
+    if use_cache:
+        try:
+            with prof.section('cache.store'): store_columns(path, columns, malformed_rows, cache_dir, variant)
+        except OSError as e: print(f"Warning: could not write cache for {path}: {e}")
+    return columns, malformed_rows
+
+def clear_cache(path: str = None, cache_dir: str = None):
+    """
+    Remove the cache entry of a single source file, or the whole cache directory if no path is given.
+    """
+    shutil.rmtree(cache_path(path, cache_dir) if path else (cache_dir or CACHE_DIR), ignore_errors=True)
@@ -0,0 +1,345 @@
+import numpy as np
+
+from tools import profiling_utils as prof
+from tools.model_utils import RoadefModel
+
+COST_COMPONENTS = ['load_cost', 'balance_cost', 'process_move_cost', 'service_move_cost', 'machine_move_cost']
+VIOLATION_TYPES = ['capacity', 'transient', 'conflict', 'spread', 'dependency']
+
+class CostEvaluator:
+    """
+    Vectorized ROADEF objective and constraint evaluation, mirroring analysis/checker/solution_checker.
+    The model is parsed once; `evaluate` scores a whole batch of assignment vectors in one call.
+
+    Example:
+        > evaluator = CostEvaluator(load_model(model_path), load_assignment(assignment_path))
+        > scores = evaluator.evaluate(assignments) # (K, P) -> dict of (K,) arrays
+        > scores['total_cost'], scores['feasible']
+    """
+    model             : RoadefModel
+    initial_assignment: np.ndarray  # (P,) original machine of every process
+
+    def __init__(self, model: RoadefModel, initial_assignment: np.ndarray, batch_size: int = 256):
+        self.model = model
+        self.initial_assignment = np.asarray(initial_assignment)
+        self.batch_size = batch_size # Assignments scored per internal pass, bounds memory to batch_size x max(P, M x R)
+
+    @prof.profiled('cost.evaluate')
+    def evaluate(self, assignments: np.ndarray) -> dict:
+        """
+        Score one (P,) or several (K, P) assignments.
+        Returns a dict of (K,) arrays: the five cost components, 'total_cost', one '<type>_violations'
+        count per constraint type (capacity, transient, conflict, spread, dependency) and 'feasible'.
+        """
+        assignments = np.atleast_2d(np.asarray(assignments))
+        if assignments.shape[1] != self.model.n_processes:
+            raise ValueError(f"Assignments have {assignments.shape[1]} processes, the model has {self.model.n_processes}.")
+
+        batches = [self.__evaluate_batch(assignments[i:i + self.batch_size]) for i in range(0, len(assignments), self.batch_size)]
+        scores = {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]} if batches else {}
+        return scores
+
+    def total_cost(self, assignments: np.ndarray) -> np.ndarray:
+        return self.evaluate(assignments)['total_cost']
+
+    def __evaluate_batch(self, assignments: np.ndarray) -> dict:
+        m = self.model
+        K, P = assignments.shape
+        M, R = m.n_machines, m.n_resources
+        moved = assignments != self.initial_assignment # (K, P)
+
+        # >>>>> Resource usage per machine: (K, M, R) >>>>>
+
+        batch_machine = (np.arange(K)[:, None] * M + assignments) # (K, P) row in the flattened (K*M) machine axis
+        usage = _scatter_rows(batch_machine, np.broadcast_to(m.requirements, (K, P, R)), K * M).reshape(K, M, R)
+
+        # Transient resources stay consumed on the original machine of moved processes
+        k_moved, p_moved = np.nonzero(moved)
+        moved_out = _scatter_rows(k_moved * M + self.initial_assignment[p_moved], m.requirements[p_moved], K * M).reshape(K, M, R)
+        transient_usage = usage + moved_out * m.transient
+
+        # >>>>> Objective >>>>>
+
+        load_cost = np.sum(np.maximum(usage - m.safety_capacity, 0) * m.load_cost_weights, axis=(1, 2))
+
+        remaining = m.capacity - usage
+        balance_cost = np.zeros(K, dtype=np.int64)
+        for (r1, r2), target, weight in zip(m.balance_resources, m.balance_targets, m.balance_weights):
+            balance_cost += weight * np.sum(np.maximum(target * remaining[:, :, r1] - remaining[:, :, r2], 0), axis=1)
+
+        process_move_cost = m.weight_process_move * (moved @ m.process_move_cost)
+
+        service_moves = np.bincount((k_moved * m.n_services + m.process_service[p_moved]), minlength=K * m.n_services)
+        service_move_cost = m.weight_service_move * service_moves.reshape(K, m.n_services).max(axis=1, initial=0)
+
+        machine_move_cost = m.weight_machine_move * m.machine_move_cost[self.initial_assignment, assignments].sum(axis=1)
+
+        total_cost = load_cost + balance_cost + process_move_cost + service_move_cost + machine_move_cost
+
+        # >>>>> Constraints >>>>>
+
+        capacity_violations = np.sum(usage > m.capacity, axis=(1, 2))
+        transient_violations = np.sum((transient_usage > m.capacity) & m.transient, axis=(1, 2))
+        conflict_violations, spread_violations, dependency_violations = self.__service_violations(assignments)
+
+        return {
+            'load_cost': load_cost, 'balance_cost': balance_cost, 'process_move_cost': process_move_cost,
+            'service_move_cost': service_move_cost, 'machine_move_cost': machine_move_cost, 'total_cost': total_cost,
+            'capacity_violations': capacity_violations, 'transient_violations': transient_violations,
+            'conflict_violations': conflict_violations, 'spread_violations': spread_violations,
+            'dependency_violations': dependency_violations,
+            'feasible': (capacity_violations + transient_violations + conflict_violations + spread_violations + dependency_violations) == 0,
+        }
+
+    def __service_violations(self, assignments: np.ndarray) -> tuple:
+        """
+        Conflict (processes of a service sharing a machine), spread (too few locations) and dependency
+        (neighborhood of a service without its dependencies) violations, counted per assignment via sorted keys.
+        """
+        m = self.model
+        K, P = assignments.shape
+        S, M = m.n_services, m.n_machines
+        n_locations = int(m.location.max()) + 1
+        n_neighborhoods = int(m.neighborhood.max()) + 1
+        batch_service = (np.arange(K)[:, None] * S + m.process_service).ravel() # (K*P,) service row in the flattened (K*S) axis
+        machines = assignments.ravel()
+
+        # Conflict: every extra process of a service on the same machine
+        conflict_keys, counts = np.unique(batch_service * M + machines, return_counts=True)
+        conflict_violations = np.bincount(conflict_keys // (S * M), weights=counts - 1, minlength=K).astype(np.int64)
+
+        # Spread: services running in fewer distinct locations than spread_min
+        service_locations = np.unique(batch_service * n_locations + m.location[machines]) // n_locations
+        spread = np.bincount(service_locations, minlength=K * S).reshape(K, S)
+        spread_violations = np.sum(spread < m.spread_min, axis=1)
+
+        # Dependency: for s -> s', every neighborhood hosting s must also host s'
+        present = np.unique(batch_service * n_neighborhoods + m.neighborhood[machines]) # Sorted (k, s, n) keys
+        present_bs, present_n = present // n_neighborhoods, present % n_neighborhoods
+        n_deps = np.diff(m.dependency_offsets)[present_bs % S]
+        src = np.repeat(np.arange(len(present)), n_deps)
+        dep_pos = np.arange(len(src)) - np.repeat(np.cumsum(n_deps) - n_deps, n_deps) # Position within each dependency list
+        dep_service = m.dependency_targets[m.dependency_offsets[present_bs[src] % S] + dep_pos]
+        required = ((present_bs[src] // S) * S + dep_service) * n_neighborhoods + present_n[src]
+        missing = ~np.isin(required, present, assume_unique=False)
+        dependency_violations = np.bincount(required[missing] // (S * n_neighborhoods), minlength=K)
+
+        return conflict_violations, spread_violations, dependency_violations
+
+def _scatter_rows(rows: np.ndarray, values: np.ndarray, n_rows: int) -> np.ndarray:
+    """
+    Sum (..., R) values into (n_rows, R) by the row index of the same leading shape.
+    Scattered one resource at a time, so a broadcast `values` is never materialized as a whole.
+    """
+    rows = rows.ravel()
+    out = np.empty((n_rows, values.shape[-1]), dtype=np.int64)
+    for r in range(values.shape[-1]):
+        out[:, r] = np.rint(np.bincount(rows, weights=values[..., r].ravel(), minlength=n_rows))
+    return out
+
+def rescore_moves(ds, replay, evaluator: CostEvaluator, moves) -> dict:
+    """
+    Re-score the solution after each selected move of a dataset and pair it with the costs the solver logged.
+    `replay` is a MachineStateReplay over the same dataset; the logged costs of move i describe the state after it.
+
+    Returns a dict of arrays: 'move', the evaluator scores and 'logged_load_cost', 'logged_balance_cost', 'logged_solution_cost'.
+    """
+    moves = np.asarray(moves, dtype=np.int64)
+    assignments = np.stack([replay.assignment_at(i + 1) for i in moves]) if len(moves) else np.zeros((0, evaluator.model.n_processes), dtype=np.int64)
+    scores = evaluator.evaluate(assignments)
+    scores['move'] = moves
+    scores['logged_load_cost'] = np.asarray(ds.load_cost)[moves]
+    scores['logged_balance_cost'] = np.asarray(ds.balance_cost)[moves]
+    scores['logged_solution_cost'] = np.asarray(ds.solution_cost)[moves]
+    return scores
+
+class IncrementalEvaluator:
+    """
+    Cost deltas of single moves against a current assignment state, in O(R + B) per move.
+    Only the two affected machines, their balance terms and the service move counters are touched,
+    instead of re-scoring the whole solution.
+
+    Example:
+        > inc = IncrementalEvaluator(model, initial_assignment)
+        > inc.delta(p, m)                  # cost change of moving process p to machine m
+        > inc.apply(p, m)                  # commit the move, returns its delta
+        > inc.move_deltas(ps, ms)          # vectorized what-if for many candidate moves at once
+    """
+    model             : RoadefModel
+    initial_assignment: np.ndarray  # (P,) original machine of every process
+    assignment        : np.ndarray  # (P,) current machine of every process
+    usage             : np.ndarray  # (M, R) current usage
+    service_moved     : np.ndarray  # (S,) processes of each service away from their original machine
+    moved_hist        : np.ndarray  # moved_hist[c] = number of services with c moved processes
+    max_service_moved : int
+    cost              : int         # Current total cost
+
+    def __init__(self, model: RoadefModel, initial_assignment: np.ndarray, assignment: np.ndarray = None):
+        self.model = model
+        self.initial_assignment = np.asarray(initial_assignment)
+        self.reset(self.initial_assignment if assignment is None else assignment)
+
+    def reset(self, assignment: np.ndarray):
+        m = self.model
+        self.assignment = np.array(assignment, copy=True)
+        self.usage = m.initial_usage(self.assignment)
+
+        moved = self.assignment != self.initial_assignment
+        self.service_moved = np.bincount(m.process_service[moved], minlength=m.n_services)
+        self.moved_hist = np.bincount(self.service_moved, minlength=np.bincount(m.process_service, minlength=1).max() + 1) # Up to the largest service
+        self.max_service_moved = int(self.service_moved.max(initial=0))
+
+        self.cost = int(CostEvaluator(m, self.initial_assignment).total_cost(self.assignment)[0])
+
+    # >>>>> Per-machine cost terms >>>>>
+
+    def __machine_cost(self, usage_row: np.ndarray, machine: int) -> int:
+        m = self.model
+        load = int(np.dot(np.maximum(usage_row - m.safety_capacity[machine], 0), m.load_cost_weights))
+        if not m.n_balances: return load
+        remaining = m.capacity[machine] - usage_row
+        balance = np.maximum(m.balance_targets * remaining[m.balance_resources[:, 0]] - remaining[m.balance_resources[:, 1]], 0)
+        return load + int(np.dot(balance, m.balance_weights))
+
+    def __service_move_delta(self, service: int, change: int) -> int:
+        """
+        Change of max_s(moved processes of s) when one service's counter changes by `change` (-1, 0 or +1).
+        """
+        count = self.service_moved[service]
+        if change > 0: return max(self.max_service_moved, count + 1) - self.max_service_moved
+        if change < 0 and count == self.max_service_moved and self.moved_hist[count] == 1: return -1
+        return 0
+
+    def delta(self, p: int, machine: int) -> int:
+        """
+        Change of the total cost if process p moves to `machine` (negative = improvement).
+        """
+        m = self.model
+        src = self.assignment[p]
+        if src == machine: return 0
+
+        req = m.requirements[p]
+        load_balance = (self.__machine_cost(self.usage[src] - req, src) - self.__machine_cost(self.usage[src], src)
+                        + self.__machine_cost(self.usage[machine] + req, machine) - self.__machine_cost(self.usage[machine], machine))
+
+        origin = self.initial_assignment[p]
+        moved_change = int(machine != origin) - int(src != origin)
+        process_move = m.weight_process_move * m.process_move_cost[p] * moved_change
+        machine_move = m.weight_machine_move * (m.machine_move_cost[origin, machine] - m.machine_move_cost[origin, src])
+        service_move = m.weight_service_move * self.__service_move_delta(m.process_service[p], moved_change)
+
+        return int(load_balance + process_move + machine_move + service_move)
+
+    def fits(self, p: int, machine: int) -> bool:
+        """
+        Capacity check of the destination machine (other constraints are not tracked incrementally).
+        """
+        if self.assignment[p] == machine: return True
+        return bool(np.all(self.usage[machine] + self.model.requirements[p] <= self.model.capacity[machine]))
+
+    def apply(self, p: int, machine: int) -> int:
+        """
+        Commit the move of process p to `machine`, returning its cost delta.
+        """
+        m = self.model
+        d = self.delta(p, machine)
+        src = self.assignment[p]
+        if src == machine: return 0
+
+        req = m.requirements[p]
+        self.usage[src] -= req
+        self.usage[machine] += req
+        self.assignment[p] = machine
+
+        origin = self.initial_assignment[p]
+        moved_change = int(machine != origin) - int(src != origin)
+        if moved_change:
+            service = m.process_service[p]
+            count = self.service_moved[service]
+            self.moved_hist[count] -= 1
+            self.moved_hist[count + moved_change] += 1
+            self.service_moved[service] = count + moved_change
+            if moved_change > 0: self.max_service_moved = max(self.max_service_moved, count + 1)
+            elif self.moved_hist[self.max_service_moved] == 0: self.max_service_moved -= 1
+
+        self.cost += d
+        return d
+
+    def replay(self, ps: np.ndarray, machines: np.ndarray) -> np.ndarray:
+        """
+        Apply a stream of moves in order and return the cost delta of each. Moves with negative IDs are skipped (delta 0).
+        """
+        ps, machines = np.asarray(ps), np.asarray(machines)
+        deltas = np.zeros(len(ps), dtype=np.int64)
+        for i, (p, machine) in enumerate(zip(ps.tolist(), machines.tolist())):
+            if p >= 0 and machine >= 0: deltas[i] = self.apply(p, machine)
+        return deltas
+
+    @prof.profiled('cost.move_deltas')
+    def move_deltas(self, ps: np.ndarray, machines: np.ndarray) -> np.ndarray:
+        """
+        Vectorized what-if: cost delta of each candidate move (ps[i] -> machines[i]) applied alone to the current state.
+        """
+        m = self.model
+        ps, machines = np.asarray(ps), np.asarray(machines)
+        src = self.assignment[ps]
+        req = m.requirements[ps]
+
+        load_balance = (self.__machine_costs(self.usage[src] - req, src) - self.__machine_costs(self.usage[src], src)
+                        + self.__machine_costs(self.usage[machines] + req, machines) - self.__machine_costs(self.usage[machines], machines))
+
+        origin = self.initial_assignment[ps]
+        moved_change = (machines != origin).astype(np.int64) - (src != origin)
+        process_move = m.weight_process_move * m.process_move_cost[ps] * moved_change
+        machine_move = m.weight_machine_move * (m.machine_move_cost[origin, machines] - m.machine_move_cost[origin, src])
+
+        count = self.service_moved[m.process_service[ps]]
+        top = self.max_service_moved
+        service_change = np.where(moved_change > 0, np.maximum(top, count + 1) - top,
+                                  np.where((moved_change < 0) & (count == top) & (self.moved_hist[top] == 1), -1, 0))
+        service_move = m.weight_service_move * service_change
+
+        deltas = load_balance + process_move + machine_move + service_move
+        return np.where(src == machines, 0, deltas)
+
+    def __machine_costs(self, usage_rows: np.ndarray, machines: np.ndarray) -> np.ndarray:
+        m = self.model
+        load = np.maximum(usage_rows - m.safety_capacity[machines], 0) @ m.load_cost_weights
+        if not m.n_balances: return load
+        remaining = m.capacity[machines] - usage_rows
+        balance = np.maximum(m.balance_targets * remaining[:, m.balance_resources[:, 0]] - remaining[:, m.balance_resources[:, 1]], 0)
+        return load + balance @ m.balance_weights
+
+def validate_logged_moves(ds, model: RoadefModel, initial_assignment: np.ndarray, rtol: float = 1e-6,
+                          check_improvement: bool = True, improvement_atol: float = 1e-3) -> dict:
+    """
+    Replay the logged move stream of a dataset through an IncrementalEvaluator and compare each move's
+    recomputed cost delta with the change of the logged SolutionCost, and the recomputed improvement over the
+    initial cost, (initial_cost - cost) / initial_cost * 100, with the logged Improvement (jask logs this percentage
+    with 4 decimals; gavra logs 0 and mehta -moveCost, pass check_improvement=False for their logs).
+
+    Returns a dict of arrays: 'delta' (recomputed), 'logged_delta' (SolutionCost difference to the previous move,
+    the first move is compared against the initial cost), 'improvement' (recomputed, %), 'logged_improvement',
+    'cost_mismatch' (delta != logged_delta), 'improvement_mismatch' (|improvement - logged| > improvement_atol
+    percentage points, all False without check_improvement) and 'mismatch' (either).
+    """
+    inc = IncrementalEvaluator(model, initial_assignment)
+    initial_cost = inc.cost
+    delta = inc.replay(ds.ps_id, ds.dest_machine_id)
+
+    solution_cost = np.asarray(ds.solution_cost, dtype=np.int64)
+    logged_delta = np.diff(solution_cost, prepend=initial_cost)
+    cost_mismatch = ~np.isclose(delta, logged_delta, rtol=rtol, atol=0)
+
+    improvement = (initial_cost - (initial_cost + np.cumsum(delta))) / initial_cost * 100 if initial_cost else np.zeros(len(delta))
+    logged_improvement = np.asarray(ds.solution_cost_improvement, dtype=float)
+    improvement_mismatch = ~np.isclose(improvement, logged_improvement, rtol=0, atol=improvement_atol) if check_improvement \
+        else np.zeros(len(delta), dtype=bool)
+
+    mismatch = cost_mismatch | improvement_mismatch
+    if mismatch.any():
+        print(f"Warning: {np.count_nonzero(mismatch)} of {len(delta)} logged moves disagree with the replay "
+              f"({np.count_nonzero(cost_mismatch)} cost deltas, {np.count_nonzero(improvement_mismatch)} improvements).")
+
+    return {'delta': delta, 'logged_delta': logged_delta, 'improvement': improvement, 'logged_improvement': logged_improvement,
+            'cost_mismatch': cost_mismatch, 'improvement_mismatch': improvement_mismatch, 'mismatch': mismatch}
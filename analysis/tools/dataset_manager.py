@@ -1,14 +1,61 @@
+import os
 import numpy as np
 import pandas as pd
-import ast
-import inspect
 
-DEBUG = True
-
-def log(message):
-    # Get the name of the function that called
-    if not DEBUG: return
-    caller = inspect.currentframe().f_back.f_code.co_name
+from tools import profiling_utils as prof
+from tools.anytime_utils import time_to_targets
+from tools.cache_utils import cached_columns, source_signature
+from tools.dataset_registry import DATASETS_DIR, parse_instance, default_registry
+from tools.dataset_utils import MoveIndex, merge_role_snapshots
+from tools.parsing_utils import parse_reassignments_frame, read_reassignments_chunked, count_rows, row_offset, read_header, SUM_SUFFIX
+from tools.schema_utils import TRACKING_FORMAT, detect_format, read_normalized, compact_columns, model_bounds
+
+DEBUG = False # Print samples of computed arrays (see log); timings and counters are collected by profiling_utils
+
+DEFAULT_REASSIGNMENTS_PATH = os.path.join(DATASETS_DIR, "jask_a12", "sol_partial.csv")
+
+# >>>>> CSV column -> ReassignmentsDataset attribute >>>>>
+COLUMN_ATTRIBUTES = {
+    'MoveNum'                   : 'move_id',
+    'ProcessID'                 : 'ps_id',
+    'SolutionId'                : 'solution_id',
+    'Timestamp'                 : 'timestamp',
+    'Service'                   : 'service_id',
+    'SourceMachine'             : 'src_machine_id',
+    'SourceMachineProcessCount' : 'src_machine_ps_count',
+    'DestMachine'               : 'dest_machine_id',
+    'DestMachineProcessCount'   : 'dest_machine_ps_count',
+
+    'MoveCost'                  : 'move_cost',
+    'LoadCost'                  : 'load_cost',
+    'BalanceCost'               : 'balance_cost',
+    'SolutionCost'              : 'solution_cost',
+    'Improvement'               : 'solution_cost_improvement',
+
+    'ProcessResourceRequirements'              : 'ps_requirements',
+    'SourceMachineResourceUsage'               : 'src_machine_usage_mtx',
+    'SourceMachineCapacities'                  : 'src_machine_capacity_mtx',
+    'SourceMachineTransientUsage'              : 'src_machine_transient_usage_mtx',
+    'DestMachineResourceUsage'                 : 'dest_machine_usage_mtx',
+    'DestMachineCapacities'                    : 'dest_machine_capacity_mtx',
+    'DestMachineTransientUsage'                : 'dest_machine_transient_usage_mtx',
+
+    'ProcessResourceRequirements' + SUM_SUFFIX : 'ps_size', # Sum of each row, e.g. total requirements per process
+    'SourceMachineResourceUsage' + SUM_SUFFIX  : 'src_machine_usage',
+    'SourceMachineCapacities' + SUM_SUFFIX     : 'src_machine_capacity',
+    'SourceMachineTransientUsage' + SUM_SUFFIX : 'src_machine_transient_usage',
+    'DestMachineResourceUsage' + SUM_SUFFIX    : 'dest_machine_usage',
+    'DestMachineCapacities' + SUM_SUFFIX       : 'dest_machine_capacity',
+    'DestMachineTransientUsage' + SUM_SUFFIX   : 'dest_machine_transient_usage',
+}
+
+# >>>>> Attribute -> CSV column it is parsed from (list columns fill both the matrix and the row sums) >>>>>
+ATTRIBUTE_COLUMNS = {attr: col[:-len(SUM_SUFFIX)] if col.endswith(SUM_SUFFIX) else col for col, attr in COLUMN_ATTRIBUTES.items()}
+
+def log(caller: str, message: str):
+    """
+    Print a diagnostic line. Call sites check DEBUG before building the message, so nothing is formatted while it is off.
+    """
     print(f"[{caller}] - {message}")
 
 class SolutionStatesDataset:
@@ -17,20 +64,109 @@ class SolutionStatesDataset:
     # 2,1035867931,2.4285,1753739591608,"HillClimber-Greedy",1,1035867720,0,200,1,10,0,true
     # 3,1020978102,3.8310,1753739591610,"HillClimber-Greedy",4,1020977790,0,300,2,10,0,true
 
-    def __init__(self, path):
-        pass
+    solution_id              : np.ndarray  # Solution ID
+    cost                     : np.ndarray  # Total Solution Cost
+    improvement              : np.ndarray  # Improvement (%) over the initial solution
+    timestamp                : np.ndarray  # Epoch milliseconds (int64)
+    solver_method            : np.ndarray  # Solver method codes (small ints), see solver_methods
+    solver_methods           : np.ndarray  # Solver method names, solver_methods[code]
+    n_reassignments          : np.ndarray  # Reassignments since the previous state
+    load_cost                : np.ndarray  # Load Cost
+    balance_cost             : np.ndarray  # Balance Cost
+    machine_move_cost        : np.ndarray  # Machine Move Cost
+    process_move_cost        : np.ndarray  # Process Move Cost
+    service_move_cost        : np.ndarray  # Service Move Cost
+    n_constraints_unsatisfied: np.ndarray  # Unsatisfied Constraints
+    is_feasible              : np.ndarray  # Feasibility flag (bool)
+
+    COLUMNS = {
+        'SolutionId'               : ('solution_id', np.int64),
+        'Cost'                     : ('cost', np.int64),
+        'Improvement'              : ('improvement', np.float64),
+        'Timestamp'                : ('timestamp', np.int64),
+        'NumReassignments'         : ('n_reassignments', np.int32),
+        'LoadCost'                 : ('load_cost', np.int64),
+        'BalanceCost'              : ('balance_cost', np.int64),
+        'MachineMoveCost'          : ('machine_move_cost', np.int64),
+        'ProcessMoveCost'          : ('process_move_cost', np.int64),
+        'ServiceMoveCost'          : ('service_move_cost', np.int64),
+        'NumConstraintsUnsatisfied': ('n_constraints_unsatisfied', np.int32),
+    }
+
+    @prof.profiled('dataset.load_solution_states')
+    def __init__(self, path, use_cache: bool = True):
+        """
+        Load a solution states CSV into typed arrays: SolverMethod is dictionary-encoded into
+        small integer codes, IsFeasible is stored as bool and Timestamp as int64 epoch milliseconds.
+        """
+        columns, _ = cached_columns(path, self.__parse_csv, use_cache=use_cache)
+        print(f"Loaded {len(columns['SolutionId'])} solution states from dataset: {path}.")
+
+        for col, (attr, _) in self.COLUMNS.items():
+            setattr(self, attr, columns[col])
+        self.solver_method  = columns['SolverMethod']
+        self.solver_methods = columns['SolverMethod.categories']
+        self.is_feasible    = columns['IsFeasible']
+
+    @staticmethod
+    def __parse_csv(path: str) -> tuple[dict, dict]:
+        dtypes = {col: dtype for col, (_, dtype) in SolutionStatesDataset.COLUMNS.items()}
+        df = pd.read_csv(path, dtype={**dtypes, 'SolverMethod': 'category'},
+                         true_values=['true', 'True'], false_values=['false', 'False'])
+
+        columns = {col: df[col].to_numpy() for col in dtypes}
+        methods = df['SolverMethod'].cat
+        columns['SolverMethod'] = methods.codes.to_numpy().astype(np.min_scalar_type(max(len(methods.categories), 1)))
+        columns['SolverMethod.categories'] = methods.categories.to_numpy().astype(str)
+        columns['IsFeasible'] = df['IsFeasible'].to_numpy(dtype=bool)
+        return columns, {}
+
+    def method_code(self, method: str) -> int:
+        matches = np.flatnonzero(self.solver_methods == method)
+        if not matches.size: raise KeyError(f"Unknown solver method: {method}. Known methods: {list(self.solver_methods)}")
+        return int(matches[0])
+
+    def method_counts(self) -> dict:
+        counts = np.bincount(self.solver_method, minlength=len(self.solver_methods))
+        return dict(zip(self.solver_methods.tolist(), counts.tolist()))
+
+    def cost_trajectory(self, method: str = None, best_so_far: bool = False, feasible_only: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return (elapsed_ms, cost) of the logged states, optionally restricted to one solver method or to feasible states.
+        With best_so_far, cost is the running minimum (anytime curve).
+        """
+        mask = np.ones(len(self.cost), dtype=bool)
+        if method is not None: mask &= (self.solver_method == self.method_code(method))
+        if feasible_only: mask &= self.is_feasible
+
+        elapsed = self.timestamp[mask] - self.timestamp[0]
+        cost = self.cost[mask]
+        if best_so_far: cost = np.minimum.accumulate(cost)
+        return elapsed, cost
+
+    def time_to_target(self, targets, relative: bool = False, feasible_only: bool = True) -> np.ndarray:
+        """
+        Elapsed milliseconds until the best-so-far cost first reaches each target cost (NaN if never reached).
+        With relative=True, targets are fractions of the initial cost, e.g. [0.99, 0.95]. See anytime_utils.time_to_targets.
+        """
+        targets = np.atleast_1d(np.asarray(targets, dtype=float))
+        if relative: targets = targets * self.cost[0]
+        return time_to_targets(*self.cost_trajectory(feasible_only=feasible_only), targets)
 
 class ReassignmentsDataset:
-    # timestamp       : pd.Series  # Timestamps in pandas datetime format
+    # Fixed attribute set: no per-instance __dict__ next to the column arrays
+    __slots__ = tuple(COLUMN_ATTRIBUTES.values()) + ('malformed_rows', '_change_points', '_indexes', '_lazy')
 
     # >>>>> Reassignment (Move) Data >>>>>
     move_id    : np.ndarray  # Reassignment (Move) ID
     solution_id: np.ndarray  # Solution ID
+    timestamp  : np.ndarray  # Epoch milliseconds (jask, gavra) or milliseconds since start (mehta)
     service_id : np.ndarray  # Service ID
 
     # >>>>> Process Data >>>>>
     ps_id           : np.ndarray  # Process ID
     ps_size         : np.ndarray  # Total Process Requirements (sum per process)
+    ps_requirements : np.ndarray  # Process Requirements per resource (moves x resources)
 
     # >>>>> Machine, Solution, and Service Data >>>>>
     src_machine_id             : np.ndarray  # Source Machine ID
@@ -45,6 +181,15 @@ class ReassignmentsDataset:
     dest_machine_transient_usage: np.ndarray  # Destination Machine Transient Usage
     dest_machine_ps_count       : int          # Destination Machine Process Count
 
+    # >>>>> Per-resource Machine Matrices (moves x resources) >>>>>
+    src_machine_usage_mtx            : np.ndarray
+    src_machine_capacity_mtx         : np.ndarray
+    src_machine_transient_usage_mtx  : np.ndarray
+    dest_machine_usage_mtx           : np.ndarray
+    dest_machine_capacity_mtx        : np.ndarray
+    dest_machine_transient_usage_mtx : np.ndarray
+    malformed_rows                   : dict        # Column name -> indices of rows that failed to parse or could not be derived
+
     # >>>>> Cost Data >>>>>
     solution_cost_improvement: np.ndarray  # Improvement from Process Reassignment
     move_cost                : np.ndarray  # Move Cost
@@ -52,104 +197,212 @@ class ReassignmentsDataset:
     balance_cost             : np.ndarray  # Balance Cost
     solution_cost            : np.ndarray  # Solution Cost
 
-    def __init__(self, dataset_fraction: float = 1.0):
-        raw_reassignments_dataset_path = "/home/pbiel/repos/mrp/analysis/datasets/jask_a12/sol_partial.csv"
-        df = pd.read_csv(raw_reassignments_dataset_path)
-        print(f"Loading {len(df)} entries frm dataset: {raw_reassignments_dataset_path}.")
+    @prof.profiled('dataset.load')
+    def __init__(self, dataset_fraction: float = 1.0, path: str = DEFAULT_REASSIGNMENTS_PATH, use_cache: bool = True,
+                 row_range: tuple = None, chunksize: int = None, instance: str = None, lazy: bool = False):
+        """
+        Load a reassignments tracking CSV. Parsed columns are cached on disk (see cache_utils),
+        so repeated loads of an unchanged file memory-map the cache instead of parsing the CSV again.
+        Entries are keyed by the file and the instance model used to parse it, see __cache_variant.
 
-        # Select only portion of the dataset
-        N = int(len(df) * dataset_fraction)
-        df = df[:N]
-        # df = df.sample(frac=0.2, random_state=42) # Sample 20% of the dataset
-        
-        print(f"Sampled dataset to {len(df)} entries.")
+        Select a portion of the log with either `dataset_fraction` (leading fraction of all moves)
+        or `row_range=(start, stop)`. With `chunksize` set and no warm cache, the CSV is streamed in
+        chunks and reading stops after the selected rows, so memory is bounded by the selection, not the file.
+
+        mehta's tracking formats are normalized to the same columns (see schema_utils). Columns they do not log are
+        derived from the model of `instance` (default: the instance named in the path) and listed in malformed_rows otherwise.
+
+        ID, process count and resource columns are stored in the smallest signed dtype that holds the instance's bounds
+        (see compact_columns), e.g. int16 process and machine IDs. Cost and timestamp columns stay int64. See memory_footprint().
+
+        With `lazy=True` and no warm cache, only the schema and the byte offset of the selected rows are read here;
+        each attribute is parsed from its own CSV column on first access (see __getattr__), so columns that are never
+        used (e.g. the list columns) are never parsed. mehta files are always loaded eagerly, their derived columns
+        need the whole move stream.
+        """
+        self._lazy = None
+        instance = instance or parse_instance(path)
+        variant = self.__cache_variant(instance)
+        fmt = detect_format(path)
+
+        # Lazy (tracking files only) and streaming loads only use a warm cache, a miss is not parsed into it
+        lazy = lazy and fmt == TRACKING_FORMAT
+        cached = cached_columns(path, None, use_cache=use_cache, variant=variant) if lazy or chunksize is not None else None
+        if lazy and cached is None:
+            self.__init_lazy(path, dataset_fraction, row_range, instance)
+            return
+        if cached is None:
+            normalize = fmt != TRACKING_FORMAT
+            model_kwargs = self.__instance_model(instance)
+            if normalize and not model_kwargs: print(f"Warning: no model for {path}, model-dependent columns are left empty.")
+            bounds = model_bounds(model_kwargs['model']) if model_kwargs else None
+
+            def parse(p):
+                columns, malformed_rows = read_normalized(p, **model_kwargs) if normalize else self.__parse_csv(p)
+                return compact_columns(columns, bounds), malformed_rows
+
+        if cached is None and chunksize is not None: # >>>>> Streaming mode >>>>>
+            start, stop = row_range if row_range is not None else (0, int(count_rows(path) * dataset_fraction))
+            print(f"Streaming entries [{start}, {stop}) from dataset: {path}.")
+            if normalize: columns, malformed_rows = read_normalized(path, start, stop, chunksize=chunksize, **model_kwargs)
+            else: columns, malformed_rows = read_reassignments_chunked(path, start, stop, chunksize=chunksize)
+            columns = compact_columns(columns, bounds)
+
+        else: # >>>>> Full (cached) mode >>>>>
+            columns, malformed_rows = cached or cached_columns(path, parse, use_cache=use_cache, variant=variant)
+            n_moves = len(columns['MoveNum'])
+            print(f"Loading {n_moves} entries frm dataset: {path}.")
+
+            # Select only portion of the dataset
+            start, stop = row_range if row_range is not None else (0, int(n_moves * dataset_fraction))
+            columns = {col: arr[start:stop] for col, arr in columns.items()}
+            malformed_rows = {col: rows[(rows >= start) & (rows < stop)] - start for col, rows in malformed_rows.items()}
+            # df = df.sample(frac=0.2, random_state=42) # Sample 20% of the dataset
+
+        N = len(columns['MoveNum'])
+        print(f"Sampled dataset to {N} entries.")
+
+        self.malformed_rows = malformed_rows
+        for col, rows in self.malformed_rows.items():
+            if len(rows): print(f"Warning: {len(rows)} malformed entries in column {col}.")
 
         # >>>>> Data initialization >>>>>
 
-        # self.timestamp = pd.to_datetime(self.df['Timestamp'], unit='ms', format='%Y-%m-%d %H:%M:%S.%f')
-        self.move_id               = df['MoveNum'].values
-        self.ps_id                 = df['ProcessID'].values
-        self.solution_id           = df['SolutionId'].values
-        self.service_id            = df['Service'].values
-        self.src_machine_id        = df['SourceMachine'].values
-        self.src_machine_ps_count  = df['SourceMachineProcessCount'].values
-        self.dest_machine_id       = df['DestMachine'].values
-        self.dest_machine_ps_count = df['DestMachineProcessCount'].values
-
-        self.move_cost                 = df['MoveCost'].values
-        self.load_cost                 = df['LoadCost'].values
-        self.balance_cost              = df['BalanceCost'].values
-        self.solution_cost             = df['SolutionCost'].values
-        self.solution_cost_improvement = df['Improvement'].values
-
-        # >>>>> Process and Machine Resources, Usages, and Capacities >>>>>
-
-        self.ps_size                      = self.__sum_matrix(df['ProcessResourceRequirements'], axis=1)
-        self.src_machine_usage            = self.__sum_matrix(df['SourceMachineResourceUsage'], axis=1)
-        self.src_machine_capacity         = self.__sum_matrix(df['SourceMachineCapacities'], axis=1)
-        self.src_machine_transient_usage  = self.__sum_matrix(df['SourceMachineTransientUsage'], axis=1)
-        self.dest_machine_usage           = self.__sum_matrix(df['DestMachineResourceUsage'], axis=1)
-        self.dest_machine_capacity        = self.__sum_matrix(df['DestMachineCapacities'], axis=1)
-        self.dest_machine_transient_usage = self.__sum_matrix(df['DestMachineTransientUsage'], axis=1)
+        for col, attr in COLUMN_ATTRIBUTES.items():
+            setattr(self, attr, columns[col])
 
         print("Completed loading dataset.")
 
-    def __parse_raw_list_of_values(self, ls) -> np.ndarray:
-        try:              return np.array(ast.literal_eval(ls), dtype=int)
-        except Exception: return np.zeros(len(ls), dtype=int)
-    
-    def __sum_matrix(self, df, axis=1) -> np.ndarray:
-        df_parsed = df.apply(self.__parse_raw_list_of_values)
-        np_mtx = np.stack(df_parsed.values)
-        np_arr = np.sum(np_mtx, axis=axis) # Sum each row, e.g. total requirements per process
-        return np_arr
+    def __init_lazy(self, path: str, dataset_fraction: float, row_range: tuple, instance: str):
+        start, stop = row_range if row_range is not None else (0, int(count_rows(path) * dataset_fraction))
+        self._lazy = {
+            'path'    : path,
+            'header'  : read_header(path),
+            'offset'  : row_offset(path, start),
+            'n_rows'  : max(stop - start, 0),
+            'instance': instance or parse_instance(path),
+            'bounds'  : None, # Model bounds, resolved on the first parsed column
+        }
+        self.malformed_rows = {}
+        print(f"Lazily loading entries [{start}, {stop}) from dataset: {path}.")
+
+    def __getattr__(self, name: str):
+        """
+        Called only for attributes that are not set yet: in lazy mode, parse the column behind `name` and keep it.
+        """
+        lazy = self._lazy if name != '_lazy' else None
+        if lazy is None or name not in ATTRIBUTE_COLUMNS: raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        col = ATTRIBUTE_COLUMNS[name]
+        if col not in lazy['header']: raise AttributeError(f"Column {col} (attribute '{name}') is not in {lazy['path']}.")
+        if lazy['bounds'] is None:
+            model_kwargs = self.__instance_model(lazy['instance'])
+            lazy['bounds'] = model_bounds(model_kwargs['model']) if model_kwargs else {}
+
+        with prof.section('dataset.lazy_column'):
+            with open(lazy['path'], 'rb') as f:
+                f.seek(lazy['offset'])
+                df = pd.read_csv(f, names=lazy['header'], header=None, usecols=[col], nrows=lazy['n_rows'])
+            columns, malformed_rows = parse_reassignments_frame(df)
+            columns = compact_columns(columns, lazy['bounds'])
+        self.malformed_rows.update(malformed_rows)
+        for rows in malformed_rows.values(): print(f"Warning: {len(rows)} malformed entries in column {col}.")
+
+        for parsed_col, values in columns.items(): # A list column sets both its matrix and its row sums
+            if parsed_col in COLUMN_ATTRIBUTES: setattr(self, COLUMN_ATTRIBUTES[parsed_col], values)
+        if DEBUG: log("__getattr__", f"parsed column {col} for attribute {name}")
+        return object.__getattribute__(self, name)
+
+    @staticmethod
+    def __parse_csv(path: str) -> tuple[dict, dict]:
+        return parse_reassignments_frame(pd.read_csv(path))
+
+    @staticmethod
+    def __cache_variant(instance: str) -> dict:
+        """
+        Cache variant of a load: the instance whose model derives mehta's columns and bounds the dtypes, identified
+        by its model and assignment files, or None if there is no model (see __instance_model).
+        """
+        files = default_registry().instance_files(instance) if instance else {}
+        if 'model' not in files or 'assignment' not in files: return {'instance': None}
+        return {'instance': instance, 'model': source_signature(files['model']), 'assignment': source_signature(files['assignment'])}
+
+    @staticmethod
+    def __instance_model(instance: str) -> dict:
+        """
+        Model and initial assignment of an instance, for dtype bounds and deriving the columns mehta does not log.
+        Empty if the instance is unknown.
+        """
+        from tools.model_utils import instance_model, instance_assignment
+        try: return {'model': instance_model(instance), 'initial_assignment': instance_assignment(instance)} if instance else {}
+        except LookupError: return {}
     
-    def transition_statistics(self):
-        solution_states = self.solution_state_change_points()
-        transitions_reassignments_counts = self.transitions_reassignments_count()
+    @prof.profiled('stats.transition_statistics')
+    def transition_statistics(self, values=None):
+        """
+        Per-transition sum, mean, min, max and range (max - min) of a per-move column, in one pass of segment reductions.
+        `values` is an array aligned with the moves or an attribute name, e.g. 'load_cost' or 'move_cost'; defaults to ps_size.
+        """
+        if values is None: values = self.ps_size
+        elif isinstance(values, str): values = getattr(self, values)
+        values = np.asarray(values)
 
-        transition_sizes = np.zeros(len(solution_states) - 1, dtype=int)
-        transition_means = np.zeros(len(solution_states) - 1, dtype=float)
-        transition_min = np.zeros(len(solution_states) - 1, dtype=int)
-        transition_max = np.zeros(len(solution_states) - 1, dtype=int)
-        transition_diff = np.zeros(len(solution_states) - 1, dtype=float)
+        solution_states = self.solution_state_change_points()
+        transition_starts = solution_states[:-1]
+        transitions_reassignments_counts = np.diff(solution_states)
 
-        for i in range(len(solution_states) - 1):
-            transition_start = solution_states[i]
-            transition_end = solution_states[i + 1]
-            transition_ps_size = self.ps_size[transition_start:transition_end]
+        if not len(transition_starts):
+            empty = np.zeros(0, dtype=values.dtype)
+            return empty, np.zeros(0, dtype=float), empty, empty, np.zeros(0, dtype=float)
 
-            transition_moves_count = transitions_reassignments_counts[i]
-            transition_sizes[i] = np.sum(transition_ps_size)
-            transition_means[i] = transition_sizes[i] / transition_moves_count
-            transition_min[i] = np.min(transition_ps_size)
-            transition_max[i] = np.max(transition_ps_size)
-            transition_diff[i] = transition_max[i] - transition_min[i]
+        transition_sizes = np.add.reduceat(values, transition_starts, dtype=np.result_type(values.dtype, np.int64)) # Compact dtypes would overflow
+        transition_means = transition_sizes / transitions_reassignments_counts
+        transition_min = np.minimum.reduceat(values, transition_starts)
+        transition_max = np.maximum.reduceat(values, transition_starts)
+        transition_diff = (transition_max - transition_min).astype(float)
 
-            if DEBUG and (i < 5 or i > len(solution_states) - 5):
-                log(f"transition {i}: moves: {len(transition_ps_size)}, total_size={transition_sizes[i]}, mean={transition_means[i]}, min={transition_min[i]}, max={transition_max[i]}, diff={transition_diff[i]}")
+        if DEBUG:
+            n = len(transition_starts)
+            for i in [*range(min(5, n)), *range(max(5, n - 4), n)]:
+                log("transition_statistics", f"transition {i}: moves: {transitions_reassignments_counts[i]}, total_size={transition_sizes[i]}, mean={transition_means[i]}, min={transition_min[i]}, max={transition_max[i]}, diff={transition_diff[i]}")
 
         return transition_sizes, transition_means, transition_min, transition_max, transition_diff
 
+    def cost_over_time(self, best_so_far: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return (elapsed seconds, solution cost) of every move in time order, see anytime_utils.trajectory.
+        With best_so_far, cost is the running minimum (anytime curve).
+        """
+        from tools.anytime_utils import trajectory
+        return trajectory(self, best_so_far=best_so_far)
+
     def transitions_reassignments_count(self) -> np.ndarray:
         solution_states = self.solution_state_change_points()
         transition_moves = np.diff(solution_states)
 
-        if DEBUG: log(f"shape: {np.shape(transition_moves)}\n{transition_moves[:5]} ... {transition_moves[-5:]}")
+        if DEBUG: log("transitions_reassignments_count", f"shape: {np.shape(transition_moves)}\n{transition_moves[:5]} ... {transition_moves[-5:]}")
 
         return transition_moves
 
+    @prof.profiled('stats.solution_cost_improvement_deltas')
     def solution_cost_improvement_deltas(self) -> list[float]:
         change_idx = self.solution_state_change_points()  # returns; [1, 2, 5, 14, ...]
         transition_states_idx = change_idx[:-1]
         deltas = np.diff(self.solution_cost_improvement[transition_states_idx], prepend=0)
         deltas = np.round(deltas, 5)
 
-        if DEBUG: log(f"shape: {np.shape(deltas)}\nsamples: {deltas[:5]} ... {deltas[-5:]}")
+        if DEBUG: log("solution_cost_improvement_deltas", f"shape: {np.shape(deltas)}\nsamples: {deltas[:5]} ... {deltas[-5:]}")
         
         return deltas
 
     def solution_state_change_points(self) -> np.ndarray:
+        """
+        Indices where a new solution state starts, with the total number of moves appended as the final boundary.
+        Computed once and cached on the instance.
+        """
+        if getattr(self, '_change_points', None) is not None: return self._change_points
+
+        prof.count('stats.change_points_computed')
         new_solution_idx = np.flatnonzero(np.diff(self.solution_id) != 0) + 1
         # Prepend transition from initial assignment to solution 1
         new_solution_idx = np.r_[0, new_solution_idx]
@@ -158,20 +411,45 @@ class ReassignmentsDataset:
             # This is the case when the last solution has moves but is not counted in np.diff
             new_solution_idx = np.r_[new_solution_idx, len(self.move_id)]
 
-        if DEBUG: log(f"shape: {np.shape(new_solution_idx)}\n{new_solution_idx[:5]} ... {new_solution_idx[-5:]}")
+        if DEBUG: log("solution_state_change_points", f"shape: {np.shape(new_solution_idx)}\n{new_solution_idx[:5]} ... {new_solution_idx[-5:]}")
 
+        self._change_points = new_solution_idx
         return new_solution_idx
 
-    def get_process_moves(self, process_id, move_ids, process_ids, src_machines, dest_machines, unique=False, print_results=False):
+    def move_index(self, key: str) -> MoveIndex:
+        """
+        Inverted index of the moves by 'process', 'src_machine' or 'dest_machine' ID, built on first use and cached.
+        Lookups return chronological zero-copy views instead of scanning the whole log.
+        """
+        if getattr(self, '_indexes', None) is None: self._indexes = {}
+        if key not in self._indexes:
+            if key == 'process':
+                columns = {'move_id': self.move_id, 'src_machine_id': self.src_machine_id, 'dest_machine_id': self.dest_machine_id}
+                self._indexes[key] = MoveIndex(self.ps_id, columns=columns)
+            elif key == 'src_machine': self._indexes[key] = MoveIndex(self.src_machine_id, columns={'move_id': self.move_id, 'ps_id': self.ps_id})
+            elif key == 'dest_machine': self._indexes[key] = MoveIndex(self.dest_machine_id, columns={'move_id': self.move_id, 'ps_id': self.ps_id})
+            else: raise ValueError(f"Unknown index key: {key}. Use 'process', 'src_machine' or 'dest_machine'.")
+
+            if DEBUG: log("move_index", f"built {key} index over {len(self._indexes[key])} keys")
+
+        return self._indexes[key]
+
+    @prof.profiled('query.process_moves')
+    def get_process_moves(self, process_id, move_ids=None, process_ids=None, src_machines=None, dest_machines=None, unique=False, print_results=False):
         """
         Get all moves for a given process ID.
         If unique is True, return unique source and destination machines.
+        Without explicit arrays, the dataset's own columns are served from the process index.
         """
-        mask = (process_ids == process_id)
+        if all(arr is None for arr in (move_ids, process_ids, src_machines, dest_machines)):
+            moves = self.move_index('process').lookup(process_id)
+            move_id_matches, src_machine_matches, dest_machine_matches = moves['move_id'], moves['src_machine_id'], moves['dest_machine_id']
+        else:
+            mask = (process_ids == process_id)
 
-        move_id_matches = move_ids[mask]
-        src_machine_matches = src_machines[mask]
-        dest_machine_matches = dest_machines[mask]
+            move_id_matches = move_ids[mask]
+            src_machine_matches = src_machines[mask]
+            dest_machine_matches = dest_machines[mask]
 
         if unique:
             # Preserve first-order seen while removing duplicates
@@ -191,20 +469,23 @@ class ReassignmentsDataset:
 
         return move_id_matches, src_machine_matches, dest_machine_matches
 
-    def get_machine_resource_usage(self, machine_id, src_machines, dest_machines, src_machine_usages, dest_machine_usages, print_results=False):
+    @prof.profiled('query.machine_resource_usage')
+    def get_machine_resource_usage(self, machine_id, src_machines=None, dest_machines=None, src_machine_usages=None, dest_machine_usages=None, print_results=False):
             """
-            Returns list where each element is the usage snapshot of the machine at the time of the move.
+            Returns array where each element is the usage snapshot of the machine at the time of the move, in chronological order.
+            Without explicit machine arrays, moves are found through the machine indexes; usages default to the summed usage columns.
             """
-            matches_as_src_machine  = np.where(src_machines == machine_id)[0]
-            matches_as_dest_machine = np.where(dest_machines == machine_id)[0]
-
-            machine_usages = []
+            if src_machine_usages is None: src_machine_usages = self.src_machine_usage
+            if dest_machine_usages is None: dest_machine_usages = self.dest_machine_usage
 
-            for idx in matches_as_src_machine:
-                machine_usages.append(src_machine_usages[idx])
+            if src_machines is None and dest_machines is None:
+                matches_as_src_machine  = self.move_index('src_machine').rows(machine_id)
+                matches_as_dest_machine = self.move_index('dest_machine').rows(machine_id)
+            else:
+                matches_as_src_machine  = np.flatnonzero(src_machines == machine_id)
+                matches_as_dest_machine = np.flatnonzero(dest_machines == machine_id)
 
-            for idx in matches_as_dest_machine:
-                machine_usages.append(dest_machine_usages[idx])
+            machine_usages = merge_role_snapshots(matches_as_src_machine, matches_as_dest_machine, src_machine_usages, dest_machine_usages)
 
             print(f"Returning {len(machine_usages)} results for machine {machine_id}.")
             if print_results:
@@ -213,6 +494,23 @@ class ReassignmentsDataset:
 
             return machine_usages
 
+    def memory_footprint(self, print_results=True) -> pd.DataFrame:
+        """
+        Bytes held by every column (memory-mapped cache columns included), largest first.
+        In lazy mode only the columns parsed so far are listed.
+        """
+        rows = []
+        for attr in COLUMN_ATTRIBUTES.values():
+            try: arr = object.__getattribute__(self, attr) # Does not fall back to __getattr__, so nothing is parsed here
+            except AttributeError: continue
+            rows.append((attr, str(arr.dtype), arr.shape, arr.nbytes))
+        footprint = pd.DataFrame(rows, columns=['attribute', 'dtype', 'shape', 'bytes']).sort_values('bytes', ascending=False, ignore_index=True)
+
+        if print_results:
+            print(footprint.to_string(index=False))
+            print(f"Total: {footprint['bytes'].sum() / 2**20:.1f} MiB.")
+        return footprint
+
     def metadata(self):
         print(">>> Basic Metadata >>>")
         print(f"Total Moves: {len(self.move_id)}")
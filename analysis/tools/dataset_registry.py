@@ -0,0 +1,193 @@
+import os
+import re
+import glob
+from dataclasses import dataclass, field
+
+REPO_ROOT = os.environ.get("MRP_ROOT", os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+DATASETS_DIR = os.path.join(REPO_ROOT, "analysis", "datasets")
+
+SOLVERS = ("jask", "gavra", "mehta")
+
+# >>>>> Tracking file name -> (kind, variant) >>>>>
+# kind: 'exploration' (all evaluated moves), 'accepted' (accepted transitions), 'solution_states', 'mehta' (mehta's own formats, normalized by schema_utils)
+_FILE_KINDS = [
+    (re.compile(r"^process_reassignments(?:_(sol\d))?\.csv$"),  "exploration"),
+    (re.compile(r"^accepted_reassignments(?:_(sol\d))?\.csv$"), "accepted"),
+    (re.compile(r"^solution_states(?:_(sol\d))?\.csv$"),        "solution_states"),
+    (re.compile(r"^mehta_reassignments()\.csv$"),               "mehta"),
+    (re.compile(r"^reassignment_.*_tracking()\.csv$"),          "mehta"),
+    (re.compile(r"^(.*)\.csv$"),                                 "exploration"), # Any other CSV in analysis/datasets
+]
+
+# >>>>> Final solution files (one machine ID per process), relative to the repository root >>>>>
+_SOLUTION_GLOBS = [
+    ("gavra", os.path.join("gavra", "results_*", "solution_*.txt")),
+    ("jask",  os.path.join("jask", "new_assignment_*.txt")),
+    ("mehta", os.path.join("mehta", "cblns", "reassignment_*.txt")),
+]
+
+_INSTANCE_RE = re.compile(r"(?<![a-z0-9])([ab])_?(\d)_?(\d+)(?![0-9])", re.IGNORECASE)
+_RUN_DIR_RE = re.compile(r"^results_(?P<instance>[ab]\d_\d+)_(?P<timestamp>\d{8}_\d{6})$")
+
+def parse_instance(name: str) -> str:
+    """
+    Normalize an instance name found in a path, e.g. 'jask_a12' -> 'a1_2', 'model_b_01.txt' -> 'b_1'.
+    Returns None if the name does not contain an instance.
+    """
+    match = _INSTANCE_RE.search(name)
+    if match is None: return None
+    family, group, idx = match.groups()
+    if family.lower() == 'b': return f"b_{int(group + idx)}"
+    return f"{family.lower()}{group}_{int(idx)}"
+
+@dataclass
+class TrackingFile:
+    """
+    Catalog entry for one tracking file. The dataset is loaded on first `load()` and shared afterwards.
+    """
+    solver  : str   # 'jask', 'gavra' or 'mehta'
+    instance: str   # e.g. 'a1_4', None if the location does not identify the instance
+    run     : str   # Run directory relative to the repository root, e.g. 'gavra/results_a1_4_20250812_174356'
+    kind    : str   # 'exploration', 'accepted', 'solution_states' or 'mehta'
+    variant : str   # e.g. 'sol1'/'sol2' for gavra's dual solutions, '' otherwise
+    path    : str
+    _loaded : dict = field(default_factory=dict, repr=False, compare=False)
+
+    def load(self, **kwargs):
+        """
+        Load (or return the already loaded) dataset for this file. Keyword arguments are passed to the dataset constructor.
+        """
+        key = tuple(sorted(kwargs.items()))
+        if key not in self._loaded:
+            from tools.dataset_manager import ReassignmentsDataset, SolutionStatesDataset
+
+            if self.kind == "solution_states": self._loaded[key] = SolutionStatesDataset(self.path, **kwargs)
+            elif self.kind == "mehta": self._loaded[key] = ReassignmentsDataset(path=self.path, **{'instance': self.instance, **kwargs})
+            else: self._loaded[key] = ReassignmentsDataset(path=self.path, **kwargs)
+
+        return self._loaded[key]
+
+    def unload(self):
+        self._loaded.clear()
+
+@dataclass
+class SolutionFile:
+    """
+    Catalog entry for a solver's final assignment of an instance.
+    """
+    solver  : str
+    instance: str
+    run     : str   # Directory relative to the repository root, e.g. 'gavra/results_a1_4_20250812_174356'
+    path    : str
+
+class DatasetRegistry:
+    """
+    Catalog of tracking files in the repository, discovered once by solver, instance and run directory.
+
+    Example:
+        > registry = DatasetRegistry()
+        > for entry in registry.find(solver="gavra", instance="a1_*", kind="exploration"):
+        >     ds = entry.load(chunksize=100_000, dataset_fraction=0.1)
+    """
+
+    def __init__(self, root: str = REPO_ROOT):
+        self.root = root
+        self._entries = None
+
+    @property
+    def entries(self) -> list[TrackingFile]:
+        if self._entries is None: self._entries = self.__discover()
+        return self._entries
+
+    def refresh(self):
+        """
+        Forget discovered files (and their loaded datasets), e.g. after a new solver run.
+        """
+        self._entries = None
+
+    def find(self, solver: str = None, instance: str = None, run: str = None, kind: str = None, variant: str = None) -> list[TrackingFile]:
+        """
+        Return entries matching all given filters. Filters accept glob patterns, e.g. instance="a1_*" or run="*20250812*".
+        """
+        filters = {"solver": solver, "instance": instance, "run": run, "kind": kind, "variant": variant}
+        filters = {attr: pattern for attr, pattern in filters.items() if pattern is not None}
+        return [entry for entry in self.entries
+                if all(_matches(getattr(entry, attr), pattern) for attr, pattern in filters.items())]
+
+    def get(self, **filters) -> TrackingFile:
+        """
+        Return the single entry matching the filters. If several runs match, the most recent run directory wins.
+        """
+        matches = self.find(**filters)
+        if not matches: raise LookupError(f"No tracking file matches {filters}.")
+        return max(matches, key=lambda entry: entry.run)
+
+    def runs(self, solver: str = None, instance: str = None) -> list[str]:
+        return sorted({entry.run for entry in self.find(solver=solver, instance=instance)})
+
+    def solutions(self, solver: str = None, instance: str = None) -> list[SolutionFile]:
+        """
+        Final solution files, filtered like find(), e.g. solutions(solver="gavra", instance="a1_4").
+        """
+        found = []
+        for owner, pattern in _SOLUTION_GLOBS:
+            if solver is not None and not _matches(owner, solver): continue
+            for path in sorted(glob.glob(os.path.join(self.root, pattern))):
+                name = parse_instance(os.path.basename(path))
+                if name is None or (instance is not None and not _matches(name, instance)): continue
+                found.append(SolutionFile(solver=owner, instance=name, run=os.path.relpath(os.path.dirname(path), self.root), path=path))
+        return found
+
+    def instance_files(self, instance: str) -> dict:
+        """
+        Paths of the ROADEF reference files of an instance (model, assignment, lb, original_cost) that exist on disk.
+        """
+        family = "B" if instance.lower().startswith("b") else "A"
+        name = instance if family == "A" else f"b_{int(instance.split('_')[-1]):02d}"
+        files = {kind: os.path.join(self.root, "jask", "data", family, f"{kind}_{name}.txt") for kind in ("model", "assignment", "lb", "original_cost")}
+        return {kind: path for kind, path in files.items() if os.path.exists(path)}
+
+    def __discover(self) -> list[TrackingFile]:
+        entries = []
+
+        # >>>>> Solver working and results directories >>>>>
+        for solver in SOLVERS:
+            solver_dir = os.path.join(self.root, solver)
+            for path in glob.glob(os.path.join(solver_dir, "**", "*.csv"), recursive=True):
+                entry = self.__entry(solver, path)
+                if entry is not None: entries.append(entry)
+
+        # >>>>> Curated datasets, e.g. analysis/datasets/jask_a12/sol_partial.csv >>>>>
+        for path in glob.glob(os.path.join(self.root, "analysis", "datasets", "*", "*.csv")):
+            dataset_dir = os.path.basename(os.path.dirname(path))
+            solver = dataset_dir.split("_")[0].lower()
+            if solver in SOLVERS: entries.append(self.__entry(solver, path, default_kind=True))
+
+        return sorted(entries, key=lambda entry: (entry.solver, entry.instance or "", entry.run, entry.kind, entry.variant))
+
+    def __entry(self, solver: str, path: str, default_kind: bool = False) -> TrackingFile:
+        filename = os.path.basename(path)
+        for pattern, kind in _FILE_KINDS if default_kind else _FILE_KINDS[:-1]:
+            match = pattern.match(filename)
+            if match is not None: break
+        else: return None
+
+        run_dir = os.path.dirname(path)
+        run_match = _RUN_DIR_RE.match(os.path.basename(run_dir))
+        instance = run_match.group("instance") if run_match else parse_instance(os.path.relpath(path, self.root))
+        return TrackingFile(solver=solver, instance=instance, run=os.path.relpath(run_dir, self.root),
+                            kind=kind, variant=match.group(1) or "", path=path)
+
+def _matches(value: str, pattern: str) -> bool:
+    from fnmatch import fnmatchcase
+    return value is not None and fnmatchcase(value, pattern)
+
+_default_registry = None
+
+def default_registry() -> DatasetRegistry:
+    """
+    Process-wide registry, so repeated lookups share discovery and loaded datasets.
+    """
+    global _default_registry
+    if _default_registry is None: _default_registry = DatasetRegistry()
+    return _default_registry
@@ -1,15 +1,80 @@
 import numpy as np
 
-def get_process_moves(process_id, move_ids, process_ids, src_machines, dest_machines, unique=False, print_results=False):
+from tools import profiling_utils as prof
+
+class MoveIndex:
+    """
+    CSR-style inverted index from an integer key (process ID, machine ID) to the moves that carry it.
+    Built once in O(N) memory with a stable sort, so the rows of every key stay in chronological order.
+
+    Columns passed at construction are stored permuted into key order, so lookups return zero-copy views.
+
+    Example:
+        > idx = MoveIndex(ps_ids, columns={'move_id': move_ids, 'src': src_machines, 'dest': dest_machines})
+        > idx.rows(42)           # positions of process 42's moves in the log
+        > idx.lookup(42)['dest'] # destination machines of process 42's moves
+    """
+    offsets: np.ndarray  # offsets[k]:offsets[k+1] is the slice of key k in order
+    order  : np.ndarray  # Move positions sorted by key (stable)
+    columns: dict        # Column name -> values permuted into key order
+
+    @prof.profiled('index.build')
+    def __init__(self, keys: np.ndarray, n_keys: int = None, columns: dict = None):
+        keys = np.asarray(keys)
+        valid = np.flatnonzero(keys >= 0) # Negative IDs mark missing machines (e.g. -1 in gavra logs)
+        valid_keys = keys[valid]
+        if n_keys is None: n_keys = int(valid_keys.max()) + 1 if valid_keys.size else 0
+
+        self.order = valid[np.argsort(valid_keys, kind='stable')]
+        self.offsets = np.zeros(n_keys + 1, dtype=np.int64)
+        np.cumsum(np.bincount(valid_keys, minlength=n_keys), out=self.offsets[1:])
+        self.columns = {name: np.asarray(values)[self.order] for name, values in (columns or {}).items()}
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __slice(self, key: int) -> slice:
+        if key < 0 or key >= len(self): return slice(0, 0)
+        return slice(self.offsets[key], self.offsets[key + 1])
+
+    def rows(self, key: int) -> np.ndarray:
+        """
+        Positions of the moves with this key, in chronological order (view).
+        """
+        return self.order[self.__slice(key)]
+
+    def lookup(self, key: int) -> dict:
+        """
+        Indexed column values of the moves with this key, in chronological order (views).
+        """
+        sl = self.__slice(key)
+        return {name: values[sl] for name, values in self.columns.items()}
+
+    def count(self, key: int) -> int:
+        sl = self.__slice(key)
+        return int(sl.stop - sl.start)
+
+    def counts(self) -> np.ndarray:
+        """
+        Number of moves per key.
+        """
+        return np.diff(self.offsets)
+
+def get_process_moves(process_id, move_ids, process_ids, src_machines, dest_machines, unique=False, print_results=False, index: MoveIndex = None):
     """
     Get all moves for a given process ID.
     If unique is True, return unique source and destination machines.
+    Pass a MoveIndex built over process_ids to avoid scanning the whole log.
     """
-    mask = (process_ids == process_id)
+    if index is not None:
+        rows = index.rows(process_id)
+        move_id_matches, src_machine_matches, dest_machine_matches = move_ids[rows], src_machines[rows], dest_machines[rows]
+    else:
+        mask = (process_ids == process_id)
 
-    move_id_matches = move_ids[mask]
-    src_machine_matches = src_machines[mask]
-    dest_machine_matches = dest_machines[mask]
+        move_id_matches = move_ids[mask]
+        src_machine_matches = src_machines[mask]
+        dest_machine_matches = dest_machines[mask]
 
     if unique:
         # Preserve first-order seen while removing duplicates
@@ -29,20 +94,16 @@ def get_process_moves(process_id, move_ids, process_ids, src_machines, dest_mach
 
     return move_id_matches, src_machine_matches, dest_machine_matches
 
-def get_machine_resource_usage(machine_id, src_machines, dest_machines, src_machine_usages, dest_machine_usages, show_results=False):
+def get_machine_resource_usage(machine_id, src_machines, dest_machines, src_machine_usages, dest_machine_usages, show_results=False,
+                               src_index: MoveIndex = None, dest_index: MoveIndex = None):
     """
-    Returns list where each element is the usage snapshot of the machine at the time of the move.
+    Returns array where each element is the usage snapshot of the machine at the time of the move, in chronological order.
+    Pass MoveIndex objects built over src_machines and dest_machines to avoid scanning the whole log.
     """
-    matches_as_src_machine  = np.where(src_machines == machine_id)[0]
-    matches_as_dest_machine = np.where(dest_machines == machine_id)[0]
-
-    machine_usages = []
+    matches_as_src_machine  = src_index.rows(machine_id) if src_index is not None else np.flatnonzero(src_machines == machine_id)
+    matches_as_dest_machine = dest_index.rows(machine_id) if dest_index is not None else np.flatnonzero(dest_machines == machine_id)
 
-    for idx in matches_as_src_machine:
-        machine_usages.append(src_machine_usages[idx])
-
-    for idx in matches_as_dest_machine:
-        machine_usages.append(dest_machine_usages[idx])
+    machine_usages = merge_role_snapshots(matches_as_src_machine, matches_as_dest_machine, src_machine_usages, dest_machine_usages)
 
     print(f"Returning {len(machine_usages)} results for machine {machine_id}.")
     if show_results:
@@ -50,3 +111,11 @@ def get_machine_resource_usage(machine_id, src_machines, dest_machines, src_mach
             print(f"Machine: {machine_id}, Usage: {machine_usages[i]}")
 
     return machine_usages
+
+def merge_role_snapshots(src_rows, dest_rows, src_values, dest_values) -> np.ndarray:
+    """
+    Merge per-move snapshots of a machine taken as source and as destination into one chronological array.
+    """
+    rows = np.concatenate((src_rows, dest_rows))
+    values = np.concatenate((np.asarray(src_values)[src_rows], np.asarray(dest_values)[dest_rows]))
+    return values[np.argsort(rows, kind='stable')]
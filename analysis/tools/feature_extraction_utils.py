@@ -1,5 +1,9 @@
+import os
 import numpy as np
 import scipy as sp
+import pandas as pd
+
+from tools import profiling_utils as prof
 
 def diff(arr: np.ndarray) -> np.ndarray:
     """
@@ -34,3 +38,137 @@ def variance(mtx: np.ndarray, axis: int = 1) -> float:
 def mean(mtx: np.ndarray, axis: int = 1) -> float:
     if mtx.ndim == 1: return np.mean(mtx)
     else: return np.mean(mtx, axis=axis)
+
+# >>>>> Windowed features over the move stream >>>>>
+# Windows are ragged: offsets[i]:offsets[i+1] are the moves of window i (e.g. solution transitions).
+# Every feature reduces all windows at once with segment reductions (np.*.reduceat), no per-window loop.
+
+def transition_windows(ds) -> np.ndarray:
+    """
+    Window offsets of the solution transitions of a ReassignmentsDataset (one window per solution state).
+    """
+    return np.unique(ds.solution_state_change_points())
+
+def fixed_windows(n_moves: int, size: int) -> np.ndarray:
+    """
+    Window offsets of consecutive windows of `size` moves (the last one may be shorter).
+    """
+    return np.r_[np.arange(0, n_moves, size), n_moves] if n_moves else np.zeros(1, dtype=np.int64)
+
+def _window_mean(values, starts, counts):
+    return np.add.reduceat(values, starts) / counts
+
+def _window_var(values, starts, counts):
+    deviation = values - np.repeat(_window_mean(values, starts, counts), counts)
+    return np.add.reduceat(deviation * deviation, starts) / counts
+
+def _window_slope(values, starts, counts):
+    """
+    Least-squares slope of the values against the move index within the window (NaN for single moves).
+    """
+    t = np.arange(len(values)) - np.repeat(starts, counts) - np.repeat((counts - 1) / 2, counts) # Centered position in the window
+    cov = np.add.reduceat(t * values, starts) / counts
+    with np.errstate(invalid='ignore', divide='ignore'): return cov / ((counts * counts - 1) / 12)
+
+def _window_total_variation(values, starts, counts):
+    steps = np.abs(np.diff(values, append=values[-1:]))
+    steps[starts + counts - 1] = 0 # No step across window boundaries
+    return np.add.reduceat(steps, starts)
+
+WINDOW_FEATURES = {
+    'sum'            : lambda v, s, c: np.add.reduceat(v, s),
+    'mean'           : _window_mean,
+    'var'            : _window_var,
+    'std'            : lambda v, s, c: np.sqrt(_window_var(v, s, c)),
+    'min'            : lambda v, s, c: np.minimum.reduceat(v, s),
+    'max'            : lambda v, s, c: np.maximum.reduceat(v, s),
+    'range'          : lambda v, s, c: np.maximum.reduceat(v, s) - np.minimum.reduceat(v, s),
+    'energy'         : lambda v, s, c: np.add.reduceat(v * v, s),
+    'rms'            : lambda v, s, c: np.sqrt(np.add.reduceat(v * v, s) / c),
+    'first'          : lambda v, s, c: v[s],
+    'last'           : lambda v, s, c: v[s + c - 1],
+    'delta'          : lambda v, s, c: v[s + c - 1] - v[s],
+    'slope'          : _window_slope,
+    'total_variation': _window_total_variation,
+}
+
+DEFAULT_WINDOW_FEATURES = ('mean', 'std', 'min', 'max', 'delta', 'slope')
+
+def window_features(values: np.ndarray, offsets: np.ndarray, features=DEFAULT_WINDOW_FEATURES, dtype=np.float64) -> dict:
+    """
+    Feature name -> (windows,) array of one column over ragged windows. Windows must not be empty.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    starts, counts = offsets[:-1], np.diff(offsets)
+    if not len(starts): return {name: np.zeros(0, dtype=dtype) for name in features}
+    return {name: WINDOW_FEATURES[name](values, starts, counts).astype(dtype, copy=False) for name in features}
+
+def _features_task(task: dict) -> dict:
+    """
+    Worker: attach to the shared columns and compute the features of windows [lo, hi).
+    """
+    from multiprocessing import shared_memory
+    offsets = task['offsets']
+    results = {}
+    for col, (shm_name, length) in task['columns'].items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            values = np.ndarray((length,), dtype=np.float64, buffer=shm.buf)[offsets[0]:offsets[-1]]
+            for name, arr in window_features(values, offsets - offsets[0], task['features'], task['dtype']).items(): results[f"{col}_{name}"] = arr
+        finally:
+            del values
+            shm.close()
+    return results
+
+@prof.profiled('features.extract')
+def extract_features(columns: dict, offsets: np.ndarray, features=DEFAULT_WINDOW_FEATURES, workers: int = None,
+                     min_parallel_moves: int = 5_000_000, dtype=np.float64) -> pd.DataFrame:
+    """
+    Per-window feature table of several move columns: one row per window with its start, number of moves and
+    `<column>_<feature>` values, e.g. 'load_cost_mean'.
+
+    Inputs of at least `min_parallel_moves` moves are copied once into shared memory and the windows are split into
+    contiguous groups of similar move counts across a process pool (default: one worker per core); smaller inputs
+    (or workers=1) run in process. Features are float64 by default, dtype=np.float32 halves the table for very long runs
+    at the cost of precision (costs around 1e9 keep only ~7 significant digits).
+
+    Example:
+        > offsets = transition_windows(ds)                      # or fixed_windows(len(ds.move_id), 1000)
+        > table = extract_features({'solution_cost': ds.solution_cost, 'ps_size': ds.ps_size}, offsets, ('mean', 'slope'))
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    table = {'window_start': offsets[:-1], 'window_moves': np.diff(offsets).astype(np.int32)}
+    n_moves = int(offsets[-1] - offsets[0]) if len(offsets) else 0
+
+    workers = workers or os.cpu_count()
+    if workers == 1 or n_moves < min_parallel_moves or len(offsets) < 3:
+        for col, values in columns.items():
+            for name, arr in window_features(values, offsets, features, dtype).items():
+                table[f"{col}_{name}"] = arr
+        return pd.DataFrame(table)
+
+    from multiprocessing import shared_memory
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Split the windows into groups of similar move counts (window boundaries closest to equal move splits)
+    cuts = np.unique(np.searchsorted(offsets, np.linspace(offsets[0], offsets[-1], workers * 4 + 1)))
+    cuts = np.unique(np.r_[0, np.clip(cuts, 0, len(offsets) - 1), len(offsets) - 1])
+
+    shms = {}
+    try:
+        for col, values in columns.items():
+            values = np.asarray(values)
+            shm = shms[col] = shared_memory.SharedMemory(create=True, size=max(len(values), 1) * 8)
+            np.ndarray((len(values),), dtype=np.float64, buffer=shm.buf)[:] = values
+        shared = {col: (shm.name, len(columns[col])) for col, shm in shms.items()}
+        tasks = [{'columns': shared, 'offsets': offsets[lo:hi + 1], 'features': tuple(features), 'dtype': dtype}
+                 for lo, hi in zip(cuts[:-1], cuts[1:])]
+        with ProcessPoolExecutor(max_workers=workers) as pool: parts = list(pool.map(_features_task, tasks))
+    finally:
+        for shm in shms.values():
+            shm.close()
+            shm.unlink()
+
+    for key in parts[0]: table[key] = np.concatenate([part[key] for part in parts])
+    return pd.DataFrame(table)
@@ -0,0 +1,194 @@
+import os
+import numpy as np
+from functools import lru_cache
+
+class RoadefModel:
+    """
+    ROADEF/EURO 2012 machine reassignment instance (model_*.txt) as typed NumPy arrays.
+    """
+    n_resources: int
+    n_machines : int
+    n_services : int
+    n_processes: int
+    n_balances : int
+
+    # >>>>> Resources >>>>>
+    transient        : np.ndarray  # (R,) bool, resource is transient
+    load_cost_weights: np.ndarray  # (R,) weight of the load cost per resource
+
+    # >>>>> Machines >>>>>
+    neighborhood     : np.ndarray  # (M,) neighborhood ID
+    location         : np.ndarray  # (M,) location ID
+    capacity         : np.ndarray  # (M, R) capacities
+    safety_capacity  : np.ndarray  # (M, R) safety capacities
+    machine_move_cost: np.ndarray  # (M, M) cost of moving a process from machine m to machine m'
+
+    # >>>>> Services >>>>>
+    spread_min         : np.ndarray  # (S,) minimum number of distinct locations
+    dependency_offsets : np.ndarray  # (S+1,) CSR offsets into dependency_targets
+    dependency_targets : np.ndarray  # services that service s depends on: dependency_targets[offsets[s]:offsets[s+1]]
+
+    # >>>>> Processes >>>>>
+    process_service  : np.ndarray  # (P,) service ID
+    requirements     : np.ndarray  # (P, R) resource requirements
+    process_move_cost: np.ndarray  # (P,) process move cost
+
+    # >>>>> Balance objectives and weights >>>>>
+    balance_resources: np.ndarray  # (B, 2) resource pair (r1, r2)
+    balance_targets  : np.ndarray  # (B,) target ratio
+    balance_weights  : np.ndarray  # (B,) weight of the balance cost
+    weight_process_move: int
+    weight_service_move: int
+    weight_machine_move: int
+
+    def __init__(self, tokens: np.ndarray):
+        """
+        Build the model from the whitespace-separated integer stream of a model file (see load_model).
+        """
+        pos = 0
+        def take(n: int) -> np.ndarray:
+            nonlocal pos
+            block = tokens[pos:pos + n]
+            if len(block) != n: raise ValueError(f"Model file ended early, expected {n} values at token {pos}.")
+            pos += n
+            return block
+
+        R = self.n_resources = int(take(1)[0])
+        resources = take(2 * R).reshape(R, 2)
+        self.transient = resources[:, 0].astype(bool)
+        self.load_cost_weights = resources[:, 1]
+
+        M = self.n_machines = int(take(1)[0])
+        machines = take(M * (2 + 2 * R + M)).reshape(M, 2 + 2 * R + M)
+        self.neighborhood = machines[:, 0]
+        self.location = machines[:, 1]
+        self.capacity = machines[:, 2:2 + R]
+        self.safety_capacity = machines[:, 2 + R:2 + 2 * R]
+        self.machine_move_cost = machines[:, 2 + 2 * R:]
+
+        S = self.n_services = int(take(1)[0])
+        # Variable-length records (spread_min, n_deps, deps...): only the record starts need a sequential scan
+        starts, record = [], pos
+        for _ in range(S):
+            if record + 1 >= len(tokens): raise ValueError(f"Model file ended early in the service records at token {record}.")
+            starts.append(record)
+            record += 2 + int(tokens[record + 1])
+        starts = np.asarray(starts, dtype=np.int64)
+        n_deps = tokens[starts + 1]
+        self.spread_min = tokens[starts]
+        self.dependency_offsets = np.r_[0, np.cumsum(n_deps)].astype(np.int64)
+        # take() advances pos, so the block offset is kept before indexing into it
+        block_start = pos
+        block = take(record - block_start)
+        self.dependency_targets = block[np.repeat(starts + 2 - block_start, n_deps) + np.arange(self.dependency_offsets[-1]) - np.repeat(self.dependency_offsets[:-1], n_deps)]
+
+        P = self.n_processes = int(take(1)[0])
+        processes = take(P * (2 + R)).reshape(P, 2 + R)
+        self.process_service = processes[:, 0]
+        self.requirements = processes[:, 1:1 + R]
+        self.process_move_cost = processes[:, 1 + R]
+
+        B = self.n_balances = int(take(1)[0])
+        balances = take(4 * B).reshape(B, 4) # r1 r2 target, followed by the weight on the next line
+        self.balance_resources = balances[:, :2]
+        self.balance_targets = balances[:, 2]
+        self.balance_weights = balances[:, 3]
+
+        self.weight_process_move, self.weight_service_move, self.weight_machine_move = (int(w) for w in take(3))
+
+    def dependencies(self, service: int) -> np.ndarray:
+        return self.dependency_targets[self.dependency_offsets[service]:self.dependency_offsets[service + 1]]
+
+    def initial_usage(self, assignment: np.ndarray) -> np.ndarray:
+        """
+        (M, R) resource usage of every machine under an assignment vector.
+        """
+        return machine_usage(assignment, self.requirements, self.n_machines)
+
+def machine_usage(assignment: np.ndarray, requirements: np.ndarray, n_machines: int) -> np.ndarray:
+    """
+    Sum process requirements per machine: (P,) assignment and (P, R) requirements -> (M, R) usage.
+    """
+    R = requirements.shape[1]
+    flat_idx = (np.asarray(assignment)[:, None] * R + np.arange(R)).ravel()
+    usage = np.bincount(flat_idx, weights=requirements.ravel(), minlength=n_machines * R)
+    return np.rint(usage).astype(np.int64).reshape(n_machines, R)
+
+def read_tokens(path: str) -> np.ndarray:
+    """
+    Read a whitespace-separated integer file in a single bulk call.
+    """
+    with open(path) as f: return np.fromstring(f.read(), dtype=np.int64, sep=' ')
+
+def load_model(path: str) -> RoadefModel:
+    return RoadefModel(read_tokens(path))
+
+def load_assignment(path: str, n_processes: int = None) -> np.ndarray:
+    """
+    Read an assignment or solution file (one machine ID per process).
+    """
+    assignment = read_tokens(path)
+    if n_processes is not None and len(assignment) != n_processes:
+        raise ValueError(f"{path} assigns {len(assignment)} processes, the model has {n_processes}.")
+    return assignment
+
+def load_solution(path: str, n_processes: int = None) -> np.ndarray:
+    """
+    Read a final solution, e.g. gavra/results_a1_4_*/solution_a1_4.txt or mehta/cblns/reassignment_a1_4.txt.
+    Same layout as an assignment file: one machine ID per process, any whitespace.
+    """
+    return load_assignment(path, n_processes)
+
+def read_reference(path: str) -> int:
+    """
+    Single integer reference value, e.g. lb_a1_1.txt or original_cost_a1_1.txt. None if the file is missing.
+    """
+    if path is None or not os.path.exists(path): return None
+    with open(path) as f: return int(f.read().split()[0])
+
+# >>>>> Parsed models shared per instance >>>>>
+# Models and assignments are parsed once per process and shared by every run of the same instance.
+# Their arrays are made read-only, so a caller can not modify the shared copy by accident.
+
+MODEL_CACHE_SIZE = 8 # Instances kept parsed (a B instance model is a few MB)
+
+def _instance_files(instance: str) -> dict:
+    from tools.dataset_registry import default_registry
+    files = default_registry().instance_files(instance)
+    if 'model' not in files or 'assignment' not in files: raise LookupError(f"Model or assignment file of instance {instance} not found.")
+    return files
+
+def _freeze(obj):
+    for value in vars(obj).values() if not isinstance(obj, np.ndarray) else [obj]:
+        if isinstance(value, np.ndarray): value.flags.writeable = False
+    return obj
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def instance_model(instance: str) -> RoadefModel:
+    """
+    Parsed model of an instance, e.g. 'a1_2' or 'b_05' (see dataset_registry), cached per process.
+
+    Example:
+        > model = instance_model("b_05")
+        > assignment = instance_assignment("b_05")
+    """
+    return _freeze(load_model(_instance_files(instance)['model']))
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def instance_assignment(instance: str) -> np.ndarray:
+    """
+    Initial assignment of an instance, cached per process (read-only).
+    """
+    return _freeze(load_assignment(_instance_files(instance)['assignment'], instance_model(instance).n_processes))
+
+@lru_cache(maxsize=None)
+def instance_references(instance: str) -> dict:
+    """
+    Lower bound and original cost of an instance ('lb', 'original_cost'), None where the file is missing.
+    """
+    from tools.dataset_registry import default_registry
+    files = default_registry().instance_files(instance)
+    return {'lb': read_reference(files.get('lb')), 'original_cost': read_reference(files.get('original_cost'))}
+
+def clear_model_cache():
+    for cached in (instance_model, instance_assignment, instance_references): cached.cache_clear()
@@ -0,0 +1,221 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sps
+
+from tools.model_utils import RoadefModel
+
+class MoveGraph:
+    """
+    Aggregate flow of processes between machines: sparse (machines x machines) matrices where entry (a, b)
+    counts the moves from machine a to machine b, optionally restricted to a solution or time window and
+    rolled up to locations or neighborhoods. Also finds processes that bounce between the same machines.
+
+    Moves with an unknown source or destination (e.g. -1 in gavra logs) are left out.
+
+    Example:
+        > graph = MoveGraph.from_dataset(ds)
+        > flow = graph.flow_matrix(solution_range=(1, 100))              # csr (M, M)
+        > by_location = graph.roll_up(flow, model.location)              # csr (L, L)
+        > graph.ping_pong_pairs().head()                                 # machine pairs with the most wasted moves
+    """
+    src        : np.ndarray  # (N,) source machine per move
+    dest       : np.ndarray  # (N,) destination machine per move
+    ps_id      : np.ndarray  # (N,) moved process
+    move_idx   : np.ndarray  # (N,) row of the move in the original log
+    solution_id: np.ndarray  # (N,) solution ID per move, None if not given
+    timestamp  : np.ndarray  # (N,) timestamp per move, None if not given
+    n_machines : int
+
+    def __init__(self, src, dest, ps_id=None, solution_id=None, timestamp=None, n_machines: int = None):
+        src, dest = np.asarray(src, dtype=np.int64), np.asarray(dest, dtype=np.int64)
+        valid = (src >= 0) & (dest >= 0)
+        if n_machines is not None: valid &= (src < n_machines) & (dest < n_machines)
+        self.n_machines = int(n_machines if n_machines is not None else max(src.max(initial=-1), dest.max(initial=-1)) + 1)
+
+        keep = None if valid.all() else np.flatnonzero(valid)
+        def take(arr):
+            if arr is None: return None
+            arr = np.asarray(arr)
+            return arr if keep is None else arr[keep]
+
+        self.src, self.dest = take(src), take(dest)
+        self.ps_id = take(np.asarray(ps_id, dtype=np.int64)) if ps_id is not None else None
+        self.move_idx = np.arange(len(src)) if keep is None else keep
+        self.solution_id, self.timestamp = take(solution_id), take(timestamp)
+        self._process_order = None
+
+    @classmethod
+    def from_dataset(cls, ds, timestamp=None, n_machines: int = None):
+        """
+        Graph of a ReassignmentsDataset; timestamps default to the dataset's own when it has them.
+        """
+        if timestamp is None: timestamp = getattr(ds, 'timestamp', None)
+        return cls(ds.src_machine_id, ds.dest_machine_id, ds.ps_id, ds.solution_id, timestamp, n_machines)
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    # >>>>> Windows >>>>>
+
+    @staticmethod
+    def __range(values: np.ndarray, lo, hi) -> np.ndarray:
+        """
+        Moves with lo <= value < hi: a slice when values are sorted (solution IDs and timestamps usually are), else a mask.
+        """
+        if values is None: raise ValueError("This graph was built without the column to window on.")
+        lo = -np.inf if lo is None else lo
+        hi = np.inf if hi is None else hi
+        if len(values) < 2 or np.all(values[1:] >= values[:-1]):
+            return slice(int(np.searchsorted(values, lo, side='left')), int(np.searchsorted(values, hi, side='left')))
+        return (values >= lo) & (values < hi)
+
+    def window(self, solution_range: tuple = None, time_range: tuple = None):
+        """
+        Selector (slice or mask) of the moves in [start, stop) of solution IDs and/or timestamps.
+        """
+        selectors = []
+        if solution_range is not None: selectors.append(self.__range(self.solution_id, *solution_range))
+        if time_range is not None: selectors.append(self.__range(self.timestamp, *time_range))
+        if not selectors: return slice(None)
+        if len(selectors) == 1: return selectors[0]
+
+        mask = np.ones(len(self), dtype=bool)
+        for selector in selectors:
+            inside = np.zeros(len(self), dtype=bool)
+            inside[selector] = True
+            mask &= inside
+        return mask
+
+    # >>>>> Flow matrices >>>>>
+
+    def flow_matrix(self, solution_range: tuple = None, time_range: tuple = None, weights=None) -> sps.csr_matrix:
+        """
+        (machines x machines) move counts (or sums of `weights`, aligned with the original log) in the window.
+        """
+        selected = self.window(solution_range, time_range)
+        return self.__matrix(self.src[selected], self.dest[selected], None if weights is None else self.__weights(weights)[selected])
+
+    def windowed_flow_matrices(self, bounds, by: str = 'solution_id', weights=None) -> list[sps.csr_matrix]:
+        """
+        One flow matrix per consecutive window [bounds[i], bounds[i+1]) of solution IDs ('solution_id') or timestamps ('timestamp').
+
+        Example:
+            > mats = graph.windowed_flow_matrices(np.linspace(ds.solution_id[0], ds.solution_id[-1] + 1, 20))
+        """
+        values = getattr(self, by)
+        if values is None: raise ValueError(f"This graph was built without {by}.")
+        weights = None if weights is None else self.__weights(weights)
+        bounds = np.asarray(bounds)
+
+        if np.all(values[1:] >= values[:-1]): # Sorted: every window is a contiguous slice
+            edges = np.searchsorted(values, bounds, side='left')
+            return [self.__matrix(self.src[a:b], self.dest[a:b], None if weights is None else weights[a:b]) for a, b in zip(edges[:-1], edges[1:])]
+
+        window_idx = np.searchsorted(bounds, values, side='right') - 1
+        inside = (window_idx >= 0) & (window_idx < len(bounds) - 1)
+        order = np.argsort(window_idx[inside], kind='stable')
+        rows = np.flatnonzero(inside)[order]
+        edges = np.searchsorted(window_idx[rows], np.arange(len(bounds)))
+        return [self.__matrix(self.src[rows[a:b]], self.dest[rows[a:b]], None if weights is None else weights[rows[a:b]])
+                for a, b in zip(edges[:-1], edges[1:])]
+
+    def __weights(self, weights) -> np.ndarray:
+        weights = np.asarray(weights)
+        return weights if len(weights) == len(self) else weights[self.move_idx]
+
+    def __matrix(self, src: np.ndarray, dest: np.ndarray, weights: np.ndarray = None) -> sps.csr_matrix:
+        M = self.n_machines
+        if M * M <= 4 * len(src): # Dense counts are no larger than the COO triplets: one bincount instead of a sort
+            counts = np.bincount(src * M + dest, weights=weights, minlength=M * M)
+            if weights is None: counts = counts.astype(np.int64)
+            return sps.csr_matrix(counts.reshape(M, M))
+        data = np.ones(len(src), dtype=np.int64) if weights is None else weights
+        return sps.coo_matrix((data, (src, dest)), shape=(M, M)).tocsr() # Duplicates are summed
+
+    @staticmethod
+    def roll_up(matrix: sps.spmatrix, groups: np.ndarray) -> sps.csr_matrix:
+        """
+        Aggregate a machine flow matrix to groups of machines, e.g. model.location or model.neighborhood: G^T A G.
+        The diagonal of the result holds moves within a group.
+        """
+        groups = np.asarray(groups)
+        n_groups = int(groups.max()) + 1
+        membership = sps.csr_matrix((np.ones(len(groups), dtype=matrix.dtype), (np.arange(len(groups)), groups)), shape=(len(groups), n_groups))
+        return (membership.T @ matrix @ membership).tocsr()
+
+    def location_flow(self, model: RoadefModel, **window) -> sps.csr_matrix:
+        return self.roll_up(self.flow_matrix(**window), model.location)
+
+    def neighborhood_flow(self, model: RoadefModel, **window) -> sps.csr_matrix:
+        return self.roll_up(self.flow_matrix(**window), model.neighborhood)
+
+    @staticmethod
+    def top_flows(matrix: sps.spmatrix, n: int = 10) -> pd.DataFrame:
+        """
+        The n largest entries of a flow matrix as (src, dest, moves) rows.
+        """
+        coo = matrix.tocoo()
+        top = np.argsort(coo.data, kind='stable')[::-1][:n]
+        return pd.DataFrame({'src': coo.row[top], 'dest': coo.col[top], 'moves': coo.data[top]})
+
+    # >>>>> Ping-pong and cycle detection >>>>>
+
+    def __process_order(self) -> np.ndarray:
+        if self.ps_id is None: raise ValueError("This graph was built without process IDs.")
+        if self._process_order is None: self._process_order = np.argsort(self.ps_id, kind='stable') # Chronological per process
+        return self._process_order
+
+    def returns(self, max_length: int = 2) -> pd.DataFrame:
+        """
+        Moves that bring a process back to a machine it left within the last `max_length` of its own moves.
+        length 2 is a ping-pong (a -> b -> a), length 3 a triangle (a -> b -> c -> a), etc.
+
+        Returns one row per returning move: move (row in the original log), ps_id, machine and cycle length.
+        """
+        if max_length < 2: raise ValueError(f"max_length must be at least 2 (a ping-pong), got {max_length}.")
+        order = self.__process_order()
+        ps, src, dest = self.ps_id[order], self.src[order], self.dest[order]
+
+        found = []
+        for length in range(2, max_length + 1):
+            k = length - 1 # The move that closes the cycle returns to the source of the move k steps earlier
+            closes = (ps[k:] == ps[:-k]) & (dest[k:] == src[:-k])
+            for shorter in range(1, k): closes &= dest[k:] != src[k - shorter:len(src) - shorter] # Report only the shortest cycle
+            rows = np.flatnonzero(closes) + k
+            found.append(pd.DataFrame({'move': self.move_idx[order[rows]], 'ps_id': ps[rows], 'machine': dest[rows], 'length': length}))
+
+        table = pd.concat(found, ignore_index=True)
+        return table.sort_values('move', ignore_index=True)
+
+    def ping_pongs(self) -> pd.DataFrame:
+        """
+        Runs of a process bouncing back and forth between the same two machines (a -> b -> a -> b ...).
+
+        Returns one row per run: ps_id, machine pair (machine_a < machine_b), number of moves in the run
+        (the first one plus every bounce), first and last move (rows in the original log).
+        """
+        order = self.__process_order()
+        ps, src, dest = self.ps_id[order], self.src[order], self.dest[order]
+        bounce = (ps[1:] == ps[:-1]) & (dest[1:] == src[:-1]) & (src[1:] == dest[:-1]) # Move i+1 undoes move i
+        if not bounce.any(): return pd.DataFrame(columns=['ps_id', 'machine_a', 'machine_b', 'moves', 'first_move', 'last_move'])
+
+        # Runs of consecutive bounces: the run starts at the move before its first bounce
+        edges = np.diff(np.r_[0, bounce.astype(np.int8), 0])
+        starts, stops = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) # Bounce indices [start, stop) -> moves [start, stop]
+        return pd.DataFrame({
+            'ps_id'     : ps[starts],
+            'machine_a' : np.minimum(src[starts], dest[starts]),
+            'machine_b' : np.maximum(src[starts], dest[starts]),
+            'moves'     : stops - starts + 1,
+            'first_move': self.move_idx[order[starts]],
+            'last_move' : self.move_idx[order[stops]],
+        }).sort_values('first_move', ignore_index=True)
+
+    def ping_pong_pairs(self) -> pd.DataFrame:
+        """
+        Machine pairs ranked by wasted moves, i.e. moves inside ping-pong runs beyond the first one.
+        """
+        runs = self.ping_pongs()
+        runs = runs.assign(wasted_moves=runs['moves'] - 1)
+        pairs = runs.groupby(['machine_a', 'machine_b']).agg(runs=('ps_id', 'size'), processes=('ps_id', 'nunique'), wasted_moves=('wasted_moves', 'sum'))
+        return pairs.sort_values('wasted_moves', ascending=False).reset_index()
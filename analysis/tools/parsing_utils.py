@@ -0,0 +1,311 @@
+import ast
+import io
+import os
+import numpy as np
+import pandas as pd
+
+from tools import profiling_utils as prof
+
+_ALLOWED_BYTES = np.zeros(256, dtype=bool)
+_ALLOWED_BYTES[np.frombuffer(b'0123456789-+, []', dtype=np.uint8)] = True
+_MAX_BULK_DIGITS = 18 # Every integer of up to 18 digits fits int64, longer ones are range-checked per cell
+
+def parse_list_column(values, width: int = None, dtype=np.int64) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parse a column of bracketed lists, e.g. "[10,0,3]", into a 2D matrix of shape (rows, width).
+    The column is scanned as one byte buffer, so cells are validated and tokenized without
+    any per-cell Python parsing. Cells that fail validation are retried one by one with ast.literal_eval.
+
+    Returns (matrix, valid):
+        - matrix: 2D integer array, rows that could not be parsed are filled with zeros.
+        - valid: boolean mask of rows that were parsed successfully, e.g. "[]" or NaN are invalid.
+
+    Width defaults to the most common number of entries per cell.
+    """
+    cells = [c.strip() if isinstance(c, str) else '' for c in values]
+    n_rows = len(cells)
+    if n_rows == 0: return np.zeros((0, width or 0), dtype=dtype), np.zeros(0, dtype=bool)
+
+    # >>>>> Byte-level scan of the whole column >>>>>
+
+    joined = '\n'.join(cells)
+    buf = np.frombuffer(joined.encode(), dtype=np.uint8)
+    is_sep = (buf == ord('\n'))
+    cell_idx = np.cumsum(is_sep) # Cell index of every byte
+    ends = np.r_[np.flatnonzero(is_sep), len(buf)] # Exclusive end of every cell
+    starts = np.r_[0, ends[:-1] + 1]
+    lengths = ends - starts
+
+    nonempty = lengths >= 2
+    bracketed = np.zeros(n_rows, dtype=bool)
+    bracketed[nonempty] = (buf[starts[nonempty]] == ord('[')) & (buf[ends[nonempty] - 1] == ord(']'))
+
+    bad_bytes = np.bincount(cell_idx[~_ALLOWED_BYTES[buf] & ~is_sep], minlength=n_rows)
+    has_digit = np.bincount(cell_idx[(buf >= ord('0')) & (buf <= ord('9'))], minlength=n_rows) > 0
+    widths = np.bincount(cell_idx[buf == ord(',')], minlength=n_rows) + 1
+    widths[~(bracketed & has_digit)] = 0
+
+    if width is None:
+        candidates = widths[widths > 0]
+        width = int(np.bincount(candidates).argmax()) if candidates.size else 0
+
+    mtx = np.zeros((n_rows, width), dtype=dtype)
+    valid = (widths == width) & (width > 0) & (bad_bytes == 0) & (_malformed_tokens(buf, cell_idx, n_rows) == 0)
+
+    # >>>>> Bulk tokenization of well-formed cells >>>>>
+
+    if valid.any():
+        body = ','.join(cells[i][1:-1] for i in np.flatnonzero(valid)) if not valid.all() \
+            else joined.replace('[', '').replace(']', '').replace('\n', ',')
+        try: tokens = np.fromstring(body, dtype=dtype, sep=',')
+        except ValueError: tokens = None # Not expected after the structure check, but never fail the whole column
+        if tokens is not None and tokens.size == np.count_nonzero(valid) * width: mtx[valid] = tokens.reshape(-1, width)
+        else: valid[:] = False # Fall back to per-cell parsing below
+
+    # >>>>> Per-cell fallback for the remaining rows >>>>>
+
+    retry = np.flatnonzero(~valid & bracketed) if width > 0 else [] # Width 0: no cell has values (e.g. all "[]"), nothing to retry
+    for idx in retry:
+        row = _parse_list_cell(cells[idx], width, dtype)
+        if row is not None:
+            mtx[idx] = row
+            valid[idx] = True
+
+    return mtx, valid
+
+def _is_digit(b: np.ndarray) -> np.ndarray: return (b - np.uint8(ord('0'))) <= 9 # uint8 wraps below '0'
+def _is_sign(b: np.ndarray) -> np.ndarray: return (b == ord('-')) | (b == ord('+'))
+
+def _malformed_tokens(buf: np.ndarray, cell_idx: np.ndarray, n_rows: int) -> np.ndarray:
+    """
+    Per cell, the number of bytes that break the token structure "[int,int,...]": empty tokens ("1,,3"),
+    signs that do not start a token ("3-", "- 3"), digits separated by spaces ("1 2"), inner brackets,
+    and digit runs too long for a checked int64 conversion. Only the non-digit bytes are inspected.
+    """
+    spaces = buf == ord(' ')
+    solid = np.flatnonzero(~spaces) if spaces.any() else None # Non-space bytes, cell separators included
+    b = buf if solid is None else buf[solid]
+    cell_of = cell_idx if solid is None else cell_idx[solid]
+    padded = np.full(len(b) + 2, ord('\n'), dtype=np.uint8) # padded[i] / padded[i + 2]: byte before / after b[i]
+    padded[1:-1] = b
+
+    nd = np.flatnonzero(~_is_digit(b))
+    byte, prev_b, next_b = b[nd], padded[nd], padded[nd + 2]
+    sign = _is_sign(byte)
+    bad = sign & ~(_is_digit(next_b) & ((prev_b == ord('[')) | (prev_b == ord(','))))
+    bad |= (byte == ord(',')) & ~(_is_digit(prev_b) & (_is_digit(next_b) | _is_sign(next_b)))
+    bad |= ((byte == ord('[')) & (prev_b != ord('\n'))) | ((byte == ord(']')) & (next_b != ord('\n')))
+    flagged = [nd[bad]]
+
+    if solid is not None: # Spaces may only surround separators: not "1 2", not "- 2"
+        gaps = np.flatnonzero(np.diff(solid) > 1) # Space between b[gaps] and b[gaps + 1]
+        flagged.append(gaps[(_is_digit(b[gaps]) | _is_sign(b[gaps])) & _is_digit(b[gaps + 1])])
+
+    bounds = np.r_[-1, nd, len(b)]
+    long_runs = np.flatnonzero(np.diff(bounds) - 1 > _MAX_BULK_DIGITS)
+    flagged.append(bounds[long_runs] + 1) # First digit of the run
+
+    return np.bincount(cell_of[np.concatenate(flagged)], minlength=n_rows)
+
+def _parse_list_cell(cell: str, width: int, dtype) -> np.ndarray:
+    try: values = ast.literal_eval(cell)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError): return None
+    if not isinstance(values, (list, tuple)) or not all(type(v) is int for v in values): return None # No silent float truncation
+    try: row = np.asarray(values, dtype=dtype)
+    except OverflowError: return None # Value out of the dtype's range
+    if row.shape != (width,): return None
+    return row
+
+# >>>>> Reassignment tracking CSV layout (jask, gavra) >>>>>
+
+SCALAR_COLUMNS = [
+    'MoveNum', 'ProcessID', 'SourceMachine', 'DestMachine', 'OriginalMachine', 'Service', 'MoveCost',
+    'Improvement', 'Timestamp', 'SolutionId', 'SourceMachineProcessCount', 'DestMachineProcessCount',
+    'LoadCost', 'BalanceCost', 'SolutionCost',
+]
+
+LIST_COLUMNS = [
+    'ProcessResourceRequirements', 'SourceMachineResourceUsage', 'DestMachineResourceUsage',
+    'SourceMachineCapacities', 'DestMachineCapacities', 'SourceMachineTransientUsage', 'DestMachineTransientUsage',
+]
+
+SUM_SUFFIX = '.sum' # Row sums of list columns are stored next to the matrices, e.g. 'ProcessResourceRequirements.sum'
+
+_LIST_SECTIONS = {col: 'parse.' + col for col in LIST_COLUMNS} # Profiling section names, built once
+
+def parse_reassignments_frame(df, widths: dict = None) -> tuple[dict, dict]:
+    """
+    Reduce a raw reassignments DataFrame to NumPy columns keyed by CSV column name.
+    List columns are decoded into (rows x resources) matrices and their row sums.
+    `widths` optionally fixes the number of resources per list column (e.g. when parsing chunk by chunk).
+
+    Returns (columns, malformed_rows), where malformed_rows maps list column name -> row indices that failed to parse.
+    """
+    widths = widths or {}
+    columns, malformed_rows = {}, {}
+    prof.count('parse.rows', len(df))
+    for col in SCALAR_COLUMNS:
+        if col in df: columns[col] = df[col].to_numpy()
+
+    for col in LIST_COLUMNS:
+        if col not in df: continue
+        with prof.section(_LIST_SECTIONS[col]):
+            mtx, valid = parse_list_column(df[col].to_numpy(), width=widths.get(col))
+            columns[col] = mtx
+            columns[col + SUM_SUFFIX] = np.sum(mtx, axis=1)
+        if not valid.all():
+            malformed_rows[col] = np.flatnonzero(~valid)
+            prof.count('parse.malformed_cells', len(malformed_rows[col]))
+
+    return columns, malformed_rows
+
+# >>>>> Streaming ingestion >>>>>
+
+def count_rows(path: str, block_size: int = 1 << 24, header: bool = True) -> int:
+    """
+    Count data rows of a text file by scanning fixed-size binary blocks for newlines.
+    Memory use is bounded by block_size regardless of file size.
+    """
+    n_lines, last_byte = 0, b'\n'
+    with open(path, 'rb') as f:
+        while block := f.read(block_size):
+            n_lines += block.count(b'\n')
+            last_byte = block[-1:]
+    if last_byte != b'\n': n_lines += 1 # Last line without trailing newline
+    return max(n_lines - int(header), 0)
+
+def row_offset(path: str, row: int, block_size: int = 1 << 24, header: bool = True) -> int:
+    """
+    Byte offset of data row `row` (0-based, after the header), found by scanning binary blocks for newlines.
+    Returns the file size if the file has fewer rows.
+    """
+    skip = row + int(header) # Newlines to pass
+    if skip == 0: return 0
+    offset = 0
+    with open(path, 'rb') as f:
+        while block := f.read(block_size):
+            n = block.count(b'\n')
+            if n >= skip: return offset + int(np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord('\n'))[skip - 1]) + 1
+            skip -= n
+            offset += len(block)
+    return offset
+
+def read_reassignments_chunked(path: str, start: int = 0, stop: int = None, chunksize: int = 100_000) -> tuple[dict, dict]:
+    """
+    Read rows [start, stop) of a reassignments CSV chunk by chunk, without loading the whole file.
+    Every chunk is reduced to NumPy columns (see parse_reassignments_frame) and copied into
+    preallocated output arrays, so peak memory is the output plus a single raw chunk.
+    Reading stops as soon as the requested range is covered.
+
+    Returns (columns, malformed_rows) with row indices relative to start.
+    """
+    if stop is None: stop = count_rows(path)
+    n_rows = max(stop - start, 0)
+
+    columns, malformed_rows, widths = {}, {}, {}
+    offset = 0 # Row index of the current chunk in the file
+
+    with pd.read_csv(path, chunksize=chunksize) as reader:
+        for chunk in reader:
+            prof.count('read.chunks')
+            chunk_start, chunk_end = offset, offset + len(chunk)
+            offset = chunk_end
+            if chunk_end <= start: continue # Skip list parsing of chunks before the requested range
+
+            lo, hi = max(start, chunk_start), min(stop, chunk_end)
+            chunk_columns, chunk_malformed = parse_reassignments_frame(chunk.iloc[lo - chunk_start:hi - chunk_start], widths)
+
+            for col, arr in chunk_columns.items():
+                if col not in columns: columns[col] = np.empty((n_rows,) + arr.shape[1:], dtype=arr.dtype)
+                if arr.ndim > 1: widths.setdefault(col, arr.shape[1])
+                columns[col][lo - start:hi - start] = arr
+
+            for col, rows in chunk_malformed.items():
+                malformed_rows.setdefault(col, []).append(rows + (lo - start))
+
+            if chunk_end >= stop: break
+
+    if offset < stop: columns = {col: arr[:max(offset - start, 0)] for col, arr in columns.items()} # File shorter than requested range
+    malformed_rows = {col: np.concatenate(rows) for col, rows in malformed_rows.items()}
+    return columns, malformed_rows
+
+# >>>>> Summary scans of raw tracking files >>>>>
+
+def read_header(path: str) -> list[str]:
+    with open(path) as f: return f.readline().strip().split(',')
+
+def read_tail(path: str, n: int = 5, block_size: int = 1 << 16) -> pd.DataFrame:
+    """
+    Read the last n rows of a CSV by seeking backwards from the end of the file, so only the tail is read.
+    """
+    header = read_header(path)
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = pos = f.tell()
+        tail = b''
+        while pos > 0 and tail.count(b'\n') <= n + 1: # Stop once n full lines (plus a partial one) are buffered
+            pos = max(pos - block_size, 0)
+            f.seek(pos)
+            tail = f.read(end - pos)
+
+    lines = tail.splitlines()
+    if pos == 0: lines = lines[1:] # Drop the header
+    lines = [line for line in lines[-n:] if line.strip()] if n > 0 else []
+    return pd.read_csv(io.BytesIO(b'\n'.join(lines)), names=header, header=None) if lines else pd.DataFrame(columns=header)
+
+class TailReader:
+    """
+    Follow a tracking CSV that a solver is still writing: every read() returns the complete rows appended since
+    the previous call. A partially written last line is kept back until its newline arrives.
+
+    Example:
+        > tail = TailReader("process_reassignments_sol1.csv", columns=["SolutionCost"])
+        > smoother = StreamingMovingAverage(window=101)
+        > while solver_running: plot(smoother.update(tail.read()["SolutionCost"]))
+    """
+    path    : str
+    header  : list[str]
+    columns : list[str]  # Columns to return (all if None)
+    position: int        # Byte offset of the first unread byte
+    partial : bytes      # Incomplete last line
+    rows    : int        # Rows returned so far
+
+    def __init__(self, path: str, columns: list[str] = None, from_start: bool = True):
+        self.path, self.columns = path, columns
+        self.header = read_header(path)
+        self.partial = b''
+        with open(path, 'rb') as f:
+            f.readline()
+            self.position = f.tell() if from_start else f.seek(0, os.SEEK_END)
+        self.rows = 0
+
+    def read(self, max_bytes: int = None) -> pd.DataFrame:
+        with open(self.path, 'rb') as f:
+            if f.seek(0, os.SEEK_END) < self.position: # Truncated or rewritten: start over after the header
+                f.seek(0)
+                f.readline()
+                self.position, self.partial = f.tell(), b''
+            f.seek(self.position)
+            data = self.partial + f.read(max_bytes if max_bytes is not None else -1)
+            self.position = f.tell()
+
+        cut = data.rfind(b'\n') + 1
+        data, self.partial = data[:cut], data[cut:]
+        if not data.strip(): return pd.DataFrame(columns=self.columns or self.header)
+
+        df = pd.read_csv(io.BytesIO(data), names=self.header, header=None, usecols=self.columns)
+        self.rows += len(df)
+        return df
+
+def scan_columns(path: str, columns: list[str], chunksize: int = 1_000_000) -> dict:
+    """
+    Read numeric scalar columns of a CSV in one chunked pass, so memory is bounded by the selected columns.
+    Returns {column: array}; the row count is the length of any array.
+
+    Example:
+        > cols = scan_columns("process_reassignments_sol1.csv", ["SolutionCost", "SolutionId"])
+    """
+    chunks = {col: [] for col in columns}
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+        for col in columns: chunks[col].append(chunk[col].to_numpy())
+    return {col: np.concatenate(parts) if parts else np.zeros(0) for col, parts in chunks.items()}
@@ -1,5 +1,80 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection, PolyCollection
+
+# >>>>> Decimation of long series >>>>>
+
+def axis_pixels(ax) -> tuple[int, int]:
+    """
+    Width and height of an axis in display pixels.
+    """
+    bbox = ax.get_window_extent()
+    return max(int(bbox.width), 1), max(int(bbox.height), 1)
+
+def downsample_minmax(x, y, n_buckets: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Keep the minimum and maximum of each of n_buckets equal-sized buckets, in their original order.
+    A line through the kept points covers the same pixels as the full series, so peaks are never lost.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    n = len(y)
+    if n <= 2 * n_buckets: return x, y
+
+    size = int(np.ceil(n / n_buckets))
+    n_full = n // size
+    low, high = (np.where(np.isnan(y), np.inf, y), np.where(np.isnan(y), -np.inf, y)) if y.dtype.kind == 'f' else (y, y) # NaNs never win
+    starts = np.arange(n_full) * size
+    keep = [starts + np.argmin(low[:n_full * size].reshape(n_full, size), axis=1),
+            starts + np.argmax(high[:n_full * size].reshape(n_full, size), axis=1)]
+    if n_full * size < n: # Partial last bucket
+        keep.append(n_full * size + np.array([np.argmin(low[n_full * size:]), np.argmax(high[n_full * size:])]))
+
+    idx = np.unique(np.concatenate(keep + [[0, n - 1]])) # Sorted, so the min/max of a bucket stay in order
+    return x[idx], y[idx]
+
+def downsample_lttb(x, y, n_out: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets: keep n_out points, per bucket the one spanning the largest triangle
+    with the previously kept point and the mean of the next bucket.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    n = len(y)
+    if n_out >= n or n_out < 3: return x, y
+
+    xf, yf = x.astype(float), y.astype(float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int) # n_out - 2 inner buckets between the fixed end points
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    for b in range(n_out - 2):
+        lo, hi = edges[b], max(edges[b + 1], edges[b] + 1)
+        next_lo, next_hi = edges[b + 1], edges[b + 2] if b + 2 < len(edges) else n
+        next_x, next_y = xf[next_lo:max(next_hi, next_lo + 1)].mean(), yf[next_lo:max(next_hi, next_lo + 1)].mean()
+        prev_x, prev_y = xf[idx[b]], yf[idx[b]]
+        area = np.abs((prev_x - next_x) * (yf[lo:hi] - prev_y) - (prev_x - xf[lo:hi]) * (next_y - prev_y))
+        idx[b + 1] = lo + int(np.argmax(area))
+    return x[idx], y[idx]
+
+def downsample(x, y, pixels: int, method: str = 'minmax') -> tuple[np.ndarray, np.ndarray]:
+    if method == 'lttb': return downsample_lttb(x, y, 2 * pixels)
+    return downsample_minmax(x, y, pixels)
+
+def _has_per_point_kwargs(kwargs: dict, n: int) -> bool:
+    return any(not isinstance(v, str) and np.ndim(v) > 0 and len(v) == n for v in (kwargs or {}).values())
+
+def block_reduce(z: np.ndarray, shape: tuple, func=np.nanmean) -> np.ndarray:
+    """
+    Aggregate a 2D array into at most `shape` blocks (ragged last blocks included), e.g. to fit an image into the axis pixels.
+    """
+    for axis, target in enumerate(shape):
+        if z.shape[axis] <= target: continue
+        size = int(np.ceil(z.shape[axis] / target))
+        starts = np.arange(0, z.shape[axis], size)
+        if func is np.nanmean or func is np.mean:
+            sums = np.add.reduceat(np.nan_to_num(z, nan=0.0), starts, axis=axis)
+            counts = np.add.reduceat((~np.isnan(z)).astype(np.int64) if z.dtype.kind == 'f' else np.ones_like(z, dtype=np.int64), starts, axis=axis)
+            z = sums / np.maximum(counts, 1)
+        else: z = np.stack([func(np.take(z, np.arange(s, min(s + size, z.shape[axis])), axis=axis), axis=axis) for s in starts], axis=axis)
+    return z
 
 def plot_on_ax(ax, x, y, z, ttl, xlbl, ylbl, zlbl, kwargs, zones, fticks, vlines):
 
@@ -26,6 +101,10 @@ def plot_on_ax(ax, x, y, z, ttl, xlbl, ylbl, zlbl, kwargs, zones, fticks, vlines
         vlines_opts = kwargs.pop('vlines')
         vlines_defaults.update(vlines_opts)
 
+    # Series longer than the axis is wide are decimated ('minmax' or 'lttb'), False plots every point
+    downsample_method = kwargs.pop('downsample', 'minmax') if kwargs else 'minmax'
+    pixels_x, pixels_y = axis_pixels(ax)
+
     if fticks is not None:
         step_size = fticks # Smaller shrinks, i.e. 1 = 1 tick at start, np.ceil(arr).astype(int)
         yticks = np.arange(min(y), 
@@ -47,21 +126,27 @@ def plot_on_ax(ax, x, y, z, ttl, xlbl, ylbl, zlbl, kwargs, zones, fticks, vlines
     if zones: # >>>>> Plot zones (Optional) >>>>>
 
         default_zone_opts = {'color': 'grey', 'alpha': 0.3, 'zorder': 0}
-        for x_start, x_end in zones:
-            ax.axvspan(x_start, x_end, **default_zone_opts)
+        spans = np.asarray(zones, dtype=float).reshape(-1, 2)
+        rects = np.stack([spans[:, [0, 0, 1, 1]], np.tile([0, 1, 1, 0], (len(spans), 1))], axis=-1) # Full axis height
+        ax.add_collection(PolyCollection(rects, transform=ax.get_xaxis_transform(), **default_zone_opts), autolim=False)
 
     if z is None: # >>>>> Handle Use Case - 1D array >>>>>
 
         fill_between = kwargs.pop('fill', False) if kwargs else False
-        if fill_between: ax.fill_between(x, y, color='skyblue', alpha=0.5)
-
         ptype = kwargs.pop('ptype', 'line') if kwargs else 'line'
 
+        # Scatter markers are not covered by the kept points, and per-point kwargs (c, s, ...) would no longer match
+        if ptype not in ('hist', 'scatter') and downsample_method and not _has_per_point_kwargs(kwargs, len(y)):
+            x, y = downsample(x, y, pixels_x, downsample_method)
+        if fill_between: ax.fill_between(x, y, color='skyblue', alpha=0.5)
+
         plot_defaults = {}
         if kwargs is not None: plot_defaults.update(kwargs)
 
         if ptype == 'scatter': ax.scatter(x, y, **plot_defaults)
-        elif ptype == 'hist': ax.hist(y, bins=x, **plot_defaults)
+        elif ptype == 'hist': # Pre-binned, matplotlib only draws one weighted sample per bin
+            counts, edges = np.histogram(np.asarray(y), bins=x)
+            ax.hist(edges[:-1], bins=edges, weights=counts, **plot_defaults)
         else: ax.plot(x, y, **plot_defaults)
         if 'label' in plot_defaults: ax.legend(loc='upper right')
 
@@ -70,12 +155,19 @@ def plot_on_ax(ax, x, y, z, ttl, xlbl, ylbl, zlbl, kwargs, zones, fticks, vlines
         print(f"plot_on_ax - Processed zdata_df: {z.shape}, xdata: {x.shape}, ydata: {y.shape}")
         default_opts = {'aspect': 'auto', 'origin': 'lower'}
         if kwargs is not None: default_opts.update(kwargs)
-        im = ax.imshow(z.T, **default_opts)
+
+        z = np.asarray(z)
+        image = z if z.ndim > 1 else z[:, None]
+        if downsample_method: # Block-aggregate to the axis pixels, the extent keeps the original index coordinates
+            default_opts.setdefault('extent', (-0.5, image.shape[0] - 0.5, -0.5, image.shape[1] - 0.5))
+            image = block_reduce(image, (pixels_x, pixels_y))
+        im = ax.imshow(image.T, **default_opts)
         if zlbl: plt.colorbar(im, ax=ax, label=zlbl)
 
-    if vlines: # >>>>> Draw vertical lines >>>>>
-        for vline in vlines:
-            ax.axvline(vline, **vlines_defaults)
+    if vlines is not None and len(vlines): # >>>>> Draw vertical lines, as one collection >>>>>
+        xs = np.asarray(vlines, dtype=float)
+        segments = np.stack([np.stack([xs, np.zeros_like(xs)], axis=1), np.stack([xs, np.ones_like(xs)], axis=1)], axis=1)
+        ax.add_collection(LineCollection(segments, transform=ax.get_xaxis_transform(), **vlines_defaults), autolim=False)
 
 def fig(plots, plt_height=4, ttl=None, glob_zones=None):
     """
@@ -0,0 +1,166 @@
+"""
+Session-wide instrumentation of the analysis toolkit: named timing sections, counters and (optionally) the peak
+traced memory of every section, collected into one report that can be printed or dumped to JSON.
+
+Profiling is off by default. Disabled, section() returns a shared no-op context and count() returns after one
+flag check, so the instrumented hot paths do not inspect frames or format strings.
+
+Example:
+    > from tools import profiling_utils as prof
+    > with prof.profile_session("load_report.json", memory=True):
+    >     ds = ReassignmentsDataset(path=path, use_cache=False)
+    >     ds.transition_statistics()
+    > prof.print_report()
+"""
+import os
+import json
+import time
+import functools
+import tracemalloc
+from contextlib import contextmanager
+
+try: import resource # Peak RSS, not available on Windows
+except ImportError: resource = None
+
+class _NullSection:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL_SECTION = _NullSection()
+
+class _Section:
+    __slots__ = ('profiler', 'name', 'start', 'mem_start', 'mem_peak')
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler, self.name = profiler, name
+
+    def __enter__(self):
+        if self.profiler.memory: self.profiler._push_memory(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        peak = self.profiler._pop_memory(self) if self.profiler.memory else None
+        self.profiler._record(self.name, elapsed, peak)
+        return False
+
+class Profiler:
+    """
+    Timers (calls, total, max), counters and per-section peak memory of one profiling session.
+    """
+    enabled : bool
+    memory  : bool   # Track per-section peak allocations with tracemalloc (slows allocations down while on)
+    sections: dict   # name -> [calls, total_s, max_s, peak_bytes]
+    counters: dict   # name -> count
+
+    def __init__(self):
+        self.enabled, self.memory = False, False
+        self.reset()
+
+    def reset(self):
+        self.sections, self.counters = {}, {}
+        self.started, self.wall_start = time.strftime('%Y-%m-%dT%H:%M:%S'), time.perf_counter()
+        self._memory_stack = []
+
+    def enable(self, memory: bool = False):
+        self.enabled, self.memory = True, memory
+        if memory and not tracemalloc.is_tracing(): tracemalloc.start()
+
+    def disable(self):
+        if self.memory and tracemalloc.is_tracing(): tracemalloc.stop()
+        self.enabled, self.memory = False, False
+        self._memory_stack = []
+
+    def section(self, name: str):
+        return _Section(self, name) if self.enabled else _NULL_SECTION
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled: self.counters[name] = self.counters.get(name, 0) + n
+
+    # >>>>> Nested peak memory: tracemalloc has one peak, so the enclosing sections' peaks are carried on a stack >>>>>
+
+    def _push_memory(self, section: _Section):
+        current, peak = tracemalloc.get_traced_memory()
+        if self._memory_stack: self._memory_stack[-1].mem_peak = max(self._memory_stack[-1].mem_peak, peak)
+        tracemalloc.reset_peak()
+        section.mem_start = section.mem_peak = current
+        self._memory_stack.append(section)
+
+    def _pop_memory(self, section: _Section) -> int:
+        _, peak = tracemalloc.get_traced_memory()
+        section.mem_peak = max(section.mem_peak, peak)
+        if self._memory_stack and self._memory_stack[-1] is section: self._memory_stack.pop()
+        if self._memory_stack: self._memory_stack[-1].mem_peak = max(self._memory_stack[-1].mem_peak, section.mem_peak)
+        return section.mem_peak - section.mem_start
+
+    def _record(self, name: str, elapsed: float, peak: int):
+        stats = self.sections.get(name)
+        if stats is None: stats = self.sections[name] = [0, 0.0, 0.0, None]
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] = max(stats[2], elapsed)
+        if peak is not None: stats[3] = peak if stats[3] is None else max(stats[3], peak)
+
+    # >>>>> Reporting >>>>>
+
+    def report(self) -> dict:
+        sections = {
+            name: {'calls': calls, 'total_s': total, 'mean_s': total / calls, 'max_s': longest, **({'peak_bytes': peak} if peak is not None else {})}
+            for name, (calls, total, longest, peak) in sorted(self.sections.items(), key=lambda item: -item[1][1])
+        }
+        report = {'started': self.started, 'wall_s': time.perf_counter() - self.wall_start, 'pid': os.getpid(),
+                  'sections': sections, 'counters': dict(sorted(self.counters.items()))}
+        if resource is not None: report['peak_rss_bytes'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 # KiB on Linux
+        return report
+
+profiler = Profiler() # Session of this process
+
+def enable(memory: bool = False): profiler.enable(memory)
+def disable(): profiler.disable()
+def reset(): profiler.reset()
+def section(name: str): return profiler.section(name)
+def count(name: str, n: int = 1): profiler.count(name, n)
+def report() -> dict: return profiler.report()
+
+def profiled(name: str):
+    """
+    Decorator timing every call of a function as section `name`. Disabled, it costs one flag check per call.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled: return func(*args, **kwargs)
+            with _Section(profiler, name): return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def dump_report(path: str) -> dict:
+    """
+    Write the report of the current session to a JSON file.
+    """
+    data = report()
+    with open(path, 'w') as f: json.dump(data, f, indent=2)
+    return data
+
+def print_report(data: dict = None):
+    data = data or report()
+    print(f"Profile of session started {data['started']} ({data['wall_s']:.2f}s wall):")
+    for name, stats in data['sections'].items():
+        peak = f"  peak {stats['peak_bytes'] / 2**20:9.1f} MiB" if 'peak_bytes' in stats else ""
+        print(f"  {name:<40} {stats['calls']:>8} calls  total {stats['total_s']:9.4f}s  max {stats['max_s']:9.4f}s{peak}")
+    for name, value in data['counters'].items(): print(f"  {name:<40} {value:>12,}")
+    if 'peak_rss_bytes' in data: print(f"  peak RSS {data['peak_rss_bytes'] / 2**20:.1f} MiB")
+
+@contextmanager
+def profile_session(path: str = None, memory: bool = False):
+    """
+    Profile the enclosed block as a fresh session and dump its report to `path` (if given) at the end.
+    """
+    reset()
+    enable(memory)
+    try: yield profiler
+    finally:
+        disable()
+        if path: dump_report(path)
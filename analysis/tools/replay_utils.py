@@ -0,0 +1,159 @@
+import numpy as np
+
+from tools import profiling_utils as prof
+from tools.model_utils import RoadefModel, load_model, load_assignment, instance_model, instance_assignment
+
+class MachineStateReplay:
+    """
+    Reconstruct per-machine, per-resource usage over a move stream, starting from the initial assignment.
+
+    Machine usage after every `checkpoint_every` moves is stored as a checkpoint. The state after any move
+    is the nearest earlier checkpoint plus a vectorized delta replay of the moves in between, so the full
+    (moves x machines x resources) tensor is never materialized.
+
+    State i is the usage after applying moves [0, i), i.e. state 0 is the initial assignment.
+
+    Example:
+        > replay = MachineStateReplay.from_files(ds, "jask/data/A/model_a1_2.txt", "jask/data/A/assignment_a1_2.txt")
+        > usage = replay.usage_at(50_000)                    # (machines, resources)
+        > heat = replay.utilization_series(np.linspace(0, len(replay), 200, dtype=int), resource=0) # (200, machines)
+    """
+    model           : RoadefModel
+    ps_id           : np.ndarray  # (N,) moved process per move
+    src_machine_id  : np.ndarray  # (N,) machine the process left (derived from the replayed assignment)
+    dest_machine_id : np.ndarray  # (N,) machine the process moved to
+    checkpoint_every: int
+    usage_checkpoints     : np.ndarray  # (C, M, R) usage at moves 0, K, 2K, ...
+    assignment_checkpoints: np.ndarray  # (C, P) assignment at moves 0, K, 2K, ...
+
+    def __init__(self, model: RoadefModel, initial_assignment: np.ndarray, ps_id: np.ndarray, dest_machine_id: np.ndarray,
+                 checkpoint_every: int = 10_000):
+        self.model = model
+        self.checkpoint_every = checkpoint_every
+
+        ps_id, dest_machine_id = np.asarray(ps_id, dtype=np.int64), np.asarray(dest_machine_id, dtype=np.int64) # Compact dataset dtypes would overflow in index arithmetic
+        valid = (ps_id >= 0) & (ps_id < model.n_processes) & (dest_machine_id >= 0) & (dest_machine_id < model.n_machines)
+        if not valid.all(): print(f"Warning: ignoring {np.count_nonzero(~valid)} moves with unknown process or destination machine.")
+        self.valid = valid
+        self.ps_id = np.where(valid, ps_id, 0)
+        self.dest_machine_id = np.where(valid, dest_machine_id, 0)
+
+        initial_assignment = np.asarray(initial_assignment)
+        self.src_machine_id = self.__derive_sources(initial_assignment)
+
+        self.__build_checkpoints(initial_assignment)
+
+    @classmethod
+    def from_dataset(cls, ds, model: RoadefModel, initial_assignment: np.ndarray, checkpoint_every: int = 10_000):
+        return cls(model, initial_assignment, ds.ps_id, ds.dest_machine_id, checkpoint_every)
+
+    @classmethod
+    def from_files(cls, ds, model_path: str, assignment_path: str, checkpoint_every: int = 10_000):
+        model = load_model(model_path)
+        return cls.from_dataset(ds, model, load_assignment(assignment_path, model.n_processes), checkpoint_every)
+
+    @classmethod
+    def from_instance(cls, ds, instance: str, checkpoint_every: int = 10_000):
+        """
+        Replay a dataset against the model and initial assignment of an instance, e.g. 'a1_2' (parsed once, see model_utils.instance_model).
+        """
+        return cls.from_dataset(ds, instance_model(instance), instance_assignment(instance), checkpoint_every)
+
+    def __len__(self) -> int:
+        return len(self.ps_id)
+
+    def __derive_sources(self, initial_assignment: np.ndarray) -> np.ndarray:
+        """
+        The source of a move is the destination of the previous move of the same process, or its initial machine.
+        """
+        moves = np.flatnonzero(self.valid)
+        order = moves[np.argsort(self.ps_id[moves], kind='stable')] # Moves grouped by process, chronological within a group
+        ps_sorted = self.ps_id[order]
+
+        src_sorted = np.empty(len(order), dtype=self.dest_machine_id.dtype)
+        first_of_process = np.r_[True, ps_sorted[1:] != ps_sorted[:-1]] if len(order) else np.zeros(0, dtype=bool)
+        src_sorted[first_of_process] = initial_assignment[ps_sorted[first_of_process]]
+        src_sorted[~first_of_process] = self.dest_machine_id[order][np.flatnonzero(~first_of_process) - 1]
+
+        src = np.full(len(self.ps_id), -1, dtype=self.dest_machine_id.dtype)
+        src[order] = src_sorted
+        return src
+
+    def __usage_delta(self, start: int, stop: int) -> np.ndarray:
+        """
+        (M, R) change in usage caused by moves [start, stop).
+        """
+        M, R = self.model.n_machines, self.model.n_resources
+        sl = slice(start, stop)
+        valid = self.valid[sl]
+        req = self.model.requirements[self.ps_id[sl][valid]]
+        cols = np.arange(R)
+
+        added = np.bincount((self.dest_machine_id[sl][valid][:, None] * R + cols).ravel(), weights=req.ravel(), minlength=M * R)
+        removed = np.bincount((self.src_machine_id[sl][valid][:, None] * R + cols).ravel(), weights=req.ravel(), minlength=M * R)
+        return np.rint(added - removed).astype(np.int64).reshape(M, R)
+
+    def __apply_assignment(self, assignment: np.ndarray, start: int, stop: int):
+        valid = self.valid[start:stop]
+        assignment[self.ps_id[start:stop][valid]] = self.dest_machine_id[start:stop][valid] # Later moves of a process overwrite earlier ones
+
+    @prof.profiled('replay.checkpoints')
+    def __build_checkpoints(self, initial_assignment: np.ndarray):
+        K = self.checkpoint_every
+        n_checkpoints = len(self) // K + 1
+
+        self.usage_checkpoints = np.empty((n_checkpoints, self.model.n_machines, self.model.n_resources), dtype=np.int64)
+        self.assignment_checkpoints = np.empty((n_checkpoints, self.model.n_processes), dtype=initial_assignment.dtype)
+
+        usage = self.model.initial_usage(initial_assignment)
+        assignment = initial_assignment.copy()
+        for c in range(n_checkpoints):
+            if c > 0:
+                usage = usage + self.__usage_delta((c - 1) * K, c * K)
+                self.__apply_assignment(assignment, (c - 1) * K, c * K)
+            self.usage_checkpoints[c] = usage
+            self.assignment_checkpoints[c] = assignment
+
+    def usage_at(self, move: int) -> np.ndarray:
+        """
+        (M, R) usage after the first `move` moves: nearest checkpoint plus delta replay.
+        """
+        move = int(np.clip(move, 0, len(self)))
+        c = move // self.checkpoint_every
+        return self.usage_checkpoints[c] + self.__usage_delta(c * self.checkpoint_every, move)
+
+    def assignment_at(self, move: int) -> np.ndarray:
+        """
+        (P,) machine of every process after the first `move` moves.
+        """
+        move = int(np.clip(move, 0, len(self)))
+        c = move // self.checkpoint_every
+        assignment = self.assignment_checkpoints[c].copy()
+        self.__apply_assignment(assignment, c * self.checkpoint_every, move)
+        return assignment
+
+    def usage_series(self, moves, resource: int = None) -> np.ndarray:
+        """
+        Usage at several move positions: (len(moves), M, R), or (len(moves), M) for a single resource.
+        Positions are visited in sorted order, so each move between them is replayed at most once.
+        """
+        moves = np.clip(np.asarray(moves, dtype=np.int64), 0, len(self))
+        order = np.argsort(moves, kind='stable')
+        out_shape = (len(moves), self.model.n_machines) + (() if resource is not None else (self.model.n_resources,))
+        out = np.empty(out_shape, dtype=np.int64)
+
+        current, usage = -1, None
+        for i in order:
+            move = moves[i]
+            c = move // self.checkpoint_every
+            if usage is None or current < c * self.checkpoint_every: usage = self.usage_at(move) # Jump to nearest checkpoint
+            else: usage = usage + self.__usage_delta(current, move)
+            current = move
+            out[i] = usage[:, resource] if resource is not None else usage
+        return out
+
+    def utilization_series(self, moves, resource: int) -> np.ndarray:
+        """
+        (len(moves), M) usage / capacity of one resource, e.g. for a utilization heatmap across the search.
+        """
+        return self.usage_series(moves, resource) / self.model.capacity[:, resource]
@@ -0,0 +1,297 @@
+import numpy as np
+import pandas as pd
+
+from tools import profiling_utils as prof
+from tools.model_utils import RoadefModel
+from tools.parsing_utils import SCALAR_COLUMNS, LIST_COLUMNS, SUM_SUFFIX, read_header, count_rows, read_reassignments_chunked
+
+# >>>>> Tracking file formats >>>>>
+TRACKING_FORMAT   = 'tracking'    # 22 columns with quoted list cells (jask, gavra)
+MEHTA_FORMAT      = 'mehta'       # 9 columns, mehta/cblns/simple_tracking.c: moveNumber,processId,...,solutionCost
+MEHTA_WIDE_FORMAT = 'mehta_wide'  # mehta/cblns/tracking.c: one column per resource (ProcessR0..R19, DestMachineUsage0..19, ...)
+
+_MEHTA_COLUMNS = {
+    'moveNumber'   : 'MoveNum',
+    'processId'    : 'ProcessID',
+    'sourceMachine': 'SourceMachine',
+    'destMachine'  : 'DestMachine',
+    'improvement'  : 'Improvement',   # -moveCost
+    'timestamp'    : 'Timestamp',     # Seconds since start
+    'solutionId'   : 'SolutionId',
+    'solutionCost' : 'SolutionCost',
+}
+
+_MEHTA_WIDE_SCALARS = [
+    'MoveNum', 'ProcessID', 'SourceMachine', 'DestMachine', 'OriginalMachine', 'Service', 'MoveCost', 'Improvement',
+    'Timestamp', 'SolutionId', 'DestMachineProcessCount', 'SourceMachineProcessCount', 'LoadCost', 'BalanceCost', 'SolutionCost',
+]
+_MEHTA_WIDE_LISTS = { # Column prefix -> list column, zero-padded to 20 resources
+    'ProcessR'           : 'ProcessResourceRequirements',
+    'DestMachineUsage'   : 'DestMachineResourceUsage',
+    'DestMachineCapacity': 'DestMachineCapacities',
+}
+_MEHTA_WIDE_RESOURCES = 20
+
+def detect_format(path: str) -> str:
+    header = read_header(path)
+    if header[0] == 'moveNumber': return MEHTA_FORMAT
+    if 'ProcessR0' in header: return MEHTA_WIDE_FORMAT
+    if 'ProcessResourceRequirements' in header: return TRACKING_FORMAT
+    raise ValueError(f"{path}: unknown tracking file header {','.join(header[:5])},...")
+
+class MoveStreamDeriver:
+    """
+    Derive the model-dependent columns of the 22-column layout from (process, source, destination) move streams.
+
+    Machine usage and process counts after every move are computed per chunk with one sort of the
+    (machine, move) events and a grouped cumulative sum, so the per-move state is never replayed in Python.
+    Load and balance costs only change on the two touched machines and are accumulated from per-move deltas.
+    The state at the end of a chunk carries over to the next one.
+    """
+    model       : RoadefModel
+    assignment  : np.ndarray  # (P,) initial assignment, used for OriginalMachine
+    usage       : np.ndarray  # (M, R) usage after the moves seen so far
+    ps_count    : np.ndarray  # (M,) processes per machine
+    load_cost   : int
+    balance_cost: int
+
+    def __init__(self, model: RoadefModel, initial_assignment: np.ndarray):
+        self.model = model
+        self.assignment = np.asarray(initial_assignment)
+        self.usage = model.initial_usage(self.assignment)
+        self.ps_count = np.bincount(self.assignment, minlength=model.n_machines)
+        self.load_cost = int(self.__load(self.usage, np.arange(model.n_machines)).sum())
+        self.balance_cost = int(self.__balance(self.usage, np.arange(model.n_machines)).sum())
+
+    def __load(self, usage: np.ndarray, machines: np.ndarray) -> np.ndarray:
+        return np.maximum(usage - self.model.safety_capacity[machines], 0) @ self.model.load_cost_weights
+
+    def __balance(self, usage: np.ndarray, machines: np.ndarray) -> np.ndarray:
+        m = self.model
+        if not m.n_balances: return np.zeros(len(machines), dtype=np.int64)
+        remaining = m.capacity[machines] - usage
+        return np.maximum(m.balance_targets * remaining[:, m.balance_resources[:, 0]] - remaining[:, m.balance_resources[:, 1]], 0) @ m.balance_weights
+
+    def __after_events(self, state: np.ndarray, machines: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """
+        State of each event's machine right after the event, for events in chronological order.
+        """
+        order = np.argsort(machines, kind='stable') # Grouped by machine, chronological within a group
+        sorted_machines = machines[order]
+        running = np.cumsum(weights[order], axis=0)
+        group_start = np.r_[0, np.flatnonzero(sorted_machines[1:] != sorted_machines[:-1]) + 1] if len(order) else np.zeros(0, dtype=np.int64)
+        before_group = np.r_[np.zeros((1,) + running.shape[1:], dtype=running.dtype), running][group_start] # Running total before each group
+        group = np.cumsum(np.r_[0, sorted_machines[1:] != sorted_machines[:-1]]) if len(order) else np.zeros(0, dtype=np.int64)
+
+        after = np.empty_like(running)
+        after[order] = state[sorted_machines] + running - before_group[group]
+        return after
+
+    def derive(self, ps_id: np.ndarray, src: np.ndarray, dest: np.ndarray) -> tuple[dict, np.ndarray]:
+        """
+        Columns derived for one chunk of moves. Returns (columns, valid) where valid marks moves with known IDs;
+        derived values of the other moves are zero.
+        """
+        m = self.model
+        n = len(ps_id)
+        valid = (ps_id >= 0) & (ps_id < m.n_processes) & (src >= 0) & (src < m.n_machines) & (dest >= 0) & (dest < m.n_machines) & (src != dest)
+        rows = np.flatnonzero(valid)
+        p, s, d = ps_id[rows], src[rows], dest[rows]
+        req = m.requirements[p]
+
+        # Two events per move, interleaved so event order is chronological: leave the source, enter the destination
+        events = np.column_stack([s, d]).ravel()
+        req_events = np.stack([-req, req], axis=1).reshape(-1, m.n_resources)
+        count_events = np.tile(np.array([-1, 1], dtype=np.int64), len(rows))
+        usage_after = self.__after_events(self.usage, events, req_events)
+        count_after = self.__after_events(self.ps_count, events, count_events)
+        src_usage, dest_usage = usage_after[0::2], usage_after[1::2]
+
+        load_delta = (self.__load(src_usage, s) - self.__load(src_usage + req, s)
+                      + self.__load(dest_usage, d) - self.__load(dest_usage - req, d))
+        balance_delta = (self.__balance(src_usage, s) - self.__balance(src_usage + req, s)
+                         + self.__balance(dest_usage, d) - self.__balance(dest_usage - req, d))
+
+        def full(values):
+            out = np.zeros((n,) + values.shape[1:], dtype=values.dtype)
+            out[rows] = values
+            return out
+
+        safe_ps = np.where((ps_id >= 0) & (ps_id < m.n_processes), ps_id, 0)
+        known_ps = safe_ps == ps_id
+        columns = {
+            'OriginalMachine'            : np.where(known_ps, self.assignment[safe_ps], -1),
+            'Service'                    : np.where(known_ps, m.process_service[safe_ps], -1),
+            'MoveCost'                   : np.where(known_ps, m.process_move_cost[safe_ps], 0),
+            'ProcessResourceRequirements': np.where(known_ps[:, None], m.requirements[safe_ps], 0),
+            'SourceMachineResourceUsage' : full(src_usage),
+            'DestMachineResourceUsage'   : full(dest_usage),
+            'SourceMachineCapacities'    : full(m.capacity[s]),
+            'DestMachineCapacities'      : full(m.capacity[d]),
+            'SourceMachineProcessCount'  : full(count_after[0::2]),
+            'DestMachineProcessCount'    : full(count_after[1::2]),
+            'LoadCost'                   : self.load_cost + np.cumsum(full(load_delta)),
+            'BalanceCost'                : self.balance_cost + np.cumsum(full(balance_delta)),
+        }
+
+        # >>>>> Carry the state over to the next chunk >>>>>
+        self.usage += self.__net(events, req_events, m.n_machines)
+        self.ps_count += np.bincount(d, minlength=m.n_machines) - np.bincount(s, minlength=m.n_machines)
+        if n:
+            self.load_cost = int(columns['LoadCost'][-1])
+            self.balance_cost = int(columns['BalanceCost'][-1])
+        return columns, valid
+
+    @staticmethod
+    def __net(machines: np.ndarray, weights: np.ndarray, n_machines: int) -> np.ndarray:
+        R = weights.shape[1]
+        flat = (machines[:, None] * R + np.arange(R)).ravel()
+        return np.rint(np.bincount(flat, weights=weights.ravel(), minlength=n_machines * R)).astype(np.int64).reshape(n_machines, R)
+
+def _mehta_chunk(chunk: pd.DataFrame, fmt: str, width: int) -> dict:
+    """
+    Logged columns of a mehta chunk under their 22-column names. Timestamps become milliseconds since start.
+    """
+    if fmt == MEHTA_FORMAT:
+        columns = {name: chunk[col].to_numpy() for col, name in _MEHTA_COLUMNS.items()}
+    else:
+        columns = {col: chunk[col].to_numpy() for col in _MEHTA_WIDE_SCALARS}
+        for prefix, name in _MEHTA_WIDE_LISTS.items():
+            columns[name] = chunk[[f"{prefix}{r}" for r in range(width)]].to_numpy(dtype=np.int64)
+    columns['Timestamp'] = np.rint(columns['Timestamp'] * 1000).astype(np.int64)
+    return columns
+
+def _wide_width(path: str, model: RoadefModel) -> int:
+    """
+    Resources of a wide mehta file: from the model if given, else the highest non-zero ProcessR column in the first rows.
+    """
+    if model is not None: return model.n_resources
+    head = pd.read_csv(path, nrows=10_000, usecols=[f"ProcessR{r}" for r in range(_MEHTA_WIDE_RESOURCES)]).to_numpy()
+    nonzero = np.flatnonzero(head.any(axis=0))
+    return int(nonzero[-1]) + 1 if nonzero.size else 0
+
+def read_normalized(path: str, start: int = 0, stop: int = None, chunksize: int = 100_000,
+                    model: RoadefModel = None, initial_assignment: np.ndarray = None) -> tuple[dict, dict]:
+    """
+    Read rows [start, stop) of any solver's tracking file into the typed column set of the 22-column layout
+    (see parse_reassignments_frame), streaming chunk by chunk.
+
+    mehta files lack most columns. With the instance's model and initial assignment, requirements, capacities,
+    machine usage, process counts, load and balance costs are derived by replaying the move stream (see MoveStreamDeriver).
+    Values that can not be derived (transient usage, everything model-dependent without a model, moves with
+    unknown IDs) are zero and their rows are listed in malformed_rows[column], like cells that failed to parse.
+
+    Returns (columns, malformed_rows) with row indices relative to start.
+    """
+    fmt = detect_format(path)
+    if fmt == TRACKING_FORMAT: return read_reassignments_chunked(path, start, stop, chunksize=chunksize)
+    if (model is None) != (initial_assignment is None): raise ValueError("Pass both the model and the initial assignment, or neither.")
+
+    if stop is None: stop = count_rows(path)
+    n_rows = max(stop - start, 0)
+    width = _wide_width(path, model) if fmt == MEHTA_WIDE_FORMAT else (model.n_resources if model is not None else 0)
+    deriver = MoveStreamDeriver(model, initial_assignment) if model is not None else None
+
+    columns, missing = {}, {}
+    offset = 0
+    with pd.read_csv(path, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk_start, chunk_end = offset, offset + len(chunk)
+            offset = chunk_end
+            logged = _mehta_chunk(chunk, fmt, width)
+
+            # Rows before `start` are still derived, the machine state depends on every earlier move
+            prof.count('normalize.rows', len(chunk))
+            if deriver is not None:
+                with prof.section('normalize.derive'): derived, valid = deriver.derive(logged['ProcessID'], logged['SourceMachine'], logged['DestMachine'])
+            else:
+                derived, valid = {}, np.zeros(len(chunk), dtype=bool)
+            if chunk_end <= start: continue
+
+            lo, hi = max(start, chunk_start), min(stop, chunk_end)
+            chunk_rows = slice(lo - chunk_start, hi - chunk_start)
+            out_rows = slice(lo - start, hi - start)
+
+            for col in SCALAR_COLUMNS + LIST_COLUMNS:
+                shape = (width,) if col in LIST_COLUMNS else ()
+                if col in logged: values, unknown = logged[col], None
+                elif col in derived: values, unknown = derived[col], ~valid
+                else: values, unknown = np.zeros((len(chunk),) + shape, dtype=np.int64), np.ones(len(chunk), dtype=bool)
+                if col in ('OriginalMachine', 'Service', 'MoveCost', 'ProcessResourceRequirements') and col in derived:
+                    unknown = derived['OriginalMachine'] < 0 # Only the process ID has to be known
+
+                if col not in columns: columns[col] = np.empty((n_rows,) + values.shape[1:], dtype=values.dtype)
+                columns[col][out_rows] = values[chunk_rows]
+                if unknown is not None and unknown[chunk_rows].any():
+                    missing.setdefault(col, []).append(np.flatnonzero(unknown[chunk_rows]) + (lo - start))
+
+            if chunk_end >= stop: break
+
+    if offset < stop: columns = {col: arr[:max(offset - start, 0)] for col, arr in columns.items()}
+    for col in LIST_COLUMNS:
+        if col in columns: columns[col + SUM_SUFFIX] = np.sum(columns[col], axis=1)
+    return columns, {col: np.concatenate(rows) for col, rows in missing.items()}
+
+# >>>>> Compact dtypes >>>>>
+
+_INT_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+def smallest_int_dtype(lo: int, hi: int) -> np.dtype:
+    """
+    Smallest signed integer dtype holding [lo, hi]. Signed types only, so differences and -1 markers stay safe.
+    """
+    for dtype in _INT_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max: return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+def model_bounds(model: RoadefModel) -> dict:
+    """
+    Value range of the integer columns allowed by an instance, e.g. process IDs in [-1, P).
+    Using the model instead of only the observed values gives every run of an instance the same dtypes.
+    Only ID, process count and resource columns have bounds: costs, timestamps and move/solution numbers are unbounded.
+    """
+    P, M, S = model.n_processes, model.n_machines, model.n_services
+    total = model.requirements.sum(axis=0) # Upper bound of any machine's usage per resource
+    capacity = model.capacity
+    return {
+        'ProcessID'                  : (-1, P - 1),
+        'SourceMachine'              : (-1, M - 1),
+        'DestMachine'                : (-1, M - 1),
+        'OriginalMachine'            : (-1, M - 1),
+        'Service'                    : (-1, S - 1),
+        'SourceMachineProcessCount'  : (0, P),
+        'DestMachineProcessCount'    : (0, P),
+        'ProcessResourceRequirements': (0, int(model.requirements.max(initial=0))),
+        'SourceMachineResourceUsage' : (0, int(total.max(initial=0))),
+        'DestMachineResourceUsage'   : (0, int(total.max(initial=0))),
+        'SourceMachineTransientUsage': (0, int(total.max(initial=0))),
+        'DestMachineTransientUsage'  : (0, int(total.max(initial=0))),
+        'SourceMachineCapacities'    : (0, int(capacity.max(initial=0))),
+        'DestMachineCapacities'      : (0, int(capacity.max(initial=0))),
+        'ProcessResourceRequirements' + SUM_SUFFIX: (0, int(model.requirements.sum(axis=1).max(initial=0))),
+        'SourceMachineResourceUsage' + SUM_SUFFIX : (0, int(total.sum())),
+        'DestMachineResourceUsage' + SUM_SUFFIX   : (0, int(total.sum())),
+        'SourceMachineTransientUsage' + SUM_SUFFIX: (0, int(total.sum())),
+        'DestMachineTransientUsage' + SUM_SUFFIX  : (0, int(total.sum())),
+        'SourceMachineCapacities' + SUM_SUFFIX    : (0, int(capacity.sum(axis=1).max(initial=0))),
+        'DestMachineCapacities' + SUM_SUFFIX      : (0, int(capacity.sum(axis=1).max(initial=0))),
+    }
+
+def compact_columns(columns: dict, bounds: dict = None) -> dict:
+    """
+    Downcast the integer columns that have model bounds (IDs, process counts, resource amounts) to the smallest
+    signed dtype holding both their values and their bounds. Columns without bounds (costs, timestamps, move and
+    solution numbers) keep their dtype, so arithmetic on them, e.g. load_cost + balance_cost or a cumulative sum,
+    can not overflow. Float columns are left unchanged.
+    """
+    bounds = bounds or {}
+    compact = {}
+    for col, arr in columns.items():
+        if col not in bounds or arr.dtype.kind not in 'iu' or arr.dtype.itemsize == 1:
+            compact[col] = arr
+            continue
+        lo, hi = bounds[col]
+        if arr.size: lo, hi = min(lo, int(arr.min())), max(hi, int(arr.max()))
+        compact[col] = arr.astype(smallest_int_dtype(lo, hi), copy=False)
+    return compact
@@ -0,0 +1,135 @@
+"""
+Batch scoring of final solutions: every solver's final assignment is diffed against the initial assignment of its
+instance (moved processes, per-service and per-machine churn) and scored against the ROADEF lower bound and
+original cost. Instances are scored in parallel (one task per instance, so each model is parsed once) and
+merged into one table ranked by gap to the lower bound.
+
+Usage (from analysis/):
+    python -m tools.solution_scoring [--solver gavra] [--instance "a1_*"] [--workers 8] [--csv solutions.csv]
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from tools.dataset_registry import DatasetRegistry, default_registry
+from tools.model_utils import RoadefModel, instance_model, instance_assignment, instance_references, load_solution
+
+def assignment_churn(model: RoadefModel, initial_assignment: np.ndarray, assignments: np.ndarray) -> dict:
+    """
+    Difference of one (P,) or several (K, P) assignments to the initial assignment.
+
+    Returns a dict of arrays with K rows:
+        - moved: (K,) processes not on their initial machine
+        - service_moved: (K, S) moved processes per service
+        - machine_out / machine_in: (K, M) processes that left / arrived at every machine
+    """
+    assignments = np.atleast_2d(np.asarray(assignments))
+    K, P = assignments.shape
+    moved = assignments != initial_assignment # (K, P)
+    rows, ps = np.nonzero(moved)
+
+    S, M = model.n_services, model.n_machines
+    service = np.bincount(rows * S + model.process_service[ps], minlength=K * S).reshape(K, S)
+    out = np.bincount(rows * M + initial_assignment[ps], minlength=K * M).reshape(K, M)
+    into = np.bincount(rows * M + assignments[rows, ps], minlength=K * M).reshape(K, M)
+    return {'moved': moved.sum(axis=1), 'service_moved': service, 'machine_out': out, 'machine_in': into}
+
+def score_instance(task: dict) -> list[dict]:
+    """
+    Score all final solutions of one instance. `task` holds 'instance' and 'entries' (solver, run, path).
+    """
+    from tools.cost_utils import CostEvaluator
+
+    instance = task['instance']
+    rows = [{'solver': e['solver'], 'instance': instance, 'run': e['run'], 'path': e['path']} for e in task['entries']]
+    try:
+        model, initial = instance_model(instance), instance_assignment(instance)
+        refs = instance_references(instance)
+    except (OSError, LookupError, ValueError) as e:
+        for row in rows: row['error'] = f"{type(e).__name__}: {e}"
+        return rows
+
+    solutions, scored = [], []
+    for row in rows:
+        try:
+            solutions.append(load_solution(row['path'], model.n_processes))
+            scored.append(row)
+        except (OSError, ValueError) as e: row['error'] = f"{type(e).__name__}: {e}"
+    if not solutions: return rows
+
+    solutions = np.stack(solutions)
+    scores = CostEvaluator(model, initial).evaluate(solutions)
+    churn = assignment_churn(model, initial, solutions)
+    machine_churn = churn['machine_out'] + churn['machine_in']
+
+    for k, row in enumerate(scored):
+        cost = int(scores['total_cost'][k])
+        row.update(
+            total_cost=cost, feasible=bool(scores['feasible'][k]),
+            load_cost=int(scores['load_cost'][k]), balance_cost=int(scores['balance_cost'][k]),
+            move_cost=int(scores['process_move_cost'][k] + scores['service_move_cost'][k] + scores['machine_move_cost'][k]),
+            lb=refs['lb'], original_cost=refs['original_cost'],
+            moved=int(churn['moved'][k]), moved_pct=churn['moved'][k] / model.n_processes * 100,
+            services_touched=int(np.count_nonzero(churn['service_moved'][k])), max_service_moved=int(churn['service_moved'][k].max(initial=0)),
+            machines_touched=int(np.count_nonzero(machine_churn[k])), max_machine_churn=int(machine_churn[k].max(initial=0)),
+        )
+        if refs['lb']: row['gap_to_lb_%'] = (cost - refs['lb']) / refs['lb'] * 100
+        if refs['original_cost']: row['improvement_%'] = (refs['original_cost'] - cost) / refs['original_cost'] * 100
+    return rows
+
+def collect_tasks(registry: DatasetRegistry = None, solver: str = None, instance: str = None) -> list[dict]:
+    """
+    One task per instance with all of its final solution files.
+    """
+    registry = registry or default_registry()
+    by_instance = {}
+    for entry in registry.solutions(solver=solver, instance=instance):
+        by_instance.setdefault(entry.instance, []).append({'solver': entry.solver, 'run': entry.run, 'path': entry.path})
+    return [{'instance': name, 'entries': entries} for name, entries in sorted(by_instance.items())]
+
+def score_solutions(registry: DatasetRegistry = None, solver: str = None, instance: str = None, workers: int = None) -> pd.DataFrame:
+    """
+    Score all matching final solutions in parallel: one row per solution file, ranked within its instance
+    by total cost ('rank' 1 is the best) and sorted by gap to the lower bound.
+
+    Example:
+        > table = score_solutions(instance="a1_*")
+        > table.pivot_table(index="instance", columns="solver", values="gap_to_lb_%", aggfunc="min")
+    """
+    tasks = collect_tasks(registry, solver, instance)
+    if not tasks: return pd.DataFrame()
+
+    if workers == 1 or len(tasks) == 1: parts = [score_instance(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool: parts = list(pool.map(score_instance, tasks))
+
+    table = pd.DataFrame([row for part in parts for row in part])
+    if 'total_cost' in table:
+        table['rank'] = table.groupby('instance')['total_cost'].rank(method='min').astype('Int64')
+        sort_by = ['gap_to_lb_%'] if 'gap_to_lb_%' in table else ['instance', 'rank']
+        table = table.sort_values(sort_by, ignore_index=True, na_position='last')
+    return table
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score all final solutions against the ROADEF reference costs.")
+    parser.add_argument("--solver", help="Solver filter (glob), e.g. gavra")
+    parser.add_argument("--instance", help="Instance filter (glob), e.g. 'a1_*'")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: number of cores)")
+    parser.add_argument("--csv", help="Write the table to this CSV file")
+    args = parser.parse_args(argv)
+
+    table = score_solutions(solver=args.solver, instance=args.instance, workers=args.workers)
+    if table.empty:
+        print("No solutions found.")
+        return table
+
+    with pd.option_context('display.max_columns', None, 'display.width', 250):
+        print(table.drop(columns=['path']).to_string(index=False, float_format=lambda v: f"{v:,.3f}"))
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+        print(f"Saved {len(table)} solutions to {args.csv}")
+    return table
+
+if __name__ == "__main__":
+    main()
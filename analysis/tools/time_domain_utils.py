@@ -23,18 +23,22 @@ def weighted_moving_average(type, data, window=5, sigma=1, pad_mode='reflect') -
     pad = window // 2
     data_padded = np.pad(data, pad_width=pad, mode=pad_mode)
 
-    # >>>>> Weight Types>>>>>
+    return np.convolve(data_padded, window_weights(type, window, sigma), mode='valid')
 
+def window_weights(type, window=5, sigma=1) -> np.ndarray:
+    """
+    Normalized weights of a moving average window: 'uniform', 'gaussian' or 'hann'.
+    """
     if type == 'uniform':
         weights = np.ones(window) / window
     elif type == 'gaussian':
-        weights = sp.signal.gaussian(window, std=sigma)
+        weights = sp.signal.windows.gaussian(window, std=sigma)
         weights /= weights.sum()  # Normalize weights
     elif type == 'hann':
         weights = np.hanning(window) # or np.hamming
         weights /= weights.sum()  # Normalize weights
-    
-    return np.convolve(data_padded, weights, mode='valid')
+    else: raise ValueError(f"Unknown weight type: {type}. Use 'uniform', 'gaussian' or 'hann'.")
+    return weights
 
 def block_mean(data, window: int) -> np.ndarray:
     """
@@ -76,10 +80,225 @@ def moving_window_mean(data, window=5, center=True, axis=1) -> np.ndarray:
             result[tuple(slicer)] = means
         return result
 
-def density_distribution(array, n_bins=1000):
-    density = sp.stats.gaussian_kde(array)
+def density_distribution(array, n_bins=1000, bw_method='scott', weights=None, method='fft', refine=None):
+    """
+    Gaussian kernel density of `array` evaluated on n_bins points between its min and max.
+
+    method:
+        - 'fft': linear binning onto a regular grid followed by an FFT convolution with the kernel, O(N + bins log bins).
+        - 'exact': scipy.stats.gaussian_kde, O(N * bins), only for small arrays.
+    bw_method: 'scott', 'silverman' or a scalar factor, as in gaussian_kde (bandwidth = factor * weighted std).
+    weights: optional per-sample weights, e.g. process counts of per-service aggregates instead of an expanded array.
+    refine: binning grid points per output step of the 'fft' method, by default enough for a grid step of at most 1/20 bandwidth.
+
+    Example:
+        > x, density = density_distribution(ds.move_cost, bw_method='silverman')
+    """
+    array = np.asarray(array, dtype=float).ravel()
     x = np.linspace(array.min(), array.max(), n_bins)
-    return x, density(x)
+    if method == 'exact': return x, sp.stats.gaussian_kde(array, bw_method=bw_method, weights=weights)(x)
+    if method != 'fft': raise ValueError(f"Unknown method: {method}. Use 'fft' or 'exact'.")
+
+    weights = np.ones_like(array) if weights is None else np.asarray(weights, dtype=float).ravel()
+    weights = weights / weights.sum()
+    bandwidth = kde_bandwidth(array, bw_method, weights)
+    if not bandwidth > 0: raise ValueError("Density of a constant array is undefined (zero bandwidth).")
+
+    # >>>>> Linear binning: every sample splits its weight between the two nearest grid points >>>>>
+
+    lo, hi = x[0], x[-1]
+    if refine is None: refine = int(np.clip(np.ceil(20 * (hi - lo) / (n_bins - 1) / bandwidth), 1, (1 << 20) // n_bins))
+    grid_size = (n_bins - 1) * refine + 1 # Output points lie on the grid
+    step = (hi - lo) / (grid_size - 1)
+    pos = (array - lo) / step
+    idx = np.minimum(pos.astype(np.int64), grid_size - 2)
+    frac = pos - idx
+    mass = np.bincount(idx, weights * (1 - frac), minlength=grid_size) + np.bincount(idx + 1, weights * frac, minlength=grid_size)
+
+    # >>>>> Convolution with the kernel sampled at grid offsets (cut at 5 bandwidths) >>>>>
+
+    reach = int(min(np.ceil(5 * bandwidth / step), grid_size - 1))
+    offsets = np.arange(-reach, reach + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    density = sp.signal.fftconvolve(mass, kernel, mode='same')
+
+    return x, np.maximum(density[::refine], 0.0) # FFT round-off can go slightly negative
+
+def kde_bandwidth(array, bw_method='scott', weights=None) -> float:
+    """
+    Kernel bandwidth the way gaussian_kde picks it: rule-of-thumb factor times the weighted standard deviation.
+    """
+    weights = np.full(len(array), 1 / len(array)) if weights is None else weights / np.sum(weights)
+    n_eff = 1 / np.sum(weights ** 2)
+    if bw_method == 'scott': factor = n_eff ** (-1 / 5)
+    elif bw_method == 'silverman': factor = (n_eff * 3 / 4) ** (-1 / 5)
+    elif np.isscalar(bw_method): factor = float(bw_method)
+    else: raise ValueError(f"Unknown bandwidth rule: {bw_method}. Use 'scott', 'silverman' or a scalar.")
+    return factor * np.sqrt(np.cov(array, aweights=weights))
 
 def moving_variance(arr, window=10, center=True):
     return pd.Series(arr).rolling(window, center=center).var().to_numpy()
+
+# >>>>> Streaming counterparts for live tracking tails >>>>>
+# Each filter consumes appended chunks with update() and returns the outputs that became final;
+# flush() returns the trailing outputs once the stream ended. Concatenated, they equal the batch function.
+# Outputs that need samples to the right (centered windows) are emitted once those samples arrived.
+
+# scipy.ndimage boundary mode -> np.pad mode
+_NDIMAGE_PAD_MODES = {'reflect': 'symmetric', 'mirror': 'reflect', 'nearest': 'edge', 'constant': 'constant'}
+
+class StreamingWindowFilter:
+    """
+    Window of `window` samples over the stream padded with `pad_left`/`pad_right` samples (np.pad mode),
+    keeping only the last window - 1 samples between chunks. Subclasses reduce complete windows in `_reduce`.
+    """
+    window   : int
+    pad_left : int
+    pad_right: int
+    pad_mode : str
+    head     : np.ndarray  # Samples collected before the left padding can be built
+    tail     : np.ndarray  # Last window - 1 samples of the padded stream
+    recent   : np.ndarray  # Last pad_right + 1 raw samples
+    n_samples: int
+
+    def __init__(self, window: int, pad_left: int, pad_right: int, pad_mode: str = 'constant', pad_value: float = np.nan):
+        self.window, self.pad_left, self.pad_right = window, pad_left, pad_right
+        self.pad_mode, self.pad_value = pad_mode, pad_value
+        self.head = np.zeros(0)
+        self.tail, self.recent = None, None
+        self.n_samples = 0
+
+    def __pad(self, data: np.ndarray, before: int, after: int) -> np.ndarray:
+        if self.pad_mode == 'constant': return np.pad(data.astype(float), (before, after), mode='constant', constant_values=self.pad_value)
+        return np.pad(data.astype(float), (before, after), mode=self.pad_mode)
+
+    def _reduce(self, stream: np.ndarray) -> np.ndarray:
+        """
+        Outputs of all complete windows of `stream`: len(stream) - window + 1 values.
+        """
+        raise NotImplementedError
+
+    def update(self, chunk) -> np.ndarray:
+        chunk = np.asarray(chunk, dtype=float).ravel()
+        self.n_samples += len(chunk)
+
+        if self.tail is None: # Hold samples until the first window is complete, so the left padding sees enough of the signal
+            self.head = np.r_[self.head, chunk]
+            if len(self.head) < max(self.window, self.pad_left + 1): return np.zeros(0)
+            chunk, self.head = self.__pad(self.head, self.pad_left, 0), np.zeros(0)
+            self.tail, self.recent = np.zeros(0), np.zeros(0)
+
+        self.recent = np.r_[self.recent, chunk][-(self.pad_right + 1):] # Raw samples needed for the right padding
+        stream = np.r_[self.tail, chunk]
+        self.tail = stream[max(len(stream) - self.window + 1, 0):]
+        if len(stream) < self.window: return np.zeros(0)
+        return self._reduce(stream)
+
+    def flush(self) -> np.ndarray:
+        """
+        Outputs of the last pad_right samples, which need the right padding of the finished stream.
+        """
+        if self.tail is None: # Stream shorter than one window: filter it in one go
+            if len(self.head) < self.window - self.pad_left - self.pad_right: return np.zeros(0)
+            padded, self.head = self.__pad(self.head, self.pad_left, self.pad_right), np.zeros(0)
+            self.n_samples = 0
+            return self._reduce(padded)
+
+        if not self.pad_right: return np.zeros(0)
+        right = self.__pad(self.recent, 0, self.pad_right)[-self.pad_right:]
+        stream, self.tail = np.r_[self.tail, right], None
+        self.n_samples = 0
+        return self._reduce(stream)
+
+def _window_sums(stream: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sum and NaN count of every complete window via running sums (O(1) per sample).
+    """
+    nan = np.isnan(stream)
+    sums = np.cumsum(np.r_[0.0, np.where(nan, 0.0, stream)])
+    nans = np.cumsum(np.r_[0, nan])
+    return sums[window:] - sums[:-window], nans[window:] - nans[:-window]
+
+class StreamingWindowMean(StreamingWindowFilter):
+    """
+    Streaming moving_window_mean (1D): NaN where the window does not fit, like the batch version.
+    """
+    def __init__(self, window=5, center=True):
+        pad_left = window // 2 if center else window - 1
+        super().__init__(window, pad_left, window - pad_left - 1)
+
+    def _reduce(self, stream):
+        sums, nans = _window_sums(stream, self.window)
+        return np.where(nans > 0, np.nan, sums / self.window)
+
+class StreamingMovingAverage(StreamingWindowMean):
+    """
+    Streaming moving_average (scipy.ndimage.uniform_filter) with the same boundary mode.
+    """
+    def __init__(self, window=3, mode='reflect'):
+        if mode not in _NDIMAGE_PAD_MODES: raise ValueError(f"Mode {mode} can not be streamed, use one of {list(_NDIMAGE_PAD_MODES)}.")
+        pad_left = window // 2
+        StreamingWindowFilter.__init__(self, window, pad_left, window - pad_left - 1, _NDIMAGE_PAD_MODES[mode], pad_value=0.0)
+
+class StreamingWeightedMovingAverage(StreamingWindowFilter):
+    """
+    Streaming weighted_moving_average. Non-uniform weights cost O(window) per sample.
+    """
+    def __init__(self, type, window=5, sigma=1, pad_mode='reflect'):
+        pad = window // 2
+        super().__init__(window, pad, pad, pad_mode, pad_value=0.0)
+        self.weights = window_weights(type, window, sigma)
+
+    def _reduce(self, stream):
+        return np.convolve(stream, self.weights, mode='valid')
+
+class StreamingVariance(StreamingWindowFilter):
+    """
+    Streaming moving_variance (sample variance, ddof=1, aligned like pandas' rolling(center=...)).
+    Window sums are taken relative to the first sample of each chunk, so large offsets (e.g. costs ~1e9) do not cancel out.
+    """
+    def __init__(self, window=10, center=True):
+        pad_left = window // 2 if center else window - 1
+        super().__init__(window, pad_left, window - pad_left - 1)
+
+    def _reduce(self, stream):
+        finite = stream[~np.isnan(stream)]
+        shifted = stream - (finite[0] if finite.size else 0.0)
+        s1, nans = _window_sums(shifted, self.window)
+        s2, _ = _window_sums(shifted * shifted, self.window)
+        var = (s2 - s1 * s1 / self.window) / (self.window - 1)
+        return np.where(nans > 0, np.nan, np.maximum(var, 0.0))
+
+class RunningStats:
+    """
+    Count, mean, variance, min and max of everything seen so far (Welford), updated chunk by chunk
+    with Chan's merge, so memory stays O(1).
+    """
+    count: int
+    mean : float
+    m2   : float  # Sum of squared deviations from the mean
+    min  : float
+    max  : float
+
+    def __init__(self):
+        self.count, self.mean, self.m2 = 0, 0.0, 0.0
+        self.min, self.max = np.inf, -np.inf
+
+    def update(self, chunk) -> 'RunningStats':
+        chunk = np.asarray(chunk, dtype=float).ravel()
+        chunk = chunk[~np.isnan(chunk)]
+        if not chunk.size: return self
+
+        n, mean = chunk.size, chunk.mean()
+        m2 = np.sum((chunk - mean) ** 2)
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min, self.max = min(self.min, chunk.min()), max(self.max, chunk.max())
+        return self
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
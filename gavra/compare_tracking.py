@@ -1,22 +1,50 @@
+#!/usr/bin/env python3
+"""
+Compare MoveNum vs SolutionId progression of the Java (jask) and C++ (gavra) tracking files.
+Usage: python3 compare_tracking.py [instance] [nrows]
+
+Tracking files are resolved through the dataset registry (analysis/tools/dataset_registry.py),
+the most recent gavra run of the instance is used.
+"""
+
+import os
+import sys
 import pandas as pd
 
-# Load Java tracking data
-java_df = pd.read_csv('/home/pbiel/repos/mrp/jask/process_reassignments.csv', nrows=50)
-print("Java implementation - MoveNum vs SolutionId:")
-print(java_df[['MoveNum', 'SolutionId']].head(20))
-
-print("\nUnique solution IDs in first 50 moves:")
-print(f"Total moves: {len(java_df)}")
-print(f"Unique solution IDs: {java_df['SolutionId'].nunique()}")
-print(f"Solution ID values: {sorted(java_df['SolutionId'].unique())}")
-
-# Load C++ tracking data  
-cpp_df = pd.read_csv('/home/pbiel/repos/mrp/gavra/results_a1_2_20250810_144506/process_reassignments_sol1.csv', nrows=50)
-print("\n" + "="*50)
-print("C++ implementation - MoveNum vs SolutionId:")
-print(cpp_df[['MoveNum', 'SolutionId']].head(20))
-
-print("\nUnique solution IDs in first 50 moves:")
-print(f"Total moves: {len(cpp_df)}")
-print(f"Unique solution IDs: {cpp_df['SolutionId'].nunique()}")
-print(f"Solution ID values: {sorted(cpp_df['SolutionId'].unique())}")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "analysis"))
+from tools.dataset_registry import default_registry
+
+def compare_tracking(instance="a1_2", nrows=50):
+    registry = default_registry()
+    java_file = registry.get(solver="jask", kind="exploration", run="jask").path
+    cpp_file = registry.get(solver="gavra", instance=instance, kind="exploration", variant="sol1").path
+
+    # Load Java tracking data
+    java_df = pd.read_csv(java_file, nrows=nrows, usecols=['MoveNum', 'SolutionId'])
+    print(f"Java implementation ({java_file}) - MoveNum vs SolutionId:")
+    print(java_df[['MoveNum', 'SolutionId']].head(20))
+
+    print(f"\nUnique solution IDs in first {nrows} moves:")
+    print(f"Total moves: {len(java_df)}")
+    print(f"Unique solution IDs: {java_df['SolutionId'].nunique()}")
+    print(f"Solution ID values: {sorted(java_df['SolutionId'].unique())}")
+
+    # Load C++ tracking data
+    cpp_df = pd.read_csv(cpp_file, nrows=nrows, usecols=['MoveNum', 'SolutionId'])
+    print("\n" + "="*50)
+    print(f"C++ implementation ({cpp_file}) - MoveNum vs SolutionId:")
+    print(cpp_df[['MoveNum', 'SolutionId']].head(20))
+
+    print(f"\nUnique solution IDs in first {nrows} moves:")
+    print(f"Total moves: {len(cpp_df)}")
+    print(f"Unique solution IDs: {cpp_df['SolutionId'].nunique()}")
+    print(f"Solution ID values: {sorted(cpp_df['SolutionId'].unique())}")
+
+if __name__ == "__main__":
+    instance = sys.argv[1] if len(sys.argv) > 1 else "a1_2"
+    nrows = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    try: compare_tracking(instance, nrows)
+    except LookupError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -1,14 +1,69 @@
 #!/usr/bin/env python3
 """
 Quick analysis script for S41 algorithm results.
-Usage: python3 quick_analysis.py <results_directory>
+Usage: python3 quick_analysis.py <results_directory | instance> [--tail]
+
+An instance name (e.g. a1_4) selects the most recent results_<instance>_* run with tracking files.
+
+Summary statistics (cost percentiles, moves per solution) need one chunked pass over the
+SolutionCost/SolutionId columns. With --tail only the row count (buffered block scan) and the
+first/last records (seek from the end of the file) are read, which stays fast on multi-GB files.
+Both tracking files are processed concurrently.
 """
 
 import sys
+import numpy as np
 import pandas as pd
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "analysis"))
+from tools.dataset_registry import default_registry, REPO_ROOT
+from tools.parsing_utils import count_rows, read_tail, scan_columns
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+def summarize_tracking(path, tail_only=False):
+    """Initial/final cost and move count of a tracking file, plus cost percentiles and moves per solution unless tail_only."""
+    if tail_only:
+        n_moves = count_rows(path)
+        initial = pd.read_csv(path, nrows=1, usecols=['SolutionCost'])['SolutionCost']
+        final = read_tail(path, n=1)['SolutionCost']
+        return {
+            'moves': n_moves,
+            'initial_cost': int(initial.iloc[0]) if len(initial) else None,
+            'final_cost': int(final.iloc[-1]) if len(final) else None,
+        }
+
+    cols = scan_columns(path, ['SolutionCost', 'SolutionId'])
+    cost, solution_ids = cols['SolutionCost'], cols['SolutionId']
+    summary = {
+        'moves': len(cost),
+        'initial_cost': int(cost[0]) if len(cost) else None,
+        'final_cost': int(cost[-1]) if len(cost) else None,
+    }
+    if len(cost):
+        summary['best_cost'] = int(np.min(cost))
+        summary['cost_percentiles'] = dict(zip(PERCENTILES, np.percentile(cost, PERCENTILES)))
+        _, moves_per_solution = np.unique(solution_ids, return_counts=True)
+        summary['solutions'] = len(moves_per_solution)
+        summary['moves_per_solution'] = (moves_per_solution.mean(), np.median(moves_per_solution), moves_per_solution.max())
+    return summary
 
-def quick_analysis(results_dir):
+def print_summary(name, summary):
+    print(f"\n{name}:")
+    print(f"  Total moves: {summary['moves']:,}")
+    if summary['initial_cost'] is None: return
+    print(f"  Initial cost: {summary['initial_cost']:,}")
+    print(f"  Final cost: {summary['final_cost']:,}")
+    print(f"  Improvement: {summary['initial_cost'] - summary['final_cost']:,}")
+    if 'cost_percentiles' not in summary: return
+    print(f"  Best cost: {summary['best_cost']:,}")
+    print("  Cost percentiles: " + ", ".join(f"p{p}={v:,.0f}" for p, v in summary['cost_percentiles'].items()))
+    mean, median, largest = summary['moves_per_solution']
+    print(f"  Solutions: {summary['solutions']:,}, moves per solution: mean={mean:,.1f} median={median:,.0f} max={largest:,}")
+
+def quick_analysis(results_dir, tail_only=False):
     """Perform quick analysis of tracking results."""
     
     print(f"Analyzing results in: {results_dir}")
@@ -22,40 +77,20 @@ def quick_analysis(results_dir):
         print("Error: Tracking files not found!")
         return
     
-    # Load data (just first and last rows for efficiency)
     print("Loading tracking data...")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        sol1, sol2 = pool.map(lambda path: summarize_tracking(path, tail_only), [sol1_file, sol2_file])
     
-    # Get basic info without loading entire files
-    sol1_lines = sum(1 for line in open(sol1_file)) - 1  # Subtract header
-    sol2_lines = sum(1 for line in open(sol2_file)) - 1
-    
-    # Load first and last few rows
-    sol1_first = pd.read_csv(sol1_file, nrows=5)
-    sol1_last = pd.read_csv(sol1_file, skiprows=range(1, sol1_lines-4))
-    
-    sol2_first = pd.read_csv(sol2_file, nrows=5)
-    sol2_last = pd.read_csv(sol2_file, skiprows=range(1, sol2_lines-4))
-    
-    print(f"\nSolution 1:")
-    print(f"  Total moves: {sol1_lines:,}")
-    print(f"  Initial cost: {sol1_first['SolutionCost'].iloc[0]:,}")
-    print(f"  Final cost: {sol1_last['SolutionCost'].iloc[-1]:,}")
-    print(f"  Improvement: {sol1_first['SolutionCost'].iloc[0] - sol1_last['SolutionCost'].iloc[-1]:,}")
-    
-    print(f"\nSolution 2:")
-    print(f"  Total moves: {sol2_lines:,}")
-    print(f"  Initial cost: {sol2_first['SolutionCost'].iloc[0]:,}")
-    print(f"  Final cost: {sol2_last['SolutionCost'].iloc[-1]:,}")
-    print(f"  Improvement: {sol2_first['SolutionCost'].iloc[0] - sol2_last['SolutionCost'].iloc[-1]:,}")
+    print_summary("Solution 1", sol1)
+    print_summary("Solution 2", sol2)
     
     # Determine better solution
-    sol1_final = sol1_last['SolutionCost'].iloc[-1]
-    sol2_final = sol2_last['SolutionCost'].iloc[-1]
-    
-    print(f"\nBest solution: {'Solution 1' if sol1_final < sol2_final else 'Solution 2'}")
-    print(f"Best cost: {min(sol1_final, sol2_final):,}")
+    finals = [s['final_cost'] for s in (sol1, sol2) if s['final_cost'] is not None]
+    if finals:
+        print(f"\nBest solution: {'Solution 1' if sol1['final_cost'] == min(finals) else 'Solution 2'}")
+        print(f"Best cost: {min(finals):,}")
     
-    print(f"\nTotal algorithm activity: {sol1_lines + sol2_lines:,} moves")
+    print(f"\nTotal algorithm activity: {sol1['moves'] + sol2['moves']:,} moves")
     
     # Check if solution file exists
     solution_file = None
@@ -73,13 +108,18 @@ def quick_analysis(results_dir):
     print("  jupyter notebook ../analytics/analysis.ipynb")
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python3 quick_analysis.py <results_directory>")
+    args = [arg for arg in sys.argv[1:] if arg != "--tail"]
+    if len(args) != 1:
+        print("Usage: python3 quick_analysis.py <results_directory | instance> [--tail]")
         sys.exit(1)
     
-    results_dir = sys.argv[1]
+    results_dir = args[0]
+    if not os.path.isdir(results_dir):
+        runs = default_registry().runs(solver="gavra", instance=results_dir)
+        runs = [run for run in runs if os.path.basename(run).startswith("results_")]
+        if runs: results_dir = os.path.join(REPO_ROOT, runs[-1])
     if not os.path.exists(results_dir):
         print(f"Error: Directory {results_dir} does not exist!")
         sys.exit(1)
     
-    quick_analysis(results_dir)
+    quick_analysis(results_dir, tail_only="--tail" in sys.argv)
@@ -9,8 +9,8 @@ TIME_LIMIT=${2:-30}
 SEED=${3:-42}
 
 # Paths
-GAVRA_DIR="/home/pbiel/repos/mrp/gavra"
-DATA_DIR="/home/pbiel/repos/mrp/jask/data/A"
+GAVRA_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+DATA_DIR="$GAVRA_DIR/../jask/data/A"
 EXECUTABLE="$GAVRA_DIR/Releasegcc/machineReassignment"
 
 # Check if dataset files exist
@@ -70,4 +70,4 @@ echo "  cd $OUTPUT_DIR"
 echo "  jupyter notebook ../analytics/analysis.ipynb"
 echo ""
 echo "Or copy the tracking files to analyze with existing tools:"
-echo "  cp $OUTPUT_DIR/process_reassignments_sol*.csv /home/pbiel/repos/mrp/jask/"
+echo "  cp $OUTPUT_DIR/process_reassignments_sol*.csv $GAVRA_DIR/../jask/"